@@ -0,0 +1,189 @@
+"""
+Browser Performance Metrics
+Collects in-page performance data while a flow runs: Navigation Timing for each page
+load, long tasks and slow input events from a PerformanceObserver injected before the
+page's own scripts, the script.js hot-path handler measures, and Chrome's own script,
+layout and style recalculation time from the DevTools Performance domain
+"""
+
+from selenium.common.exceptions import WebDriverException
+
+
+# Runs before any page script (Page.addScriptToEvaluateOnNewDocument). Enables the
+# measured() wrappers in script.js and buffers observer entries until collected.
+OBSERVER_JS = """
+window.__registrationPerf = { longTasks: [], events: [] };
+try {
+    new PerformanceObserver(list => {
+        list.getEntries().forEach(entry => {
+            window.__registrationPerf.longTasks.push([entry.startTime, entry.duration]);
+        });
+    }).observe({ type: 'longtask', buffered: true });
+} catch (e) {}
+try {
+    new PerformanceObserver(list => {
+        list.getEntries().forEach(entry => {
+            window.__registrationPerf.events.push(
+                [entry.name, entry.duration, entry.processingEnd - entry.processingStart]
+            );
+        });
+    }).observe({ type: 'event', durationThreshold: 16, buffered: true });
+} catch (e) {}
+"""
+
+NAVIGATION_TIMING_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+if (!nav) return null;
+const paint = {};
+performance.getEntriesByType('paint').forEach(entry => { paint[entry.name] = entry.startTime; });
+return {
+    url: nav.name,
+    timeOrigin: performance.timeOrigin,
+    dns: nav.domainLookupEnd - nav.domainLookupStart,
+    connect: nav.connectEnd - nav.connectStart,
+    ttfb: nav.responseStart - nav.requestStart,
+    response: nav.responseEnd - nav.responseStart,
+    domInteractive: nav.domInteractive,
+    domContentLoaded: nav.domContentLoadedEventEnd,
+    load: nav.loadEventEnd,
+    firstContentfulPaint: paint['first-contentful-paint'] || null,
+    transferSize: nav.transferSize,
+    resources: performance.getEntriesByType('resource').length
+};
+"""
+
+# Drains what the page buffered since the last call
+COLLECT_JS = """
+const perf = window.__registrationPerf;
+if (!perf) return null;
+const measures = {};
+performance.getEntriesByType('measure').forEach(entry => {
+    if (!entry.name.startsWith(arguments[0])) return;
+    const name = entry.name.slice(arguments[0].length);
+    const m = measures[name] || (measures[name] = { count: 0, total: 0, max: 0 });
+    m.count += 1;
+    m.total += entry.duration;
+    m.max = Math.max(m.max, entry.duration);
+});
+Object.keys(measures).forEach(name => performance.clearMeasures(arguments[0] + name));
+const result = { timeOrigin: performance.timeOrigin, longTasks: perf.longTasks,
+                 events: perf.events, measures: measures };
+perf.longTasks = [];
+perf.events = [];
+return result;
+"""
+
+MEASURE_PREFIX = "registration:"
+
+# Performance.getMetrics counters reported as per-step deltas; *Duration values are seconds
+DURATION_METRICS = ("TaskDuration", "ScriptDuration", "LayoutDuration", "RecalcStyleDuration")
+COUNT_METRICS = ("LayoutCount", "RecalcStyleCount")
+# Reported as the value at the end of the step
+GAUGE_METRICS = ("JSHeapUsedSize", "Nodes", "JSEventListeners")
+
+
+class BrowserMetrics:
+    """Per-step browser metrics for one Chrome session
+
+    install() must run before the page under test is loaded; steps are bracketed with
+    begin() and end(). Drivers without the DevTools protocol get in-page metrics only.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.cdp = hasattr(driver, "execute_cdp_cmd")
+        self.script_id = None
+        self.navigations = []
+        self._time_origin = None
+        self._before = {}
+
+    def install(self):
+        if not self.cdp:
+            return self
+        self.driver.execute_cdp_cmd("Performance.enable", {})
+        added = self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": OBSERVER_JS})
+        self.script_id = added.get("identifier")
+        return self
+
+    def uninstall(self):
+        """Remove the injected observer so a pooled browser goes back clean"""
+        if not self.cdp:
+            return
+        try:
+            if self.script_id:
+                self.driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument",
+                                            {"identifier": self.script_id})
+            self.driver.execute_cdp_cmd("Performance.disable", {})
+        except WebDriverException:
+            pass
+        self.script_id = None
+
+    def chrome_metrics(self):
+        if not self.cdp:
+            return {}
+        metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+        return {metric["name"]: metric["value"] for metric in metrics}
+
+    def begin(self):
+        self._before = self.chrome_metrics()
+
+    def end(self):
+        """Metrics for everything since begin()"""
+        after = self.chrome_metrics()
+        step = {}
+
+        if after:
+            for name in DURATION_METRICS:
+                step[name] = round(self._delta(name, after) * 1000, 2)
+            for name in COUNT_METRICS:
+                step[name] = int(self._delta(name, after))
+            for name in GAUGE_METRICS:
+                if name in after:
+                    step[name] = int(after[name])
+
+        page = self.driver.execute_script(COLLECT_JS, MEASURE_PREFIX)
+        if page:
+            durations = [duration for _, duration in page["longTasks"]]
+            step["longTasks"] = len(durations)
+            step["longTaskTotal"] = round(sum(durations), 2)
+            step["longTaskMax"] = round(max(durations, default=0), 2)
+            step["slowEvents"] = [
+                {"type": name, "duration": round(duration, 2), "processing": round(processing, 2)}
+                for name, duration, processing in page["events"]
+            ]
+            step["measures"] = {
+                name: {"count": m["count"], "total": round(m["total"], 3), "max": round(m["max"], 3)}
+                for name, m in page["measures"].items()
+            }
+            if page["timeOrigin"] != self._time_origin:
+                # A new document was loaded during this step
+                self._time_origin = page["timeOrigin"]
+                navigation = self.driver.execute_script(NAVIGATION_TIMING_JS)
+                if navigation:
+                    navigation = {k: round(v, 2) if isinstance(v, float) else v for k, v in navigation.items()}
+                    step["navigation"] = navigation
+                    self.navigations.append(navigation)
+        return step
+
+    def _delta(self, name, after):
+        # Counters restart when a navigation swaps renderer processes
+        value = after.get(name, 0.0)
+        before = self._before.get(name, 0)
+        return value - before if value >= before else value
+
+
+def format_step_metrics(metrics):
+    """One-line summary of end() output for reports"""
+    parts = []
+    if "ScriptDuration" in metrics:
+        parts.append(f"script {metrics['ScriptDuration']:.1f}ms")
+        parts.append(f"layout {metrics['LayoutDuration']:.1f}ms")
+        parts.append(f"style {metrics['RecalcStyleDuration']:.1f}ms")
+    if "longTasks" in metrics:
+        parts.append(f"long tasks {metrics['longTasks']} ({metrics['longTaskTotal']:.0f}ms)")
+    for name, m in sorted(metrics.get("measures", {}).items()):
+        parts.append(f"{name} {m['count']}× max {m['max']:.1f}ms")
+    navigation = metrics.get("navigation")
+    if navigation:
+        parts.append(f"load {navigation['load']:.0f}ms")
+    return ", ".join(parts)
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""
+Chrome WebDriver factory shared by all automation flows
+"""
+
+from selenium import webdriver
+
+
+def build_chrome_options(headless=False):
+    """Chrome options used by every flow"""
+    options = webdriver.ChromeOptions()
+    if headless:
+        # Fixed viewport so headless screenshots match a maximized desktop window
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1920,1080')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--disable-dev-shm-usage')
+    else:
+        options.add_argument('--start-maximized')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    return options
+
+
+def create_driver(headless=False):
+    """Launch a new Chrome WebDriver session"""
+    return webdriver.Chrome(options=build_chrome_options(headless))
@@ -0,0 +1,123 @@
+"""
+Client Emulation Profiles
+Named network and CPU throttling profiles applied to a Chrome session through the
+DevTools protocol, so any flow can be measured as a constrained mobile client sees it.
+Throughputs are bytes/s and latencies ms, following Chrome DevTools' and Lighthouse's
+presets (which derate nominal link speeds the same way).
+
+    python run_flows.py flow_b --profile desktop --profile slow-4g --profile mobile
+"""
+
+
+# Chrome's "no throttling" values for Network.emulateNetworkConditions
+NO_THROTTLING = {"offline": False, "latency": 0, "downloadThroughput": -1, "uploadThroughput": -1}
+
+PROFILES = {
+    "desktop": {
+        "description": "no throttling",
+    },
+    "3g": {
+        "description": "Slow 3G: 400 kbps, 2000 ms RTT",
+        "network": {"latency": 2000, "downloadThroughput": 50_000, "uploadThroughput": 50_000},
+    },
+    "slow-4g": {
+        "description": "1.44 Mbps down, 675 kbps up, 563 ms RTT",
+        "network": {"latency": 562.5, "downloadThroughput": 180_000, "uploadThroughput": 84_375},
+    },
+    "fast-4g": {
+        "description": "8.1 Mbps down, 1.35 Mbps up, 165 ms RTT",
+        "network": {"latency": 165, "downloadThroughput": 1_012_500, "uploadThroughput": 168_750},
+    },
+    "cpu-4x": {
+        "description": "4x CPU slowdown",
+        "cpu": 4,
+    },
+    "mobile": {
+        "description": "slow 4G with a 4x CPU slowdown (Lighthouse mobile)",
+        "network": {"latency": 562.5, "downloadThroughput": 180_000, "uploadThroughput": 84_375},
+        "cpu": 4,
+    },
+}
+
+# Navigation Timing fields compared across profiles (ms)
+LOAD_METRICS = ("ttfb", "firstContentfulPaint", "domContentLoaded", "load")
+
+
+def apply_profile(driver, name):
+    """Throttle a Chrome session; throttled profiles also disable the HTTP cache so
+    every load is a first visit"""
+    profile = PROFILES[name]
+    network = profile.get("network")
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": network is not None})
+    driver.execute_cdp_cmd("Network.emulateNetworkConditions", dict(NO_THROTTLING, **(network or {})))
+    driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": profile.get("cpu", 1)})
+
+
+def clear_profile(driver):
+    """Undo apply_profile() so a pooled browser goes back unthrottled"""
+    driver.execute_cdp_cmd("Network.emulateNetworkConditions", NO_THROTTLING)
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+    driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": 1})
+
+
+def summarize_profiles(results):
+    """Per flow/step, and per page load, timings of each profile
+
+    Returns {"steps": {flow: {step: {profile: seconds}}},
+             "loads": {flow: {profile: {metric: ms}}}, "handlers": {...}}
+    """
+    summary = {"steps": {}, "loads": {}, "handlers": {}}
+    for result in results:
+        profile = result.get("profile")
+        if not profile:
+            continue
+        flow = result["flow"].rsplit("@", 1)[0]
+        for step in result["steps"]:
+            if step["status"] == "skipped" or step.get("cached"):
+                continue
+            summary["steps"].setdefault(flow, {}).setdefault(step["name"], {})[profile] = step["duration"]
+            browser = step.get("browser", {})
+            for name, measure in browser.get("measures", {}).items():
+                handler = summary["handlers"].setdefault(name, {}).setdefault(profile, {"count": 0, "total": 0.0, "max": 0.0})
+                handler["count"] += measure["count"]
+                handler["total"] = round(handler["total"] + measure["total"], 3)
+                handler["max"] = max(handler["max"], measure["max"])
+        if result.get("navigations"):
+            # The first load of the flow is the one a new visitor waits for
+            first = result["navigations"][0]
+            summary["loads"].setdefault(flow, {})[profile] = {m: first.get(m) for m in LOAD_METRICS}
+    return summary
+
+
+def print_profile_report(summary, profiles):
+    """Side-by-side timings of each profile"""
+    print("=" * 80)
+    print("EMULATION PROFILES")
+    print("=" * 80)
+    for name in profiles:
+        print(f"  • {name}: {PROFILES[name]['description']}")
+    header = "".join(f"{name:>12}" for name in profiles)
+
+    if summary["loads"]:
+        print(f"\nFirst page load (ms){'':<26}{header}")
+        for flow, by_profile in sorted(summary["loads"].items()):
+            for metric in LOAD_METRICS:
+                cells = "".join(
+                    f"{by_profile[p][metric]:>12.0f}" if by_profile.get(p, {}).get(metric) is not None else f"{'-':>12}"
+                    for p in profiles
+                )
+                print(f"  {flow + ' ' + metric:<44}{cells}")
+
+    print(f"\nStep time (s){'':<33}{header}")
+    for flow, steps in sorted(summary["steps"].items()):
+        for step, by_profile in steps.items():
+            cells = "".join(f"{by_profile[p]:>12.2f}" if p in by_profile else f"{'-':>12}" for p in profiles)
+            print(f"  {(flow + ' ' + step)[:44]:<44}{cells}")
+
+    if summary["handlers"]:
+        print(f"\nHandler max (ms){'':<30}{header}")
+        for handler, by_profile in sorted(summary["handlers"].items()):
+            cells = "".join(f"{by_profile[p]['max']:>12.1f}" if p in by_profile else f"{'-':>12}" for p in profiles)
+            print(f"  {handler[:44]:<44}{cells}")
+    print("=" * 80 + "\n")
\ No newline at end of file
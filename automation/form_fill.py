@@ -0,0 +1,127 @@
+"""
+Bulk Form Fill
+Sets every registration field from a Python dict in one injected script, dispatching the
+same input/change/blur events attachEventListeners() listens for so validation still runs.
+Dropdown changes wait for the page's locationUpdate promise, since states and cities are
+fetched per country. States too large for a city dropdown are filled through the type-ahead.
+Keystroke-accurate filling with send_keys() remains available via keystrokes=True.
+"""
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import Select
+
+from waits import FormWaits
+
+
+# Fill order matters: state options exist only after the country change, and
+# phone validation reads the selected country.
+FIELD_ORDER = (
+    "firstName", "lastName", "email", "phone", "age", "gender", "address",
+    "country", "state", "city", "password", "confirmPassword", "terms",
+)
+DROPDOWNS = ("country", "state", "city")
+
+FILL_JS = """
+const entries = arguments[0];
+const done = arguments[arguments.length - 1];
+const missing = [];
+
+function fire(el, type, bubbles) {
+    el.dispatchEvent(new Event(type, { bubbles: bubbles }));
+}
+
+async function fill() {
+    for (const [name, value] of entries) {
+        if (name === 'gender') {
+            const radio = document.querySelector(`input[name='gender'][value='${value}']`);
+            if (!radio) { missing.push(name); continue; }
+            radio.checked = true;
+            fire(radio, 'input', true);
+            fire(radio, 'change', true);
+            continue;
+        }
+
+        const el = document.getElementById(name);
+        if (name === 'city' && !document.getElementById('citySearch').hidden) {
+            document.getElementById('citySearch').value = value;
+            await handleCitySearchChange();
+            if (el.value !== value) missing.push(name);
+            continue;
+        }
+
+        if (name === 'terms') {
+            el.checked = Boolean(value);
+            fire(el, 'input', true);
+            fire(el, 'change', true);
+            continue;
+        }
+
+        if (el.tagName === 'SELECT') {
+            const option = Array.from(el.options).find(o => o.value === value || o.text === value);
+            if (!option || el.disabled) { missing.push(name); continue; }
+            el.value = option.value;
+            fire(el, 'input', true);
+            fire(el, 'change', true);
+            // The next dropdown is populated once this change's chunk is loaded
+            await locationUpdate;
+            continue;
+        }
+
+        el.value = value;
+        fire(el, 'input', true);
+        fire(el, 'change', true);
+        fire(el, 'blur', false);
+    }
+}
+
+fill().then(() => done(missing), error => done(missing.concat(String(error))));
+"""
+
+
+def ordered_entries(data):
+    """(field, value) pairs in fill order; unknown keys are rejected"""
+    unknown = set(data) - set(FIELD_ORDER)
+    if unknown:
+        raise ValueError(f"Unknown form fields: {', '.join(sorted(unknown))}")
+    return [(name, data[name]) for name in FIELD_ORDER if name in data]
+
+
+def fill_form(driver, data, keystrokes=False):
+    """Fill the form from a {field_id: value} dict
+
+    Gender takes the radio value ('male', 'female', 'other'), terms a bool, and
+    dropdowns an option value or visible text.
+    """
+    if keystrokes:
+        type_form(driver, data)
+        return
+
+    missing = driver.execute_async_script(FILL_JS, ordered_entries(data))
+    if missing:
+        raise ValueError(f"Could not set form fields: {', '.join(missing)}")
+
+
+def type_form(driver, data, waits=None):
+    """Fill the form field by field with real keystrokes and clicks"""
+    waits = waits or FormWaits(driver)
+    for name, value in ordered_entries(data):
+        if name == "gender":
+            radio = driver.find_element(By.CSS_SELECTOR, f"input[name='gender'][value='{value}']")
+            driver.execute_script("arguments[0].click();", radio)
+        elif name == "terms":
+            checkbox = driver.find_element(By.ID, "terms")
+            if checkbox.is_selected() != bool(value):
+                driver.execute_script("arguments[0].click();", checkbox)
+        elif name == "city" and waits.city_input_ready() == "search":
+            search = driver.find_element(By.ID, "citySearch")
+            search.clear()
+            search.send_keys(value + Keys.TAB)
+            waits.dropdown_ready(name, expected=value)
+        elif name in DROPDOWNS:
+            waits.dropdown_ready(name, expected=value)
+            Select(driver.find_element(By.ID, name)).select_by_visible_text(value)
+        else:
+            field = driver.find_element(By.ID, name)
+            field.clear()
+            field.send_keys(value)
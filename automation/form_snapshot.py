@@ -0,0 +1,142 @@
+"""
+Form Snapshot
+Reads the whole registration form in one execute_script call so assertions run locally
+instead of making a WebDriver round trip per element or <option>
+"""
+
+
+INPUT_FIELDS = (
+    "firstName", "lastName", "email", "phone", "age", "address",
+    "country", "state", "city", "password", "confirmPassword",
+)
+DROPDOWNS = ("country", "state", "city")
+
+SNAPSHOT_JS = """
+const inputIds = arguments[0];
+const dropdownIds = arguments[1];
+
+function classState(el) {
+    if (el.classList.contains('invalid')) return 'invalid';
+    if (el.classList.contains('valid')) return 'valid';
+    return '';
+}
+
+function groupParts(group) {
+    const error = group.querySelector('.error-message');
+    const icon = group.querySelector('.success-icon');
+    return {
+        error: error ? error.textContent : '',
+        successIcon: icon ? getComputedStyle(icon).opacity === '1' : false
+    };
+}
+
+const fields = {};
+inputIds.forEach(id => {
+    const el = document.getElementById(id);
+    fields[id] = Object.assign({
+        value: el.value,
+        state: classState(el),
+        disabled: el.disabled
+    }, groupParts(el.closest('.form-group')));
+});
+
+const radios = Array.from(document.getElementsByName('gender'));
+const checked = radios.find(r => r.checked);
+const genderGroup = radios[0].closest('.form-group');
+fields.gender = Object.assign({
+    value: checked ? checked.value : '',
+    state: classState(genderGroup),
+    disabled: false
+}, groupParts(genderGroup));
+
+const terms = document.getElementById('terms');
+const termsGroup = terms.closest('.form-group');
+fields.terms = Object.assign({
+    value: terms.checked,
+    state: classState(termsGroup),
+    disabled: terms.disabled
+}, groupParts(termsGroup));
+
+const dropdowns = {};
+dropdownIds.forEach(id => {
+    const select = document.getElementById(id);
+    dropdowns[id] = {
+        value: select.value,
+        disabled: select.disabled,
+        options: Array.from(select.options).map(o => ({ value: o.value, text: o.text, disabled: o.disabled }))
+    };
+});
+
+const meter = document.querySelector('.strength-meter-fill');
+const strengthText = document.querySelector('.strength-text');
+const level = ['weak', 'medium', 'strong'].find(l => meter.classList.contains(l)) || '';
+
+const submit = document.getElementById('submitBtn');
+
+return {
+    fields: fields,
+    dropdowns: dropdowns,
+    strength: { level: level, text: strengthText.textContent, meterClass: meter.className },
+    submit: { disabled: submit.disabled, loading: submit.classList.contains('loading') },
+    alerts: Array.from(document.querySelectorAll('#alertContainer .alert')).map(a => ({
+        type: (a.className.match(/alert-(\\w+)/) || [])[1] || '',
+        text: a.textContent
+    }))
+};
+"""
+
+
+class FormSnapshot:
+    """Structured, read-only view of the registration form at one point in time"""
+
+    def __init__(self, data):
+        self.data = data
+        self.fields = data["fields"]
+        self.dropdowns = data["dropdowns"]
+
+    def value(self, name):
+        return self.fields[name]["value"]
+
+    def state(self, name):
+        """'valid', 'invalid' or '' for a field"""
+        return self.fields[name]["state"]
+
+    def error(self, name):
+        """Error message text shown under a field"""
+        return self.fields[name]["error"]
+
+    def options(self, select_id):
+        """Option texts of a dropdown, without the placeholder"""
+        return [o["text"] for o in self.dropdowns[select_id]["options"] if o["value"]]
+
+    def dropdown_disabled(self, select_id):
+        return self.dropdowns[select_id]["disabled"]
+
+    def fields_in_state(self, state):
+        """Names of all fields currently marked 'valid' or 'invalid'"""
+        return [name for name, field in self.fields.items() if field["state"] == state]
+
+    def success_icons(self):
+        """Names of fields whose success checkmark is visible"""
+        return [name for name, field in self.fields.items() if field["successIcon"]]
+
+    @property
+    def strength_level(self):
+        return self.data["strength"]["level"]
+
+    @property
+    def strength_text(self):
+        return self.data["strength"]["text"]
+
+    @property
+    def submit_disabled(self):
+        return self.data["submit"]["disabled"]
+
+    @property
+    def alerts(self):
+        return self.data["alerts"]
+
+
+def take_snapshot(driver):
+    """Capture the form state in a single WebDriver round trip"""
+    return FormSnapshot(driver.execute_script(SNAPSHOT_JS, list(INPUT_FIELDS), list(DROPDOWNS)))
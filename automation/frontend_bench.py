@@ -0,0 +1,363 @@
+"""
+Frontend Hot-Path Benchmark
+Loads registration.html with synthetic data.js variants of growing size and times, inside
+the page, the work users wait on: the country/state dropdown rebuilds, per-keystroke
+input handling (which re-runs updateSubmitButton() and so validateForm()) and the submit
+button recomputation itself. Results are reported per size to show the scaling curve.
+Each variant is split into location chunks and served by a local backend.server, so
+the country change includes fetching that country's chunk the first time.
+
+Usage (from automation/):
+    python frontend_bench.py
+    python frontend_bench.py --sizes 10x10x10 50x20x50:10000 200x100x500:100000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from backend.frontend_data import PROJECT_DIR, file_hash, load_frontend_data
+from backend.location_chunks import write_chunks
+from browser_metrics import NAVIGATION_TIMING_JS
+from driver_factory import create_driver
+from load_generator import LocalServer
+from test_flow_b_positive import SAMPLE_REGISTRATION
+from test_flow_d_location_matrix import generate_location_data, location_pairs
+from timing import percentile
+from waits import FormWaits
+
+
+AUTOMATION_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNS_ROOT = os.path.normpath(os.path.join(AUTOMATION_DIR, os.pardir, "screenshots", "runs"))
+FRONTEND_DIR = os.path.join(PROJECT_DIR, "frontend")
+# Everything registration.html loads except data.core.js and the location chunks,
+# which each variant generates from its own data.js
+FRONTEND_FILES = ("registration.html", "styles.css", "validation.js", "script.js", "disposable-domains.txt")
+
+# COUNTRIESxSTATESxCITIES[:DISPOSABLE_DOMAINS]
+DEFAULT_SIZES = ("10x10x10", "50x20x50:1000", "100x50x100:10000", "200x100x200:100000")
+# Seconds for loading a variant and for one benchmark script; large variants parse slowly
+PAGE_TIMEOUT = 300
+
+DATA_JS_FOOTER = """
+// Export data for use in other scripts
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = {
+        locationData,
+        countryPhoneCodes,
+        disposableEmailDomains
+    };
+}
+"""
+
+# Runs the page's own handlers and records each call with performance.now(). Chrome
+# clamps that clock to 0.1 ms on pages that are not cross-origin isolated, so the
+# reported means (totals over many calls) are more precise than single samples.
+BENCH_JS = """
+const opts = arguments[0];
+const done = arguments[arguments.length - 1];
+const country = document.getElementById('country');
+const state = document.getElementById('state');
+const city = document.getElementById('city');
+const samples = { countryChange: [], stateChange: [], keystroke: [], passwordKeystroke: [], submitButton: [] };
+
+function time(fn) {
+    const start = performance.now();
+    fn();
+    return performance.now() - start;
+}
+
+async function timeAsync(fn) {
+    const start = performance.now();
+    await fn();
+    return performance.now() - start;
+}
+
+function type(el, text, into) {
+    el.value = '';
+    for (const ch of text) {
+        el.value += ch;
+        into.push(time(() => el.dispatchEvent(new Event('input', { bubbles: true }))));
+    }
+}
+
+async function run() {
+    // Each pair is a different state, so every city list is sorted for the first time
+    for (const [countryName, stateName] of opts.pairs) {
+        country.value = countryName;
+        samples.countryChange.push(await timeAsync(handleCountryChange));
+        state.value = stateName;
+        samples.stateChange.push(await timeAsync(handleStateChange));
+    }
+    city.value = city.options[1].value;
+
+    Object.entries(opts.fields).forEach(([name, value]) => { document.getElementById(name).value = value; });
+    document.querySelector(`input[name='gender'][value='${opts.gender}']`).checked = true;
+    document.getElementById('terms').checked = true;
+
+    for (let round = 0; round < opts.rounds; round++) {
+        type(document.getElementById('email'), opts.email, samples.keystroke);
+        type(document.getElementById('password'), opts.password, samples.passwordKeystroke);
+    }
+    document.getElementById('confirmPassword').value = opts.password;
+
+    for (let i = 0; i < opts.submitRuns; i++) {
+        samples.submitButton.push(time(updateSubmitButton));
+    }
+
+    return {
+        samples: samples,
+        formValid: !document.getElementById('submitBtn').disabled,
+        heapUsed: performance.memory ? performance.memory.usedJSHeapSize : null
+    };
+}
+
+run().then(done, error => done({ error: String(error) }));
+"""
+
+
+def parse_size(value):
+    """'200x100x500:100000' -> (200, 100, 500, 100000); the domain count is optional"""
+    dimensions, _, domains = value.partition(":")
+    parts = dimensions.lower().split("x")
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError("expected COUNTRIESxSTATESxCITIES[:DOMAINS], e.g. 200x100x500:100000")
+    return tuple(int(p) for p in parts) + (int(domains) if domains else 0,)
+
+
+def size_label(size):
+    countries, states, cities, domains = size
+    return f"{countries}x{states}x{cities}" + (f":{domains}" if domains else "")
+
+
+def generate_disposable_domains(count, seed=0):
+    """The real inline list padded with synthetic domains up to count entries"""
+    domains = sorted(load_frontend_data().disposable_domains)
+    rng = random.Random(seed)
+    while len(domains) < count:
+        domains.append(f"{rng.choice(('temp', 'trash', 'burner', 'spam'))}mail-{len(domains):07d}.example")
+    return domains
+
+
+def write_data_js(path, location_data, phone_codes, disposable_domains):
+    """data.js with the same three constants as the real one"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("// Generated by automation/frontend_bench.py\n")
+        f.write(f"const locationData = {json.dumps(location_data, separators=(',', ':'))};\n\n")
+        f.write(f"const countryPhoneCodes = {json.dumps(phone_codes, indent=4)};\n\n")
+        f.write(f"const disposableEmailDomains = {json.dumps(disposable_domains, indent=0)};\n")
+        f.write(DATA_JS_FOOTER)
+
+
+def build_variant(variant_dir, size, seed=0):
+    """Copy the frontend into variant_dir with a generated data.js, split into location
+    chunks; returns its location data and phone codes"""
+    countries, states, cities, domains = size
+    os.makedirs(variant_dir, exist_ok=True)
+    for name in FRONTEND_FILES:
+        source = os.path.join(FRONTEND_DIR, name)
+        if os.path.exists(source):
+            shutil.copy2(source, variant_dir)
+
+    location_data = generate_location_data(countries, states, cities, seed)
+    codes = sorted(set(load_frontend_data().phone_codes.values()))
+    phone_codes = {country: codes[i % len(codes)] for i, country in enumerate(sorted(location_data))}
+    disposable_domains = (generate_disposable_domains(domains, seed) if domains else
+                          sorted(load_frontend_data().disposable_domains))
+    data_js = os.path.join(variant_dir, "data.js")
+    write_data_js(data_js, location_data, phone_codes, disposable_domains)
+    write_chunks(location_data, phone_codes, disposable_domains, file_hash(data_js),
+                 os.path.join(variant_dir, "locations"), os.path.join(variant_dir, "data.core.js"))
+    return location_data, phone_codes
+
+
+def summarize_samples(samples):
+    """count, mean, p50, p95 and max of a list of milliseconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "p50": round(percentile(ordered, 0.50), 3),
+        "p95": round(percentile(ordered, 0.95), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class FrontendBenchmark:
+    """Runs BENCH_JS against one generated data.js variant per size"""
+
+    def __init__(self, sizes, samples=20, rounds=3, submit_runs=200, headless=True, seed=0, keep=False):
+        self.sizes = sizes
+        self.samples = samples
+        self.rounds = rounds
+        self.submit_runs = submit_runs
+        self.headless = headless
+        self.seed = seed
+        self.keep = keep
+        self.driver = None
+        self.waits = None
+        self.work_dir = None
+
+    def setup(self):
+        """Initialize WebDriver and the directory the variants are written to"""
+        print("=" * 80)
+        print("FRONTEND HOT-PATH BENCHMARK")
+        print("=" * 80)
+        print("\n[SETUP] Initializing Chrome WebDriver...")
+        self.driver = create_driver(self.headless)
+        self.driver.set_page_load_timeout(PAGE_TIMEOUT)
+        self.driver.set_script_timeout(PAGE_TIMEOUT)
+        self.waits = FormWaits(self.driver, timeout=PAGE_TIMEOUT)
+        self.work_dir = tempfile.mkdtemp(prefix="frontend-bench-")
+        print("✓ Chrome WebDriver initialized successfully\n")
+
+    def run(self):
+        return [self.run_size(size) for size in self.sizes]
+
+    def run_size(self, size):
+        """Build, load and benchmark one variant"""
+        label = size_label(size)
+        print(f"[{label}] Generating data.js...")
+        variant_dir = os.path.join(self.work_dir, label.replace(":", "_"))
+        location_data, phone_codes = build_variant(variant_dir, size, self.seed)
+        data_js_bytes = os.path.getsize(os.path.join(variant_dir, "data.js"))
+        core_js_bytes = os.path.getsize(os.path.join(variant_dir, "data.core.js"))
+        print(f"  • data.js: {data_js_bytes / 1e6:,.1f} MB, data.core.js loaded up front: {core_js_bytes / 1e3:,.1f} KB")
+
+        pairs = location_pairs(location_data)
+        rng = random.Random(self.seed)
+        pairs = rng.sample(pairs, min(self.samples, len(pairs)))
+        country = pairs[-1][0]
+        options = {
+            "pairs": [list(pair) for pair in pairs],
+            "fields": {
+                "firstName": SAMPLE_REGISTRATION["firstName"],
+                "lastName": SAMPLE_REGISTRATION["lastName"],
+                "phone": f"{phone_codes[country]} 9123456789",
+                "age": SAMPLE_REGISTRATION["age"],
+                "address": SAMPLE_REGISTRATION["address"],
+            },
+            "gender": SAMPLE_REGISTRATION["gender"],
+            "email": SAMPLE_REGISTRATION["email"],
+            "password": SAMPLE_REGISTRATION["password"],
+            "rounds": self.rounds,
+            "submitRuns": self.submit_runs,
+        }
+
+        print("  • Loading registration.html...")
+        with LocalServer(frontend_dir=variant_dir) as server:
+            self.driver.get(f"http://127.0.0.1:{server.port}/registration.html")
+            self.waits.page_ready()
+            navigation = self.driver.execute_script(NAVIGATION_TIMING_JS) or {}
+
+            print("  • Timing dropdowns, keystrokes and submit button...")
+            measured = self.driver.execute_async_script(BENCH_JS, options)
+        if "error" in measured:
+            raise RuntimeError(f"Benchmark script failed: {measured['error']}")
+        result = {
+            "size": label,
+            "countries": size[0],
+            "states_per_country": size[1],
+            "cities_per_state": size[2],
+            "disposable_domains": size[3] or len(load_frontend_data().disposable_domains),
+            "data_js_bytes": data_js_bytes,
+            "core_js_bytes": core_js_bytes,
+            "load_ms": round(navigation.get("load", 0), 1),
+            "dom_content_loaded_ms": round(navigation.get("domContentLoaded", 0), 1),
+            "heap_used_bytes": measured["heapUsed"],
+            "form_valid": measured["formValid"],
+        }
+        for name, samples in measured["samples"].items():
+            result[name] = summarize_samples(samples)
+
+        if not result["form_valid"]:
+            print("  ⚠️  Submit button stayed disabled; the filled form did not validate")
+        print(f"  ✓ Loaded in {result['load_ms']:.0f} ms, "
+              f"updateSubmitButton mean {result['submitButton']['mean']:.3f} ms\n")
+        if not self.keep:
+            shutil.rmtree(variant_dir, ignore_errors=True)
+        return result
+
+    def teardown(self):
+        """Close browser and remove generated variants"""
+        print("[TEARDOWN] Closing browser...")
+        if self.driver:
+            self.driver.quit()
+        if self.work_dir and not self.keep:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        elif self.work_dir:
+            print(f"  • Variants kept in {self.work_dir}")
+        print("✓ Browser closed\n")
+
+
+def print_report(results):
+    """Scaling table: one row per size, mean / p95 milliseconds per operation"""
+    columns = (
+        ("countryChange", "country"), ("stateChange", "state"),
+        ("keystroke", "key"), ("passwordKeystroke", "pwd key"), ("submitButton", "submit"),
+    )
+    print("=" * 100)
+    print("SCALING (ms, mean / p95)")
+    print("=" * 100)
+    header = f"{'SIZE':<22} {'DATA.JS MB':>10} {'CORE KB':>8} {'LOAD':>8}"
+    for _, title in columns:
+        header += f" {title:>15}"
+    print(header)
+    for result in results:
+        row = (f"{result['size']:<22} {result['data_js_bytes'] / 1e6:>10.1f} "
+               f"{result.get('core_js_bytes', 0) / 1e3:>8.1f} {result['load_ms']:>8.0f}")
+        for key, _ in columns:
+            stats = result[key]
+            row += f" {stats.get('mean', 0):>7.3f}/{stats.get('p95', 0):<7.2f}"
+        print(row)
+    print("=" * 100 + "\n")
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Benchmark registration.html hot paths on scaled data.js variants")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in DEFAULT_SIZES],
+                        help="COUNTRIESxSTATESxCITIES[:DISPOSABLE_DOMAINS] per variant")
+    parser.add_argument("--samples", type=int, default=20, help="country/state changes timed per size")
+    parser.add_argument("--rounds", type=int, default=3, help="times the email and password are typed")
+    parser.add_argument("--submit-runs", type=int, default=200, help="direct updateSubmitButton() calls")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--keep", action="store_true", help="keep the generated frontend variants")
+    parser.add_argument("--output", default=None,
+                        help="JSON report path (default: screenshots/runs/<ts>/frontend_bench.json)")
+    args = parser.parse_args(argv)
+
+    bench = FrontendBenchmark(args.sizes, args.samples, args.rounds, args.submit_runs,
+                              headless=not args.headed, seed=args.seed, keep=args.keep)
+    try:
+        bench.setup()
+        results = bench.run()
+    except Exception as e:
+        print(f"\n❌ ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        bench.teardown()
+
+    print_report(results)
+    output = args.output or os.path.join(RUNS_ROOT, datetime.now().strftime("%Y%m%d_%H%M%S"), "frontend_bench.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"results": results}, f, indent=2)
+    print(f"📄 Report: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+Test Impact Cache
+Records which inputs each flow step depends on and reuses step results while those
+inputs are unchanged. A step depends on:
+  - the flow's test source (its module and every automation/backend module it imports)
+  - registration.html, which every step reads through the DOM
+  - the frontend scripts it executed (V8 precise coverage, so data.core.js counts where it loaded)
+  - styles.css when it captured a screenshot
+  - data files it fetched (disposable-domains.txt) and the backend when it called /api/,
+    plus data.js when it fetched location chunks built from it
+
+Steps share page state, so a step also inherits the script and data dependencies of
+the steps before it (styles.css only affects that step's own screenshots). When any
+step is stale, a flow runs from its first step up to the last stale one; the steps
+after that are reported from the cache.
+
+Clear with `rm -rf .cache/test_impact`, or bypass with `run_flows.py --force`.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import sys
+from urllib.parse import urlparse
+
+
+AUTOMATION_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(AUTOMATION_DIR)
+FRONTEND_DIR = os.path.join(PROJECT_DIR, "frontend")
+CACHE_DIR = os.path.join(PROJECT_DIR, ".cache", "test_impact")
+# Bump when the entry layout changes so old entries are ignored
+CACHE_VERSION = 1
+
+HTML_FILE = "frontend/registration.html"
+STYLES_FILE = "frontend/styles.css"
+SCRIPT_FILES = ("data.core.js", "validation.js", "script.js")
+DATA_FILES = ("disposable-domains.txt",)
+# Dependencies that do not carry page state over to later steps
+PRESENTATION_FILES = (STYLES_FILE,)
+
+# Performance entries of the current document, from the given index on
+RESOURCES_JS = """
+const entries = performance.getEntriesByType('resource');
+return [performance.timeOrigin, entries.slice(arguments[0]).map(entry => entry.name)];
+"""
+
+_hashes = {}
+
+
+def file_hash(relpath):
+    """SHA-256 of a project file (None when missing), memoized for the process"""
+    if relpath not in _hashes:
+        try:
+            with open(os.path.join(PROJECT_DIR, relpath), "rb") as f:
+                _hashes[relpath] = hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            _hashes[relpath] = None
+    return _hashes[relpath]
+
+
+def module_file(name):
+    """Project file for an imported module name, or None for third-party modules"""
+    parts = name.split(".")
+    for base in (AUTOMATION_DIR, PROJECT_DIR):
+        for candidate in (os.path.join(base, *parts) + ".py", os.path.join(base, *parts, "__init__.py")):
+            if os.path.isfile(candidate):
+                return candidate
+    return None
+
+
+def source_files(path):
+    """Project-relative paths of a module and every project module it imports, transitively"""
+    seen = set()
+    pending = [os.path.abspath(path)]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        with open(current, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), current)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                found = module_file(name)
+                if found:
+                    pending.append(found)
+    return sorted(os.path.relpath(p, PROJECT_DIR) for p in seen)
+
+
+class ScriptCoverage:
+    """Which frontend scripts and resources each step used, from one Chrome session
+
+    Uses V8 precise coverage through the DevTools protocol; without it every script
+    counts as used, which only makes the cache more conservative.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.cdp = hasattr(driver, "execute_cdp_cmd")
+        self._time_origin = None
+        self._resources_seen = 0
+
+    def install(self):
+        """Start coverage; must run before the page under test is loaded"""
+        if self.cdp:
+            self.driver.execute_cdp_cmd("Profiler.enable", {})
+            self.driver.execute_cdp_cmd("Profiler.startPreciseCoverage", {"callCount": True, "detailed": False})
+        return self
+
+    def uninstall(self):
+        if not self.cdp:
+            return
+        self.driver.execute_cdp_cmd("Profiler.stopPreciseCoverage", {})
+        self.driver.execute_cdp_cmd("Profiler.disable", {})
+
+    def scripts(self):
+        """Frontend scripts with any function executed since the last call"""
+        if not self.cdp:
+            return set(SCRIPT_FILES)
+        # Taking coverage with callCount resets the counters
+        coverage = self.driver.execute_cdp_cmd("Profiler.takePreciseCoverage", {})["result"]
+        used = set()
+        for script in coverage:
+            name = os.path.basename(urlparse(script["url"]).path)
+            if name in SCRIPT_FILES and any(f["ranges"][0]["count"] for f in script["functions"]):
+                used.add(name)
+        return used
+
+    def resources(self):
+        """URLs the page requested since the last call"""
+        time_origin, names = self.driver.execute_script(RESOURCES_JS, 0)
+        if time_origin != self._time_origin:
+            # New document: its resource list starts over
+            self._time_origin = time_origin
+            self._resources_seen = 0
+        new = names[self._resources_seen:]
+        self._resources_seen = len(names)
+        return new
+
+    def step_dependencies(self, record, test_sources=()):
+        """Project-relative inputs of the step that just finished"""
+        depends = {HTML_FILE}
+        depends.update(f"frontend/{name}" for name in self.scripts())
+        for url in self.resources():
+            path = urlparse(url).path
+            if os.path.basename(path) in DATA_FILES:
+                depends.add(f"frontend/{os.path.basename(path)}")
+            elif path.startswith("/api/"):
+                depends.update(source_files(os.path.join(PROJECT_DIR, "backend", "server.py")))
+                if path.startswith("/api/locations"):
+                    depends.add("frontend/data.js")
+        if any(a["kind"] == "screenshot" for a in record.get("artifacts", [])):
+            depends.add(STYLES_FILE)
+        return sorted(depends)
+
+
+class ImpactCache:
+    """Step results of each task keyed by the content hashes of their inputs"""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    def entry_path(self, task_name, flow_cls, options, url):
+        identity = json.dumps([CACHE_VERSION, flow_cls.__module__, flow_cls.__name__, options, url],
+                              sort_keys=True, default=str)
+        return os.path.join(self.root, f"{task_name}-{hashlib.sha256(identity.encode()).hexdigest()[:16]}.json")
+
+    def load(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def plan(self, task_name, flow_cls, options, url):
+        """(steps to run, cached records for the rest) for one task
+
+        Runs everything when there is no entry; (0, all records) means the whole task
+        is reusable.
+        """
+        steps = list(flow_cls.STEPS)
+        entry = self.load(self.entry_path(task_name, flow_cls, options, url))
+        if not entry or [s["name"] for s in entry["steps"]] != steps:
+            return len(steps), []
+        fresh = [step_is_fresh(s) for s in entry["steps"]]
+        last_stale = max((i for i, ok in enumerate(fresh) if not ok), default=-1)
+        cached = [dict(s["record"], cached=True) for s in entry["steps"][last_stale + 1:]]
+        return last_stale + 1, cached
+
+    def store(self, task_name, flow_cls, options, url, result):
+        """Save the inputs and records of a task's steps that passed
+
+        Failed and skipped steps get no inputs, so they are stale next time.
+        """
+        sources = source_files(sys.modules[flow_cls.__module__].__file__)
+        inherited = set()
+        steps = []
+        for record in result["steps"]:
+            if record.get("cached") and record.get("inputs"):
+                inputs = record["inputs"]
+            elif record["status"] in ("passed", "warning") and "depends_on" in record:
+                depends = set(record["depends_on"]) | inherited | set(sources)
+                inputs = {path: file_hash(path) for path in sorted(depends)}
+            else:
+                inputs = None
+            inherited.update(d for d in record.get("depends_on", []) if d not in PRESENTATION_FILES)
+            clean = {k: v for k, v in record.items() if k not in ("cached", "inputs")}
+            steps.append({"name": record["name"], "inputs": inputs, "record": dict(clean, inputs=inputs)})
+
+        path = self.entry_path(task_name, flow_cls, options, url)
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "task": task_name, "steps": steps}, f)
+        os.replace(tmp_path, path)
+
+
+def step_is_fresh(step):
+    inputs = step.get("inputs")
+    return bool(inputs) and all(file_hash(path) == digest for path, digest in inputs.items())
\ No newline at end of file
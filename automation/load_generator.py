@@ -0,0 +1,438 @@
+"""
+Load Generator
+Drives POST /api/register with concurrent asyncio clients, either closed-loop (each
+client sends its next registration as soon as the previous one returns) or open-loop
+at a fixed request rate, and reports latency percentiles, histograms, throughput and
+error rates as JSON.
+
+Payloads start from Flow B's sample registration and cycle through every
+Country → State → City path in locationData, with a unique email and phone per request.
+
+Usage (from automation/):
+    python load_generator.py --local --mode closed --concurrency 200 --duration 30
+    python load_generator.py --url http://localhost:8000/api/register --mode open --rate 2000
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from array import array
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from backend.frontend_data import PROJECT_DIR, load_frontend_data
+from test_flow_b_positive import SAMPLE_REGISTRATION
+
+
+AUTOMATION_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNS_ROOT = os.path.normpath(os.path.join(AUTOMATION_DIR, os.pardir, "screenshots", "runs"))
+DEFAULT_URL = "http://localhost:8000/api/register"
+MODES = ("closed", "open")
+
+# Upper bounds (ms) of the histogram buckets in the JSON report; the last one is open-ended
+HISTOGRAM_BOUNDS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def form_payload(registration):
+    """getFormData()-style payload from a fill_form()-style registration dict"""
+    payload = {name: value for name, value in registration.items() if name != "terms"}
+    payload["terms"] = "accepted" if registration.get("terms") else ""
+    return payload
+
+
+class PayloadFactory:
+    """Realistic registration payloads: Flow B's sample spread over every location path"""
+
+    def __init__(self, seed=0, invalid_ratio=0.0, run_id=None):
+        data = load_frontend_data()
+        self.base = form_payload(SAMPLE_REGISTRATION)
+        self.paths = list(data.paths())
+        self.phone_codes = data.phone_codes
+        self.rng = random.Random(seed)
+        self.rng.shuffle(self.paths)
+        self.invalid_ratio = invalid_ratio
+        # Keeps emails and phones unique across runs against the same server, which
+        # answers 409 to an email or phone it has already registered
+        self.run_id = run_id or uuid.uuid4().hex[:8]
+        self.phone_base = int(hashlib.sha256(self.run_id.encode()).hexdigest(), 16) % 10 ** 9
+        self.count = 0
+
+    def next(self):
+        """Next payload as JSON bytes, and whether it is meant to pass validation"""
+        n = self.count
+        self.count += 1
+        country, state, city = self.paths[n % len(self.paths)]
+        payload = dict(self.base)
+        local, _, domain = payload["email"].partition("@")
+        payload.update({
+            "email": f"{local}+{self.run_id}.{n}@{domain}",
+            "phone": f"{self.phone_codes.get(country, '+1')} 9{(self.phone_base + n) % 10 ** 9:09d}",
+            "country": country,
+            "state": state,
+            "city": city,
+        })
+        valid = self.rng.random() >= self.invalid_ratio
+        if not valid:
+            payload["confirmPassword"] = payload["password"] + "x"
+        return json.dumps(payload).encode("utf-8"), valid
+
+
+class Connection:
+    """Keep-alive HTTP/1.1 connection that POSTs JSON to one path"""
+
+    def __init__(self, host, port, path, timeout):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def post(self, body):
+        """Send one request; returns the response status"""
+        return await asyncio.wait_for(self._post(body), self.timeout)
+
+    async def _post(self, body):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = (
+            f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode("latin-1")
+        self.writer.write(head + body)
+        await self.writer.drain()
+
+        response_head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = response_head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        await self.reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class LatencyRecorder:
+    """Latencies, status codes and transport errors of the measured requests"""
+
+    def __init__(self):
+        self.latencies = array("d")
+        self.statuses = Counter()
+        self.errors = Counter()
+        # Invalid payloads are expected to get 400
+        self.unexpected = 0
+
+    def record(self, status, latency, valid=True):
+        self.latencies.append(latency)
+        self.statuses[str(status)] += 1
+        expected = 201 if valid else 400
+        if status != expected:
+            self.unexpected += 1
+
+    def error(self, kind):
+        self.errors[kind] += 1
+
+    def summary(self, elapsed):
+        completed = len(self.latencies)
+        failed = sum(self.errors.values())
+        total = completed + failed
+        latencies = sorted(self.latencies)
+        return {
+            "requests": total,
+            "completed": completed,
+            "throughput_rps": round(completed / elapsed, 1) if elapsed else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+            "errors": dict(self.errors),
+            "error_rate": round((failed + self.unexpected) / total, 6) if total else 0.0,
+            "latency_ms": latency_summary(latencies),
+            "histogram": histogram(latencies),
+        }
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(-(-p * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(sorted_seconds):
+    if not sorted_seconds:
+        return {}
+    summary = {
+        "min": sorted_seconds[0],
+        "mean": sum(sorted_seconds) / len(sorted_seconds),
+    }
+    for p in PERCENTILES:
+        summary[f"p{p:g}".replace(".", "_")] = percentile(sorted_seconds, p)
+    summary["max"] = sorted_seconds[-1]
+    return {name: round(value * 1000, 3) for name, value in summary.items()}
+
+
+def histogram(sorted_seconds):
+    """Request counts per latency bucket, as [{le_ms, count}] with le_ms None for the overflow"""
+    buckets = []
+    i = 0
+    for bound in HISTOGRAM_BOUNDS_MS:
+        start = i
+        while i < len(sorted_seconds) and sorted_seconds[i] * 1000 <= bound:
+            i += 1
+        buckets.append({"le_ms": bound, "count": i - start})
+    buckets.append({"le_ms": None, "count": len(sorted_seconds) - i})
+    return buckets
+
+
+async def send(connection, factory, recorder, started, measure_from):
+    """One request; latency runs from `started` (the scheduled time in open-loop mode)"""
+    loop = asyncio.get_running_loop()
+    body, valid = factory.next()
+    try:
+        status = await connection.post(body)
+    except asyncio.TimeoutError:
+        connection.close()
+        if started >= measure_from:
+            recorder.error("timeout")
+        return
+    except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+        connection.close()
+        if started >= measure_from:
+            recorder.error(type(e).__name__)
+        return
+    if started >= measure_from:
+        recorder.record(status, loop.time() - started, valid)
+
+
+async def run_closed_loop(connections, factory, recorder, duration, warmup, max_requests):
+    """Every connection sends back to back until the deadline"""
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    deadline = measure_from + duration
+    sent = [0]
+
+    async def client(connection):
+        while loop.time() < deadline and (max_requests is None or sent[0] < max_requests):
+            sent[0] += 1
+            await send(connection, factory, recorder, loop.time(), measure_from)
+
+    await asyncio.gather(*(client(connection) for connection in connections))
+    return measure_from
+
+
+async def run_open_loop(connections, factory, recorder, duration, warmup, max_requests, rate):
+    """Requests start on a fixed schedule whether or not earlier ones have returned
+
+    Latency is measured from the scheduled start, so time spent waiting for a free
+    connection counts and a slow server cannot hide queueing (coordinated omission).
+    """
+    loop = asyncio.get_running_loop()
+    idle = asyncio.Queue()
+    for connection in connections:
+        idle.put_nowait(connection)
+
+    async def scheduled_send(scheduled):
+        connection = await idle.get()
+        try:
+            await send(connection, factory, recorder, scheduled, measure_from)
+        finally:
+            idle.put_nowait(connection)
+
+    start = loop.time()
+    measure_from = start + warmup
+    end = measure_from + duration
+    tasks = set()
+    i = 0
+    while max_requests is None or i < max_requests:
+        scheduled = start + i / rate
+        if scheduled >= end:
+            break
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.ensure_future(scheduled_send(scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        i += 1
+    if tasks:
+        await asyncio.gather(*tasks)
+    return measure_from
+
+
+async def run_load(url, mode="closed", concurrency=50, rate=None, duration=10.0, warmup=0.0,
+                   max_requests=None, timeout=10.0, invalid_ratio=0.0, seed=0):
+    """Run one load test against url; returns the report dict"""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    if mode == "open" and not rate:
+        raise ValueError("open-loop mode needs a request rate")
+
+    target = urlsplit(url)
+    factory = PayloadFactory(seed=seed, invalid_ratio=invalid_ratio)
+    recorder = LatencyRecorder()
+    connections = [
+        Connection(target.hostname, target.port or 80, target.path or "/", timeout)
+        for _ in range(concurrency)
+    ]
+
+    loop = asyncio.get_running_loop()
+    started_at = datetime.now().isoformat(timespec="seconds")
+    try:
+        if mode == "closed":
+            measure_from = await run_closed_loop(connections, factory, recorder, duration, warmup, max_requests)
+        else:
+            measure_from = await run_open_loop(connections, factory, recorder, duration, warmup, max_requests, rate)
+    finally:
+        for connection in connections:
+            connection.close()
+    elapsed = loop.time() - measure_from
+
+    report = {
+        "target": url,
+        "mode": mode,
+        "concurrency": concurrency,
+        "target_rate_rps": rate if mode == "open" else None,
+        "duration_s": round(elapsed, 3),
+        "warmup_s": warmup,
+        "invalid_ratio": invalid_ratio,
+        "started_at": started_at,
+    }
+    report.update(recorder.summary(elapsed))
+    return report
+
+
+class LocalServer:
+    """backend.server in a subprocess with a throwaway data directory"""
+
+    def __init__(self, port=0, frontend_dir=None):
+        self.port = port or free_port()
+        self.frontend_dir = frontend_dir
+        self.data_dir = tempfile.TemporaryDirectory(prefix="load-")
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/api/register"
+
+    def __enter__(self):
+        args = ["--port", str(self.port), "--data-dir", self.data_dir.name]
+        if self.frontend_dir:
+            args += ["--frontend-dir", self.frontend_dir]
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "backend.server"] + args,
+            cwd=PROJECT_DIR,
+            stdout=subprocess.DEVNULL,
+        )
+        wait_for_port("127.0.0.1", self.port, self.process)
+        return self
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait(timeout=10)
+        self.data_dir.cleanup()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(host, port, process, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Local server exited during startup")
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Local server did not start on port {port}")
+
+
+def print_report(report):
+    latency = report["latency_ms"]
+    print("\n" + "=" * 80)
+    print(f"LOAD TEST - {report['mode']}-loop, {report['concurrency']} connections")
+    print("=" * 80)
+    print(f"  • Target: {report['target']}")
+    print(f"  • Requests: {report['requests']:,} in {report['duration_s']:.1f}s "
+          f"({report['throughput_rps']:,.1f} req/s)")
+    print(f"  • Statuses: {report['statuses']}  Errors: {report['errors'] or 'none'}")
+    print(f"  • Error rate: {report['error_rate'] * 100:.2f}%")
+    if latency:
+        print(f"  • Latency ms: p50 {latency['p50']:.2f} | p95 {latency['p95']:.2f} | "
+              f"p99 {latency['p99']:.2f} | max {latency['max']:.2f}")
+    print("=" * 80 + "\n")
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Load test the registration submit endpoint")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--local", action="store_true",
+                        help="start backend.server on a free port with a temporary data dir and target it")
+    parser.add_argument("--mode", choices=MODES, default="closed")
+    parser.add_argument("--concurrency", type=int, default=50, help="client connections")
+    parser.add_argument("--rate", type=float, default=None, help="requests per second (open-loop mode)")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=0.0, help="unmeasured seconds before that")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument("--invalid-ratio", type=float, default=0.0,
+                        help="fraction of payloads built to fail validation (expect 400)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON report path (default: screenshots/runs/<ts>/load.json)")
+    args = parser.parse_args(argv)
+
+    def run(url):
+        print(f"🚀 {args.mode}-loop load on {url}: {args.concurrency} connections"
+              + (f", {args.rate:g} req/s" if args.mode == "open" else "")
+              + f", {args.warmup:g}s warmup + {args.duration:g}s")
+        return asyncio.run(run_load(
+            url, args.mode, args.concurrency, args.rate, args.duration, args.warmup,
+            args.requests, args.timeout, args.invalid_ratio, args.seed,
+        ))
+
+    try:
+        if args.local:
+            with LocalServer() as server:
+                report = run(server.url)
+        else:
+            report = run(args.url)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ ERROR: {e}")
+        return 1
+
+    print_report(report)
+    output = args.output or os.path.join(RUNS_ROOT, datetime.now().strftime("%Y%m%d_%H%M%S"), "load.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Report: {output}")
+    return 0 if report["error_rate"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+In-page state reset for registration.html
+Returns the form to its freshly loaded state in a single execute_script call, without navigating
+"""
+
+
+# Mirrors the reset done after a successful submission in handleFormSubmit()
+# plus what a fresh page load would give: placeholder-only dropdowns, default
+# phone placeholder, masked password fields and an empty alert container.
+RESET_PAGE_JS = """
+const form = document.getElementById('registrationForm');
+if (document.activeElement && document.activeElement !== document.body) {
+    document.activeElement.blur();
+}
+form.reset();
+
+if (typeof clearFormValidation === 'function') {
+    clearFormValidation();
+} else {
+    form.querySelectorAll('.valid, .invalid').forEach(el => el.classList.remove('valid', 'invalid'));
+    form.querySelectorAll('.error-message').forEach(el => { el.textContent = ''; });
+    const meter = document.querySelector('.strength-meter-fill');
+    if (meter) { meter.className = 'strength-meter-fill'; meter.style.width = '0'; }
+    const text = document.querySelector('.strength-text');
+    if (text) { text.className = 'strength-text'; text.textContent = ''; }
+}
+document.getElementById('alertContainer').innerHTML = '';
+
+const state = document.getElementById('state');
+const city = document.getElementById('city');
+state.innerHTML = '<option value="">Select State</option>';
+city.innerHTML = '<option value="">Select City</option>';
+state.disabled = true;
+city.disabled = true;
+if (typeof hideCitySearch === 'function') {
+    hideCitySearch();
+}
+
+document.getElementById('phone').placeholder = '+91 98765 43210';
+['password', 'confirmPassword'].forEach(id => { document.getElementById(id).type = 'password'; });
+
+if (typeof updateSubmitButton === 'function') {
+    updateSubmitButton();
+}
+window.scrollTo(0, 0);
+
+return document.getElementById('submitBtn').disabled
+    && form.querySelectorAll('.valid, .invalid').length === 0;
+"""
+
+
+def reset_page(driver):
+    """Reset registration.html in place; returns True when the page reports a clean state"""
+    return bool(driver.execute_script(RESET_PAGE_JS))
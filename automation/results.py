@@ -0,0 +1,432 @@
+"""
+Test Results
+Structured result records for flow steps: status, timing, soft assertions, warnings and
+artifacts. Records stream to JSONL as each step finishes, so a run in progress (or many
+parallel ones) can be followed and aggregated without scraping stdout, and finished runs
+are rendered as JUnit XML and HTML.
+
+Aggregate streams from several runs or machines (from automation/):
+    python results.py merge ../screenshots/runs/*/results.jsonl --junit junit.xml --html report.html
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+import time
+import traceback
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+
+PASSED = "passed"
+WARNING = "warning"
+FAILED = "failed"
+SKIPPED = "skipped"
+# Worst first: a flow takes the worst status of its steps
+SEVERITY = (FAILED, WARNING, PASSED, SKIPPED)
+
+JSONL_NAME = "results.jsonl"
+JUNIT_NAME = "junit.xml"
+HTML_NAME = "report.html"
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def new_run_id():
+    """Id for a run that has no run directory to be named after"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+
+
+def worst_status(statuses, default=PASSED):
+    statuses = set(statuses)
+    for status in SEVERITY:
+        if status in statuses:
+            return status
+    return default
+
+
+class JsonlSink:
+    """Appends one JSON record per line; O_APPEND keeps lines from concurrent processes whole"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def __call__(self, record):
+        # A single write() per record, so lines never interleave
+        os.write(self._fd, (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class ResultRecorder:
+    """Builds the step records of one flow and passes each finished record to the sinks
+
+    Flows call check(), warn() and artifact() from inside a step; they attach to the
+    step that is currently running. Every record carries the run id, so streams of many
+    runs can be merged without folding them together.
+    """
+
+    def __init__(self, flow, sinks=(), run_id=None):
+        self.flow = flow
+        self.run_id = run_id or new_run_id()
+        self.sinks = list(sinks)
+        self.steps = []
+        self.current = None
+        self.error = None
+        self.started = time.perf_counter()
+
+    def emit(self, record):
+        for sink in self.sinks:
+            sink(record)
+
+    def start(self, name):
+        self.current = {
+            "type": "step",
+            "run": self.run_id,
+            "flow": self.flow,
+            "name": name,
+            "status": PASSED,
+            "started_at": utc_now(),
+            "duration": 0.0,
+            "assertions": [],
+            "warnings": [],
+            "artifacts": [],
+            "_started": time.perf_counter(),
+        }
+        return self.current
+
+    def finish(self, record=None, error=None):
+        """Close a step: failed on an error or failed assertion, warning on warnings"""
+        record = record or self.current
+        record["duration"] = round(time.perf_counter() - record.pop("_started"), 3)
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        if error is not None or any(not a["passed"] for a in record["assertions"]):
+            record["status"] = FAILED
+        elif record["warnings"]:
+            record["status"] = WARNING
+        self.steps.append(record)
+        if record is self.current:
+            self.current = None
+        self.emit(record)
+        return record
+
+    def skip(self, name, reason="an earlier step failed"):
+        record = self.start(name)
+        record["status"] = SKIPPED
+        record["reason"] = reason
+        record["_started"] = time.perf_counter()
+        return self.finish(record)
+
+    def reuse(self, record):
+        """Report a step result from an earlier run without running the step"""
+        record = dict(record, run=self.run_id, flow=self.flow, cached=True)
+        self.steps.append(record)
+        self.emit(record)
+        return record
+
+    def run(self, name, func):
+        """Run one step; exceptions are printed and recorded, not raised"""
+        record = self.start(name)
+        try:
+            func()
+        except Exception as e:
+            traceback.print_exc(file=sys.stdout)
+            return self.finish(record, e)
+        return self.finish(record)
+
+    def run_steps(self, flow, steps):
+        """Run steps in order; steps share page state, so a step that raised skips the rest"""
+        aborted = False
+        for name in steps:
+            if aborted:
+                self.skip(name)
+                continue
+            aborted = "error" in self.run(name, getattr(flow, name))
+        return self.status
+
+    def check(self, condition, message, detail=None):
+        """Soft assertion: recorded on the current step, which then fails, but never raises"""
+        assertion = {"message": message, "passed": bool(condition)}
+        if detail is not None:
+            assertion["detail"] = str(detail)
+        if self.current is not None:
+            self.current["assertions"].append(assertion)
+        return bool(condition)
+
+    def warn(self, message):
+        if self.current is not None:
+            self.current["warnings"].append(message)
+
+    def artifact(self, path, kind="screenshot"):
+        if self.current is not None:
+            self.current["artifacts"].append({"kind": kind, "path": path})
+
+    @property
+    def assertions(self):
+        """Assertions recorded so far in the current step"""
+        return self.current["assertions"] if self.current is not None else []
+
+    @property
+    def status(self):
+        if self.error:
+            return FAILED
+        return worst_status((step["status"] for step in self.steps), default=PASSED)
+
+    def flow_record(self, **extra):
+        """The flow's summary record, also emitted to the sinks"""
+        record = {
+            "type": "flow",
+            "run": self.run_id,
+            "flow": self.flow,
+            "status": self.status,
+            "finished_at": utc_now(),
+            "duration": round(time.perf_counter() - self.started, 3),
+            "counts": {status: sum(1 for s in self.steps if s["status"] == status) for status in SEVERITY},
+        }
+        if self.error:
+            record["error"] = self.error
+        record.update(extra)
+        self.emit(record)
+        return record
+
+
+def summarize_flows(results):
+    return {
+        "flows": len(results),
+        "passed": sum(1 for r in results if r["status"] == PASSED),
+        "warnings": sum(1 for r in results if r["status"] == WARNING),
+        "failed": sum(1 for r in results if r["status"] == FAILED),
+        "steps": sum(len(r["steps"]) for r in results),
+    }
+
+
+def load_records(paths):
+    """Records from one or more JSONL streams; a torn last line of a live run is skipped"""
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+def build_report(records):
+    """{'summary', 'results'} in run_flows.py's shape from streamed records
+
+    One result per (run, flow). Flows still running (no flow record yet) are reported
+    with status 'running'. Records written before runs had ids share one run, and a flow
+    finished more than once there takes the worst of its statuses.
+    """
+    flows = {}
+    for record in records:
+        if "flow" not in record:
+            continue
+        key = (record.get("run"), record["flow"])
+        result = flows.get(key)
+        if result is None:
+            result = flows[key] = {"run": key[0], "flow": record["flow"], "status": "running",
+                                   "duration": 0.0, "steps": []}
+        if record.get("type") == "step":
+            result["steps"].append(record)
+        elif record.get("type") == "flow":
+            finished = result["status"] != "running"
+            status = result["status"]
+            result.update({k: v for k, v in record.items() if k not in ("type", "steps")})
+            if finished:
+                result["status"] = worst_status((status, record["status"]))
+    results = sorted(flows.values(), key=lambda r: (r["flow"], r["run"] or ""))
+    summary = summarize_flows(results)
+    summary["runs"] = len({r["run"] for r in results})
+    summary["serial_time"] = round(sum(r["duration"] for r in results), 3)
+    return {"summary": summary, "results": results}
+
+
+def result_name(result, report):
+    """The flow's name, prefixed with its run when the report spans several runs"""
+    if report["summary"].get("runs", 1) > 1 and result.get("run"):
+        return f"{result['run']}/{result['flow']}"
+    return result["flow"]
+
+
+def write_junit(path, report):
+    """JUnit XML: one testsuite per flow, one testcase per step"""
+    suites = ET.Element("testsuites")
+    for result in report["results"]:
+        steps = result["steps"]
+        suite = ET.SubElement(suites, "testsuite", {
+            "name": result_name(result, report),
+            "tests": str(len(steps)),
+            "failures": str(sum(1 for s in steps if s["status"] == FAILED)),
+            "skipped": str(sum(1 for s in steps if s["status"] == SKIPPED)),
+            "errors": "1" if result.get("error") else "0",
+            "time": f"{result.get('duration', 0):.3f}",
+        })
+        if result.get("error"):
+            case = ET.SubElement(suite, "testcase", {"classname": f"automation.{result['flow']}", "name": "setup"})
+            ET.SubElement(case, "error", {"message": result["error"]})
+        for step in steps:
+            case = ET.SubElement(suite, "testcase", {
+                "classname": f"automation.{result['flow']}",
+                "name": step["name"],
+                "time": f"{step.get('duration', 0):.3f}",
+            })
+            failed_checks = [a for a in step.get("assertions", []) if not a["passed"]]
+            if step["status"] == FAILED:
+                message = step.get("error") or failed_checks[0]["message"]
+                failure = ET.SubElement(case, "failure", {"message": message})
+                lines = [step["error"]] if step.get("error") else []
+                lines += [f"✗ {a['message']}" + (f": {a['detail']}" if a.get("detail") else "") for a in failed_checks]
+                failure.text = "\n".join(lines)
+            elif step["status"] == SKIPPED:
+                ET.SubElement(case, "skipped", {"message": step.get("reason", "")})
+            output = [f"WARNING: {w}" for w in step.get("warnings", [])]
+            output += [f"{a['kind']}: {a['path']}" for a in step.get("artifacts", [])]
+            if output:
+                ET.SubElement(case, "system-out").text = "\n".join(output)
+    ET.indent(suites)
+    ET.ElementTree(suites).write(path, encoding="utf-8", xml_declaration=True)
+
+
+HTML_STYLE = """
+body { font-family: system-ui, sans-serif; margin: 2rem; color: #1f2937; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 2rem; }
+th, td { border-bottom: 1px solid #e5e7eb; padding: .4rem .6rem; text-align: left; vertical-align: top; }
+.passed { color: #059669; } .warning { color: #d97706; } .failed { color: #dc2626; }
+.skipped, .running { color: #6b7280; }
+img { max-width: 240px; border: 1px solid #e5e7eb; margin: .2rem; }
+ul { margin: 0; padding-left: 1.1rem; }
+"""
+
+
+def write_html(path, report, title="Automation Run"):
+    """Self-contained HTML report; artifact links are relative to the report's directory"""
+    base = os.path.dirname(os.path.abspath(path))
+    esc = html.escape
+    summary = report["summary"]
+    parts = [
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{esc(title)}</title>",
+        f"<style>{HTML_STYLE}</style></head><body><h1>{esc(title)}</h1>",
+        f"<p><span class='passed'>{summary['passed']} passed</span> · "
+        f"<span class='warning'>{summary.get('warnings', 0)} with warnings</span> · "
+        f"<span class='failed'>{summary['failed']} failed</span> of {summary['flows']} flows, "
+        f"{summary['steps']} steps</p>",
+    ]
+    for result in report["results"]:
+        parts.append(f"<h2 class='{esc(result['status'])}'>{esc(result_name(result, report))} — {esc(result['status'])} "
+                     f"({result.get('duration', 0):.2f}s)</h2>")
+        if result.get("error"):
+            parts.append(f"<p class='failed'>{esc(result['error'])}</p>")
+        parts.append("<table><tr><th>Step</th><th>Status</th><th>Time</th><th>Checks</th><th>Artifacts</th></tr>")
+        for step in result["steps"]:
+            notes = [f"<li class='{'passed' if a['passed'] else 'failed'}'>{'✓' if a['passed'] else '✗'} "
+                     f"{esc(a['message'])}</li>" for a in step.get("assertions", [])]
+            notes += [f"<li class='warning'>⚠️ {esc(w)}</li>" for w in step.get("warnings", [])]
+            if step.get("error"):
+                notes.append(f"<li class='failed'>{esc(step['error'])}</li>")
+            artifacts = []
+            for artifact in step.get("artifacts", []):
+                href = esc(os.path.relpath(artifact["path"], base))
+                if artifact["path"].endswith(".png"):
+                    artifacts.append(f"<a href='{href}'><img src='{href}' loading='lazy'></a>")
+                else:
+                    artifacts.append(f"<a href='{href}'>{esc(os.path.basename(artifact['path']))}</a>")
+            parts.append(
+                f"<tr><td>{esc(step['name'])}</td><td class='{esc(step['status'])}'>{esc(step['status'])}</td>"
+                f"<td>{step.get('duration', 0):.2f}s</td><td><ul>{''.join(notes)}</ul></td>"
+                f"<td>{''.join(artifacts)}</td></tr>"
+            )
+        parts.append("</table>")
+    parts.append("</body></html>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+
+
+def print_flow_summary(recorder):
+    """End-of-flow banner for standalone runs, reflecting what actually happened"""
+    print("\n" + "=" * 80)
+    print(f"{recorder.flow.upper()} RESULTS")
+    print("=" * 80)
+    for step in recorder.steps:
+        icon = {PASSED: "✓", WARNING: "⚠️ ", FAILED: "✗", SKIPPED: "-"}[step["status"]]
+        print(f"  {icon} {step['name']} ({step['duration']:.2f}s)")
+        for assertion in step["assertions"]:
+            if not assertion["passed"]:
+                print(f"      ✗ {assertion['message']}")
+        for warning in step["warnings"]:
+            print(f"      ⚠️  {warning}")
+        if step.get("error"):
+            print(f"      {step['error']}")
+    if recorder.error:
+        print(f"  ✗ {recorder.error}")
+
+    status = recorder.status
+    if status == PASSED:
+        print("\n" + "🎉 " * 20)
+        print("ALL TESTS PASSED!")
+        print("🎉 " * 20 + "\n")
+    elif status == WARNING:
+        print("\n⚠️  PASSED WITH WARNINGS\n")
+    else:
+        print("\n❌ TESTS FAILED\n")
+
+
+def run_standalone(flow):
+    """Run a flow on its own, streaming results next to its screenshots; returns the exit code"""
+    sink = JsonlSink(os.path.join(flow.screenshots_dir, JSONL_NAME))
+    flow.results.sinks.append(sink)
+    try:
+        flow.setup()
+        flow.results.run_steps(flow, flow.STEPS)
+    except Exception as e:
+        print(f"\n❌ ERROR: {str(e)}")
+        traceback.print_exc(file=sys.stdout)
+        flow.results.error = f"setup: {type(e).__name__}: {e}"
+    finally:
+        flow.teardown()
+        flow.results.flow_record()
+        sink.close()
+    print_flow_summary(flow.results)
+    return 1 if flow.results.status == FAILED else 0
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Aggregate streamed flow results")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge = commands.add_parser("merge", help="combine results.jsonl streams into reports")
+    merge.add_argument("streams", nargs="+")
+    merge.add_argument("--json", default=None, help="write the combined report as JSON")
+    merge.add_argument("--junit", default=None)
+    merge.add_argument("--html", default=None)
+    args = parser.parse_args(argv)
+
+    report = build_report(load_records(args.streams))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.junit:
+        write_junit(args.junit, report)
+    if args.html:
+        write_html(args.html, report)
+
+    summary = report["summary"]
+    print(f"✓ {summary['passed']} passed, ⚠️  {summary['warnings']} with warnings, "
+          f"✗ {summary['failed']} failed ({summary['flows']} flows, {summary['steps']} steps)")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
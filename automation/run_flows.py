@@ -0,0 +1,430 @@
+"""
+Parallel Flow Runner
+Runs every automation flow at the same time in a pool of worker processes,
+each with its own headless Chrome pinned to its own CPU core
+"""
+
+import argparse
+import contextlib
+import glob
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing.util import Finalize
+
+from selenium.common.exceptions import WebDriverException
+
+from browser_metrics import BrowserMetrics, format_step_metrics
+from emulation import PROFILES, apply_profile, clear_profile, print_profile_report, summarize_profiles
+from impact_cache import ImpactCache, ScriptCoverage
+from results import (
+    FAILED, HTML_NAME, JSONL_NAME, JUNIT_NAME, PASSED, WARNING, JsonlSink, ResultRecorder,
+    summarize_flows, utc_now, write_html, write_junit,
+)
+from screenshot_store import apply_retention, flush_store
+from visual_diff import BASELINES_DIR, compare_run, print_report as print_visual_report
+from session_pool import DriverPool
+from timing import (
+    CATEGORY_FLOW, CATEGORY_SETUP, StepTimer, instrument_driver, instrument_flow, now_us,
+    print_summary, summarize, uninstrument_driver, write_timing, write_trace,
+)
+
+
+AUTOMATION_DIR = os.path.dirname(os.path.abspath(__file__))
+SCREENSHOTS_ROOT = os.path.normpath(os.path.join(AUTOMATION_DIR, os.pardir, "screenshots"))
+DEFAULT_URL = "http://localhost:8000/registration.html"
+
+# Per-process state set up by init_worker()
+_worker = {"core": None, "pool": None}
+
+
+def discover_flows():
+    """Map flow names ('flow_a', 'flow_b', ...) to their test classes from test_flow_*.py"""
+    if AUTOMATION_DIR not in sys.path:
+        sys.path.insert(0, AUTOMATION_DIR)
+
+    flows = {}
+    for path in sorted(glob.glob(os.path.join(AUTOMATION_DIR, "test_flow_*.py"))):
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        module = importlib.import_module(module_name)
+        for obj in vars(module).values():
+            if isinstance(obj, type) and obj.__module__ == module_name and hasattr(obj, "STEPS"):
+                flows["flow_" + module_name.split("_")[2]] = obj
+    return flows
+
+
+def available_cores():
+    """CPU cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def pin_to_core(core):
+    """Pin the current worker (and the Chrome it launches) to a single core where supported"""
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core})
+
+
+def init_worker(cores, counter, headless, max_uses, max_memory_mb):
+    """Pool initializer: claim a core, then pre-launch this worker's warm Chrome on it"""
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+    core = cores[slot % len(cores)]
+    pin_to_core(core)
+
+    pool = DriverPool(size=1, headless=headless, max_uses=max_uses, max_memory_mb=max_memory_mb)
+    pool.start()
+    # Runs when the worker process exits, where atexit handlers are skipped
+    Finalize(pool, pool.close, exitpriority=10)
+    _worker.update(core=core, pool=pool)
+
+
+def run_flow(flow_name, flow_cls, url, flow_dir, headless=True, options=None, results_path=None,
+             cached_steps=(), profile=None, run_id=None):
+    """Worker entry point: run one flow's steps in order and return its result record
+
+    Every step, WebDriver command, wait and screenshot is timed; the flow's spans are
+    written to trace.json and timing.json in flow_dir and returned under "trace".
+    Each step record also carries the browser-side metrics measured during it and the
+    inputs it depended on, and is appended to results_path (JSONL) as soon as the step
+    finishes. Steps in cached_steps are reported from there instead of being run.
+    With a profile (see emulation.py) the browser is throttled from before the first
+    page load until teardown. Records are tagged with run_id.
+    """
+    os.makedirs(flow_dir, exist_ok=True)
+    pool = _worker["pool"]
+    timer = StepTimer(process_name=f"worker {os.getpid()} (core {_worker['core']})")
+    flow_started_us = now_us()
+    sink = JsonlSink(results_path) if results_path else None
+
+    result = {
+        "flow": flow_name,
+        "status": PASSED,
+        "worker_pid": os.getpid(),
+        "core": _worker["core"],
+        "screenshots_dir": flow_dir,
+        "profile": profile,
+        "steps": [],
+    }
+    started = time.perf_counter()
+
+    with open(os.path.join(flow_dir, "output.log"), "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log):
+        flow = flow_cls(url, screenshots_dir=flow_dir, headless=headless, **(options or {}))
+        # Named after the task, so shards of one flow report separately
+        recorder = flow.results = ResultRecorder(flow_name, [sink] if sink else [], run_id)
+        result["steps"] = recorder.steps
+        cached = {record["name"]: record for record in cached_steps}
+        failed = False
+        driver = None
+        metrics = None
+        coverage = None
+        try:
+            setup_started = time.perf_counter()
+            with timer.span("setup", CATEGORY_SETUP):
+                driver = pool.acquire() if pool else None
+                if driver is not None:
+                    instrument_driver(driver, timer)
+                flow.setup(driver)
+            if driver is None:
+                instrument_driver(flow.driver, timer)
+            instrument_flow(flow, timer)
+            metrics = BrowserMetrics(flow.driver).install()
+            coverage = ScriptCoverage(flow.driver).install()
+            if profile:
+                apply_profile(flow.driver, profile)
+            result["setup_duration"] = round(time.perf_counter() - setup_started, 3)
+        except Exception as e:
+            traceback.print_exc(file=log)
+            recorder.error = result["error"] = f"setup: {type(e).__name__}: {e}"
+            failed = True
+
+        for step in flow_cls.STEPS:
+            # Steps share page state, so an exception makes the remaining steps meaningless
+            if failed:
+                recorder.skip(step)
+                continue
+            if step in cached:
+                recorder.reuse(cached[step])
+                continue
+
+            # Metrics are best effort: a crashed page must not hide the step's own error
+            with contextlib.suppress(WebDriverException):
+                metrics.begin()
+            record = recorder.start(step)
+            error = None
+            try:
+                getattr(flow, step)()
+            except Exception as e:
+                traceback.print_exc(file=log)
+                error = e
+                failed = True
+            with contextlib.suppress(WebDriverException):
+                record["browser"] = metrics.end()
+            # Without recorded dependencies the step is never reused from the cache
+            with contextlib.suppress(WebDriverException):
+                record["depends_on"] = coverage.step_dependencies(record)
+            recorder.finish(record, error)
+
+        # Either may be missing after a failed setup, and a dead session must not crash the worker
+        if metrics is not None:
+            result["navigations"] = metrics.navigations
+            with contextlib.suppress(WebDriverException):
+                metrics.uninstall()
+        if coverage is not None:
+            with contextlib.suppress(WebDriverException):
+                coverage.uninstall()
+        if profile and flow.driver is not None:
+            with contextlib.suppress(WebDriverException):
+                clear_profile(flow.driver)
+
+        try:
+            with timer.span("teardown", CATEGORY_SETUP):
+                flow.teardown()
+        except Exception:
+            traceback.print_exc(file=log)
+        if driver is not None:
+            pool.release(uninstrument_driver(driver))
+        # Screenshots are written in the background; the result must point at real files
+        flush_store()
+
+    result["status"] = recorder.status
+    result["duration"] = round(time.perf_counter() - started, 3)
+    recorder.flow_record(duration=result["duration"], worker_pid=result["worker_pid"], core=result["core"])
+    if sink:
+        sink.close()
+
+    timer.record(flow_name, CATEGORY_FLOW, flow_started_us, now_us() - flow_started_us,
+                 {"status": result["status"]})
+    trace = timer.trace_events()
+    write_trace(os.path.join(flow_dir, "trace.json"), trace)
+    write_timing(os.path.join(flow_dir, "timing.json"), trace)
+    result["trace"] = trace
+    return result
+
+
+def plan_tasks(flows, selected, shards=1, generated=None, profiles=(None,)):
+    """(task name, flow class, constructor options, emulation profile) for each unit of work
+
+    Shardable flows are split into `shards` tasks with a deterministic shard index.
+    Every task is repeated for each emulation profile ('flow_b@3g').
+    """
+    tasks = []
+    for profile in profiles:
+        suffix = f"@{profile}" if profile else ""
+        for name in selected:
+            flow_cls = flows[name]
+            if not getattr(flow_cls, "SHARDABLE", False):
+                tasks.append((name + suffix, flow_cls, {}, profile))
+                continue
+            for index in range(shards):
+                options = {"shard_index": index, "shard_count": shards, "generated": generated}
+                task_name = name if shards == 1 else f"{name}.{index + 1}of{shards}"
+                tasks.append((task_name + suffix, flow_cls, options, profile))
+    return tasks
+
+
+def run_tasks(tasks, args, run_dir, results_path, sink, run_id=None):
+    """Run (name, flow class, options, profile, cached steps) tasks in the worker pool; returns their results"""
+    cores = available_cores()
+    workers = args.workers or min(len(tasks), len(cores))
+    results = []
+    initargs = (cores, multiprocessing.Value("i", 0), not args.headed, args.max_uses, args.max_memory_mb)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as pool:
+        futures = {
+            pool.submit(
+                run_flow, name, flow_cls, args.url, os.path.join(run_dir, name), not args.headed, options,
+                results_path, cached_steps, profile, run_id,
+            ): name
+            for name, flow_cls, options, profile, cached_steps in tasks
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                crashed = {
+                    "run": run_id, "flow": name, "status": FAILED, "core": None, "duration": 0.0,
+                    "steps": [], "error": f"worker: {type(e).__name__}: {e}",
+                }
+                results.append(crashed)
+                sink(dict(crashed, type="flow"))
+    return results
+
+
+def cached_result(flow_name, records, sink, run_id=None):
+    """Result record of a task whose every step is reused from the impact cache"""
+    recorder = ResultRecorder(flow_name, [sink], run_id)
+    for record in records:
+        recorder.reuse(record)
+    result = {"flow": flow_name, "status": recorder.status, "core": None, "duration": 0.0,
+              "cached": True, "steps": recorder.steps}
+    recorder.flow_record(duration=0.0, cached=True)
+    return result
+
+
+def merge_results(results, wall_time):
+    """Combine per-flow results into one run summary"""
+    results = sorted(results, key=lambda r: r["flow"])
+    summary = summarize_flows(results)
+    summary.update(serial_time=round(sum(r["duration"] for r in results), 3), wall_time=round(wall_time, 3),
+                   cached_steps=sum(1 for r in results for step in r["steps"] if step.get("cached")))
+    return {"summary": summary, "results": results}
+
+
+def print_report(report):
+    """Print the merged run summary"""
+    print("=" * 80)
+    print("PARALLEL FLOW RUN")
+    print("=" * 80)
+    for result in report["results"]:
+        icon = {PASSED: "✓", WARNING: "⚠️ "}.get(result["status"], "✗")
+        if result.get("cached"):
+            print(f"\n{icon} {result['flow']} (cached, inputs unchanged)")
+        else:
+            print(f"\n{icon} {result['flow']} ({result['duration']:.2f}s, core {result['core']})")
+        for step in result["steps"]:
+            if step.get("cached"):
+                print(f"    - {step['name']}: {step['status']} (cached)")
+                continue
+            print(f"    - {step['name']}: {step['status']} ({step['duration']:.2f}s)")
+            if step.get("browser"):
+                print(f"      {format_step_metrics(step['browser'])}")
+            for assertion in step.get("assertions", []):
+                if not assertion["passed"]:
+                    print(f"      ✗ {assertion['message']}")
+            for warning in step.get("warnings", []):
+                print(f"      ⚠️  {warning}")
+            if step.get("error"):
+                print(f"      {step['error']}")
+        if result.get("error"):
+            print(f"    - {result['error']}")
+
+    summary = report["summary"]
+    print("\n" + "-" * 80)
+    print(f"Flows passed: {summary['passed']}/{summary['flows']}"
+          + (f" ({summary['warnings']} more with warnings)" if summary["warnings"] else ""))
+    if summary["cached_steps"]:
+        print(f"Steps reused from cache: {summary['cached_steps']}/{summary['steps']} (--force to rerun)")
+    print(f"Wall time: {summary['wall_time']:.2f}s (sum of flow times: {summary['serial_time']:.2f}s)")
+    print("-" * 80 + "\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run automation flows in parallel")
+    parser.add_argument("flows", nargs="*", help="flow names to run, e.g. flow_a flow_c (default: all)")
+    parser.add_argument("--url", default=DEFAULT_URL, help="registration page URL")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--headed", action="store_true", help="show the browser windows")
+    parser.add_argument("--output", default=None, help="run output directory (default: screenshots/runs/<timestamp>)")
+    parser.add_argument("--shards", type=int, default=1, help="split shardable flows (e.g. flow_d) into N tasks")
+    parser.add_argument("--generated", default=None,
+                        help="synthetic location dataset for shardable flows, COUNTRIESxSTATESxCITIES")
+    parser.add_argument("--max-uses", type=int, default=25, help="recycle a pooled browser after this many flows")
+    parser.add_argument("--max-memory-mb", type=int, default=1024, help="recycle a pooled browser above this RSS")
+    parser.add_argument("--no-visual", action="store_true",
+                        help="skip comparing screenshots with screenshots/baselines/")
+    parser.add_argument("--keep-days", type=float, default=30,
+                        help="evict screenshots/runs/ older than this after the run")
+    parser.add_argument("--max-screenshots-mb", type=float, default=2048,
+                        help="evict the oldest runs while screenshots/runs/ is larger than this")
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES), default=None,
+                        help="run every flow under this emulation profile; repeat to compare profiles")
+    parser.add_argument("--force", action="store_true",
+                        help="run every step, even when its inputs match a cached result")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+
+    flows = discover_flows()
+    selected = args.flows or sorted(flows)
+    unknown = [name for name in selected if name not in flows]
+    if unknown:
+        print(f"❌ Unknown flows: {', '.join(unknown)} (available: {', '.join(sorted(flows))})")
+        return 2
+
+    run_dir = args.output or os.path.join(SCREENSHOTS_ROOT, "runs", datetime.now().strftime("%Y%m%d_%H%M%S"))
+    os.makedirs(run_dir, exist_ok=True)
+    # Tags every record, so merged streams of several runs stay apart
+    run_id = os.path.basename(os.path.normpath(run_dir))
+
+    generated = tuple(int(n) for n in args.generated.lower().split("x")) if args.generated else None
+    tasks = plan_tasks(flows, selected, max(1, args.shards), generated, args.profile or (None,))
+
+    # Every worker appends its step records here as they finish: follow it with tail -f
+    results_path = os.path.join(run_dir, JSONL_NAME)
+    run_sink = JsonlSink(results_path)
+    run_sink({"type": "run", "run": run_id, "event": "started", "at": utc_now(),
+              "tasks": [task[0] for task in tasks]})
+
+    started = time.perf_counter()
+    results = []
+    cache = ImpactCache()
+    pending = []
+    for name, flow_cls, options, profile in tasks:
+        # Profile runs are measurements: their timings are the point, so never reuse them
+        run_count, cached_steps = (len(flow_cls.STEPS), []) if args.force or profile else \
+            cache.plan(name, flow_cls, options, args.url)
+        if run_count == 0:
+            results.append(cached_result(name, cached_steps, run_sink, run_id))
+        else:
+            pending.append((name, flow_cls, options, profile, cached_steps))
+
+    # No browsers are launched when every task is reused from the cache
+    if pending:
+        results += run_tasks(pending, args, run_dir, results_path, run_sink, run_id)
+
+    # Record what each step depended on, for the next run to reuse
+    for name, flow_cls, options, _, _ in pending:
+        result = next(r for r in results if r["flow"] == name)
+        if result["steps"]:
+            cache.store(name, flow_cls, options, args.url, result)
+
+    # Spans go to the run's trace files rather than results.json
+    trace = [event for result in results for event in result.pop("trace", [])]
+    write_trace(os.path.join(run_dir, "trace.json"), trace)
+    write_timing(os.path.join(run_dir, "timing.json"), trace)
+
+    report = merge_results(results, time.perf_counter() - started)
+    if args.profile:
+        report["profiles"] = summarize_profiles(report["results"])
+    if not args.no_visual and os.path.isdir(BASELINES_DIR):
+        report["visual"] = compare_run(run_dir)
+    with open(os.path.join(run_dir, "results.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    write_junit(os.path.join(run_dir, JUNIT_NAME), report)
+    write_html(os.path.join(run_dir, HTML_NAME), report, title=f"Flow run {os.path.basename(run_dir)}")
+    run_sink({"type": "run", "run": run_id, "event": "finished", "at": utc_now(), "summary": report["summary"]})
+    run_sink.close()
+
+    print_report(report)
+    if "visual" in report:
+        print_visual_report(report["visual"])
+    if args.profile:
+        print_profile_report(report["profiles"], args.profile)
+    print("STEP TIMING (all flows)")
+    print_summary(summarize(trace))
+    print(f"\nResults written to {os.path.join(run_dir, 'results.json')} "
+          f"({JSONL_NAME}, {JUNIT_NAME} and {HTML_NAME} alongside)")
+    print(f"Trace written to {os.path.join(run_dir, 'trace.json')} (open in chrome://tracing or ui.perfetto.dev)\n")
+
+    evicted = apply_retention(SCREENSHOTS_ROOT, args.keep_days, args.max_screenshots_mb, protect=[run_dir])
+    if evicted:
+        print(f"🗑️  Evicted {len(evicted)} old runs from {os.path.join(SCREENSHOTS_ROOT, 'runs')}\n")
+    visual_failed = report.get("visual", {}).get("summary", {}).get("failed", 0)
+    return 0 if report["summary"]["failed"] == 0 and not visual_failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
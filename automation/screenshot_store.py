@@ -0,0 +1,302 @@
+"""
+Screenshot Store
+Takes screenshot encoding and disk writes off the flow's thread. The browser frame is
+captured synchronously (it must reflect the page at that moment), then a background
+thread pool decodes it and stores it content-addressed under screenshots/objects/.
+The named file a flow asks for is a hard link to that object, so identical frames
+from repeated runs are written and stored once.
+
+Retention (from automation/):
+    python screenshot_store.py prune --max-age-days 14 --max-total-mb 2048
+    python screenshot_store.py dedupe      # link existing identical PNGs to one object
+    python screenshot_store.py stats
+"""
+
+import argparse
+import atexit
+import base64
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+
+
+AUTOMATION_DIR = os.path.dirname(os.path.abspath(__file__))
+SCREENSHOTS_ROOT = os.path.normpath(os.path.join(AUTOMATION_DIR, os.pardir, "screenshots"))
+OBJECTS_DIR_NAME = "objects"
+RUNS_DIR_NAME = "runs"
+
+DEFAULT_WORKERS = 2
+# Objects younger than this are never garbage collected: a background write may not
+# have linked them into their run yet
+GC_GRACE_SECONDS = 600
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def sha256_hex(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def link_or_copy(source, path):
+    """Point path at source with a hard link, copying where links are unsupported"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(source, tmp_path)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class ScreenshotStore:
+    """Content-addressed PNG store with background writes
+
+    capture() returns as soon as the browser has handed over the frame; flush() waits
+    for every queued write.
+    """
+
+    def __init__(self, root=SCREENSHOTS_ROOT, workers=DEFAULT_WORKERS):
+        self.root = root
+        self.objects_dir = os.path.join(root, OBJECTS_DIR_NAME)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screenshot")
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.stats = {"captured": 0, "written": 0, "deduplicated": 0, "bytes_written": 0, "failed": 0}
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.png")
+
+    def capture(self, driver, directory, name):
+        """Grab the current frame and queue it for <directory>/<timestamp>_<name>.png; returns that path"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(directory, f"{timestamp}_{name}.png")
+        self.submit(driver.get_screenshot_as_base64(), path)
+        return path
+
+    def submit(self, png, path):
+        """Queue PNG bytes (or WebDriver's base64 string) to be stored at path"""
+        future = self._executor.submit(self.write, png, path)
+        with self._lock:
+            self.stats["captured"] += 1
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+            if future.exception() is not None:
+                self.stats["failed"] += 1
+        if future.exception() is not None:
+            print(f"  ⚠️  Screenshot write failed: {future.exception()!r}")
+
+    def write(self, png, path):
+        """Store synchronously; returns the object's digest"""
+        if isinstance(png, str):
+            png = base64.b64decode(png)
+        digest = sha256_hex(png)
+        object_path = self.object_path(digest)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        # Existing object: just link it. It can be garbage collected between the check
+        # and the link, in which case it is written again.
+        for _ in range(2):
+            if os.path.exists(object_path):
+                try:
+                    link_or_copy(object_path, path)
+                except FileNotFoundError:
+                    continue
+                with self._lock:
+                    self.stats["deduplicated"] += 1
+                return digest
+            self._write_object(object_path, png)
+            link_or_copy(object_path, path)
+            with self._lock:
+                self.stats["written"] += 1
+                self.stats["bytes_written"] += len(png)
+            return digest
+        raise OSError(f"Could not store {path}")
+
+    def _write_object(self, object_path, png):
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        tmp_path = f"{object_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png)
+        os.replace(tmp_path, object_path)
+
+    def flush(self, timeout=None):
+        """Wait for queued writes; returns how many are still pending"""
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return len(not_done)
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+def get_store(root=SCREENSHOTS_ROOT):
+    """Process-wide store shared by every flow, flushed at interpreter exit"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ScreenshotStore(root)
+            atexit.register(_store.close)
+        return _store
+
+
+def flush_store(timeout=None):
+    """Flush the process-wide store if one was created"""
+    return _store.flush(timeout) if _store is not None else 0
+
+
+def tree_size(path, seen):
+    """Bytes under path, counting each hard-linked inode once across calls"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                st = os.lstat(os.path.join(dirpath, filename))
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                total += st.st_size
+    return total
+
+
+def collect_garbage(root=SCREENSHOTS_ROOT, grace_seconds=GC_GRACE_SECONDS, now=None):
+    """Delete objects nothing links to any more; returns (objects removed, bytes freed)"""
+    now = now or time.time()
+    removed = freed = 0
+    for dirpath, _, filenames in os.walk(os.path.join(root, OBJECTS_DIR_NAME)):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if st.st_nlink <= 1 and now - st.st_mtime > grace_seconds:
+                os.remove(path)
+                removed += 1
+                freed += st.st_size
+        if dirpath != os.path.join(root, OBJECTS_DIR_NAME) and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    return removed, freed
+
+
+def apply_retention(root=SCREENSHOTS_ROOT, max_age_days=None, max_total_mb=None, protect=(), now=None):
+    """Evict whole runs under screenshots/runs/, oldest first
+
+    A run goes when it is older than max_age_days, or while the runs plus the object
+    store exceed max_total_mb. Runs in protect (e.g. the one just finished) are kept.
+    Returns the evicted run directories.
+    """
+    now = now or time.time()
+    runs_dir = os.path.join(root, RUNS_DIR_NAME)
+    if not os.path.isdir(runs_dir):
+        return []
+    protect = {os.path.realpath(p) for p in protect}
+    runs = sorted(
+        (os.path.getmtime(path), path)
+        for path in (os.path.join(runs_dir, name) for name in os.listdir(runs_dir))
+        if os.path.isdir(path) and os.path.realpath(path) not in protect
+    )
+
+    evicted = []
+    if max_age_days is not None:
+        cutoff = now - max_age_days * 86400
+        for mtime, path in list(runs):
+            if mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                evicted.append(path)
+                runs.remove((mtime, path))
+        collect_garbage(root, now=now)
+
+    if max_total_mb is not None:
+        limit = max_total_mb * 1024 * 1024
+        while runs and tree_size(runs_dir, set()) + _unlinked_object_bytes(root) > limit:
+            _, path = runs.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            evicted.append(path)
+            collect_garbage(root, now=now)
+    return evicted
+
+
+def _unlinked_object_bytes(root):
+    # Objects not linked from anywhere else: they are not counted by tree_size(runs)
+    total = 0
+    for dirpath, _, filenames in os.walk(os.path.join(root, OBJECTS_DIR_NAME)):
+        for filename in filenames:
+            try:
+                st = os.stat(os.path.join(dirpath, filename))
+            except OSError:
+                continue
+            if st.st_nlink <= 1:
+                total += st.st_size
+    return total
+
+
+def dedupe(root=SCREENSHOTS_ROOT):
+    """Replace every PNG under root with a link to its object; returns (files, bytes saved)"""
+    store = ScreenshotStore(root)
+    files = saved = 0
+    objects_dir = os.path.realpath(store.objects_dir)
+    for dirpath, _, filenames in os.walk(root):
+        if os.path.realpath(dirpath).startswith(objects_dir):
+            continue
+        for filename in filenames:
+            if not filename.endswith(".png"):
+                continue
+            path = os.path.join(dirpath, filename)
+            if os.stat(path).st_nlink > 1:
+                continue
+            with open(path, "rb") as f:
+                png = f.read()
+            deduplicated = store.stats["deduplicated"]
+            store.write(png, path)
+            files += 1
+            if store.stats["deduplicated"] > deduplicated:
+                saved += len(png)
+    store.close()
+    return files, saved
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Screenshot store maintenance")
+    parser.add_argument("--root", default=SCREENSHOTS_ROOT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    prune = commands.add_parser("prune", help="evict old runs and unreferenced objects")
+    prune.add_argument("--max-age-days", type=float, default=None)
+    prune.add_argument("--max-total-mb", type=float, default=None)
+    commands.add_parser("dedupe", help="store existing screenshots content-addressed")
+    commands.add_parser("stats", help="show store size")
+    args = parser.parse_args(argv)
+
+    if args.command == "prune":
+        evicted = apply_retention(args.root, args.max_age_days, args.max_total_mb)
+        removed, freed = collect_garbage(args.root)
+        for path in evicted:
+            print(f"🗑️  Evicted {path}")
+        print(f"✓ Evicted {len(evicted)} runs, removed {removed} unreferenced objects ({freed / 1e6:.1f} MB)")
+    elif args.command == "dedupe":
+        files, saved = dedupe(args.root)
+        print(f"✓ Stored {files} screenshots content-addressed, {saved / 1e6:.1f} MB of duplicates shared")
+    else:
+        objects = sum(len(f) for _, _, f in os.walk(os.path.join(args.root, OBJECTS_DIR_NAME)))
+        print(f"  • Objects: {objects}")
+        print(f"  • Total size: {tree_size(args.root, set()) / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
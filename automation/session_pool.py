@@ -0,0 +1,174 @@
+"""
+WebDriver Session Pool
+Hands out warm, pre-launched Chrome sessions and resets them between uses
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+from driver_factory import create_driver
+
+try:
+    import psutil
+except ImportError:  # optional: memory-based recycling is skipped without it
+    psutil = None
+
+
+CLEAR_STORAGE_JS = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+def driver_memory_mb(driver):
+    """Resident memory of chromedriver and its browser processes, or None without psutil"""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except (psutil.Error, AttributeError):
+        return None
+
+
+class DriverPool:
+    """Pool of reusable Chrome WebDriver sessions
+
+    Drivers are recycled (quit and replaced) after max_uses checkouts or when the
+    browser's resident memory grows past max_memory_mb.
+    """
+
+    def __init__(self, size=1, headless=True, max_uses=25, max_memory_mb=1024, factory=None):
+        self.size = size
+        self.headless = headless
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.factory = factory or (lambda: create_driver(self.headless))
+        self._idle = queue.LifoQueue()
+        self._uses = {}
+        # Drivers alive or being launched; only changed under the lock, so concurrent
+        # acquires can never launch more than size of them
+        self._launched = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """Pre-launch the pool's drivers in parallel"""
+        threads = [threading.Thread(target=self._launch) for _ in range(self.size) if self._claim_slot()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self
+
+    def _claim_slot(self):
+        """Count a driver about to be launched; False when the pool is already full"""
+        with self._lock:
+            if self._launched >= self.size:
+                return False
+            self._launched += 1
+            return True
+
+    def _launch(self):
+        """Launch a driver into a slot taken with _claim_slot(), giving it back on failure"""
+        try:
+            driver = self.factory()
+        except BaseException:
+            with self._lock:
+                self._launched -= 1
+            raise
+        with self._lock:
+            self._uses[id(driver)] = 0
+        self._idle.put(driver)
+
+    def acquire(self, timeout=None):
+        """Check out a warm driver, launching one if none is idle"""
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        if self._claim_slot():
+            self._launch()
+        return self._idle.get(timeout=timeout)
+
+    def release(self, driver):
+        """Return a driver to the pool, resetting or recycling it"""
+        with self._lock:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            uses = self._uses[id(driver)]
+
+        if self._closed:
+            self._discard(driver)
+            return
+
+        recycle = uses >= self.max_uses or self._over_memory_limit(driver)
+        if not recycle:
+            try:
+                self.reset(driver)
+            except WebDriverException:
+                recycle = True
+
+        if recycle:
+            # Worn out or broken: replace it in the background so the next acquire stays warm
+            self._discard(driver)
+            if self._claim_slot():
+                threading.Thread(target=self._launch, daemon=True).start()
+            return
+
+        self._idle.put(driver)
+
+    @contextmanager
+    def session(self):
+        """Borrow a driver for the duration of a with-block"""
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def reset(self, driver):
+        """Clear cookies, storage and page state without restarting Chrome"""
+        if driver.current_url.startswith("http"):
+            driver.execute_script(CLEAR_STORAGE_JS)
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def memory_mb(self, driver):
+        return driver_memory_mb(driver)
+
+    def _over_memory_limit(self, driver):
+        if not self.max_memory_mb:
+            return False
+        memory = self.memory_mb(driver)
+        return memory is not None and memory > self.max_memory_mb
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self._launched -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit every idle driver"""
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,358 @@
+"""
+Soak Testing
+Repeats a flow, or a mix of flows, thousands of times in one Chrome session to surface
+slow growth that a single run never shows: JS heap, DOM nodes (detached ones included)
+and event listeners from the DevTools Performance domain, chromedriver + Chrome RSS,
+and the runner's own RSS.
+
+Every step is bracketed with a cheap sample, so each step's net effect on every metric
+is known. Every --sample-every iterations a sample is taken after forcing garbage
+collection in the page and in Python; linear trends are fitted over those (after a
+warm-up), and a metric that keeps growing is flagged as a leak together with the step
+that added the most to it.
+
+Usage (from automation/):
+    python soak.py flow_b --iterations 2000
+    python soak.py flow_b flow_c --duration 3600 --keep-page
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from selenium.common.exceptions import WebDriverException
+
+from driver_factory import create_driver
+from page_state import reset_page
+from results import FAILED, JsonlSink, ResultRecorder
+from run_flows import DEFAULT_URL, SCREENSHOTS_ROOT, discover_flows
+from session_pool import driver_memory_mb
+
+try:
+    import psutil
+except ImportError:  # optional: RSS metrics are skipped without it
+    psutil = None
+
+
+LAUNCH_STEP = "test_launch_page"
+
+# metric: (unit, growth per 1000 iterations that counts as a leak)
+LEAK_THRESHOLDS = {
+    "heap_mb": ("MB", 2.0),
+    "nodes": ("nodes", 100),
+    "listeners": ("listeners", 20),
+    "documents": ("documents", 1),
+    "browser_rss_mb": ("MB", 20.0),
+    "runner_rss_mb": ("MB", 5.0),
+}
+# Share of the run treated as warm-up (JIT, caches, lazy allocations) and not fitted
+WARMUP_FRACTION = 0.2
+# Minimum fit quality for a trend to count: noise has a slope too
+MIN_R2 = 0.5
+MIN_SAMPLES = 5
+# Iteration blocks kept per step and metric; neighbours merge when a run outgrows them
+DELTA_BLOCKS = 64
+
+
+def fit_trend(points):
+    """Least-squares (slope, intercept, r2) of [(x, y)] points"""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    syy = sum((y - mean_y) ** 2 for _, y in points)
+    if not sxx:
+        return 0.0, mean_y, 0.0
+    slope = sxy / sxx
+    r2 = (sxy * sxy) / (sxx * syy) if syy else 0.0
+    return slope, mean_y - slope * mean_x, r2
+
+
+def detect_leaks(samples, step_deltas, thresholds=LEAK_THRESHOLDS, warmup=WARMUP_FRACTION):
+    """One trend record per metric; records with "leak": True are growing steadily
+
+    samples are the forced-GC interval samples; step_deltas is the StepDeltas of every
+    step's per-run deltas, used to name the step responsible.
+    """
+    if not samples:
+        return []
+    last_iteration = samples[-1]["iteration"]
+    fitted = [s for s in samples if s["iteration"] >= last_iteration * warmup]
+    trends = []
+    for metric, (unit, per_1000) in thresholds.items():
+        points = [(s["iteration"], s[metric]) for s in fitted if s.get(metric) is not None]
+        if len(points) < MIN_SAMPLES:
+            continue
+        slope, intercept, r2 = fit_trend(points)
+        trend = {
+            "metric": metric,
+            "unit": unit,
+            "start": round(points[0][1], 3),
+            "end": round(points[-1][1], 3),
+            "per_1000_iterations": round(slope * 1000, 3),
+            "r2": round(r2, 3),
+            "leak": slope * 1000 >= per_1000 and r2 >= MIN_R2,
+        }
+        culprit = growing_step(step_deltas, metric, warmup)
+        if culprit:
+            trend["step"], trend["step_mean_delta"] = culprit
+        trends.append(trend)
+    return trends
+
+
+def growing_step(step_deltas, metric, warmup=WARMUP_FRACTION):
+    """(step, mean delta per run) of the step that adds the most to metric, or None"""
+    best = None
+    for step in step_deltas.totals:
+        mean = step_deltas.mean(step, metric, warmup)
+        if mean is not None and mean > 0 and (best is None or mean > best[1]):
+            best = (step, round(mean, 4))
+    return best
+
+
+class StepDeltas:
+    """Running (sum, count) of each step's per-run metric deltas
+
+    Totals are kept per block of iterations, at most DELTA_BLOCKS of them, so memory stays
+    flat over any number of runs while the warm-up can still be left out of the means.
+    """
+
+    def __init__(self):
+        self.block_size = 1
+        self.iterations = 0
+        # 'flow/step' -> metric -> [[sum, count] per block]
+        self.totals = {}
+
+    def add(self, step, iteration, deltas):
+        """Record one run of step: {metric: delta}"""
+        while iteration // self.block_size >= DELTA_BLOCKS:
+            self.merge()
+        index = iteration // self.block_size
+        self.iterations = max(self.iterations, iteration + 1)
+        metrics = self.totals.setdefault(step, {})
+        for metric, delta in deltas.items():
+            blocks = metrics.setdefault(metric, [])
+            while len(blocks) <= index:
+                blocks.append([0.0, 0])
+            blocks[index][0] += delta
+            blocks[index][1] += 1
+
+    def merge(self):
+        """Double the block size, folding neighbouring blocks together"""
+        self.block_size *= 2
+        for metrics in self.totals.values():
+            for metric, blocks in metrics.items():
+                metrics[metric] = [[sum(b[0] for b in pair), sum(b[1] for b in pair)]
+                                   for pair in (blocks[i:i + 2] for i in range(0, len(blocks), 2))]
+
+    def mean(self, step, metric, warmup=WARMUP_FRACTION):
+        """Mean delta per run after the warm-up, or None without runs to average"""
+        first = -(-int(self.iterations * warmup) // self.block_size)
+        blocks = self.totals.get(step, {}).get(metric, [])[first:]
+        count = sum(count for _, count in blocks)
+        return sum(total for total, _ in blocks) / count if count else None
+
+
+class SoakRunner:
+    """Runs flows round-robin on one shared Chrome session while sampling memory"""
+
+    def __init__(self, flow_classes, url, output_dir, headless=True, keep_page=False, screenshots=False,
+                 sample_every=50, max_failures=20):
+        self.flow_classes = flow_classes
+        self.url = url
+        self.output_dir = output_dir
+        self.headless = headless
+        self.keep_page = keep_page
+        self.screenshots = screenshots
+        self.sample_every = sample_every
+        self.max_failures = max_failures
+        self.driver = None
+        self.flows = {}
+        self.samples = []
+        self.step_deltas = StepDeltas()
+        self.failures = {}
+        self.iterations = 0
+        self.needs_reload = True
+        self.started = None
+        self.sink = None
+        self.runner = psutil.Process() if psutil else None
+
+    def setup(self):
+        """Launch the shared browser and one instance of each flow on it"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.driver = create_driver(self.headless)
+        self.driver.execute_cdp_cmd("Performance.enable", {})
+        for name, flow_cls in self.flow_classes.items():
+            flow = flow_cls(self.url, screenshots_dir=os.path.join(self.output_dir, name), headless=self.headless)
+            flow.setup(self.driver)
+            if not self.screenshots:
+                # Thousands of runs would write thousands of identical frames
+                flow.take_screenshot = lambda name: None
+            self.flows[name] = flow
+        self.sink = JsonlSink(os.path.join(self.output_dir, "samples.jsonl"))
+
+    def sample(self, collect=False):
+        """Current memory metrics; collect=True forces garbage collection first"""
+        if collect:
+            self.driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+            gc.collect()
+        metrics = {m["name"]: m["value"] for m in
+                   self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+        return {
+            "heap_mb": metrics.get("JSHeapUsedSize", 0) / (1024 * 1024),
+            "nodes": metrics.get("Nodes"),
+            "listeners": metrics.get("JSEventListeners"),
+            "documents": metrics.get("Documents"),
+            "browser_rss_mb": driver_memory_mb(self.driver),
+            "runner_rss_mb": self.runner.memory_info().rss / (1024 * 1024) if self.runner else None,
+        }
+
+    def run_iteration(self):
+        """Run the next flow of the mix; returns False once max_failures is reached"""
+        name = list(self.flows)[self.iterations % len(self.flows)]
+        flow = self.flows[name]
+        # A fresh recorder per run: the soak must not grow its own memory
+        flow.results = ResultRecorder(name)
+        if self.keep_page and not self.needs_reload:
+            reset_page(self.driver)
+
+        for step in flow.STEPS:
+            if step == LAUNCH_STEP and self.keep_page and not self.needs_reload:
+                continue
+            before = self.sample()
+            record = flow.results.run(step, getattr(flow, step))
+            after = self.sample()
+
+            self.step_deltas.add(f"{name}/{step}", self.iterations,
+                                 {metric: value - before[metric] for metric, value in after.items()
+                                  if value is not None and before[metric] is not None})
+            if step == LAUNCH_STEP:
+                self.needs_reload = False
+            if record["status"] == FAILED:
+                key = f"{name}/{step}"
+                self.failures[key] = self.failures.get(key, 0) + 1
+                # The page may be in any state now: start the next run from a fresh load
+                self.needs_reload = True
+                break
+
+        self.iterations += 1
+        return sum(self.failures.values()) < self.max_failures
+
+    def record_sample(self, progress):
+        sample = dict(self.sample(collect=True), iteration=self.iterations,
+                      elapsed=round(time.perf_counter() - self.started, 3))
+        self.samples.append(sample)
+        self.sink(sample)
+        print(f"  • iteration {self.iterations}: heap {sample['heap_mb']:.1f} MB, nodes {sample['nodes']:.0f}, "
+              f"listeners {sample['listeners']:.0f}, browser {sample['browser_rss_mb'] or 0:.0f} MB, "
+              f"runner {sample['runner_rss_mb'] or 0:.0f} MB", file=progress, flush=True)
+
+    def run(self, iterations=None, duration=None):
+        """Repeat the mix until iterations or duration (seconds) is reached"""
+        progress = sys.stdout
+        self.started = time.perf_counter()
+        with open(os.path.join(self.output_dir, "output.log"), "w", encoding="utf-8") as log, \
+                contextlib.redirect_stdout(log):
+            self.record_sample(progress)
+            while True:
+                if iterations is not None and self.iterations >= iterations:
+                    break
+                if duration is not None and time.perf_counter() - self.started >= duration:
+                    break
+                try:
+                    keep_going = self.run_iteration()
+                except WebDriverException as e:
+                    # Sampling itself failed: the browser is gone
+                    print(f"  ✗ Browser lost after {self.iterations} iterations: {e}", file=progress)
+                    break
+                if self.iterations % self.sample_every == 0:
+                    self.record_sample(progress)
+                if not keep_going:
+                    print(f"  ✗ Stopping after {sum(self.failures.values())} failed runs", file=progress)
+                    break
+            if self.iterations % self.sample_every:
+                self.record_sample(progress)
+
+    def report(self):
+        return {
+            "flows": list(self.flows),
+            "iterations": self.iterations,
+            "duration": round(time.perf_counter() - self.started, 3),
+            "keep_page": self.keep_page,
+            "failures": self.failures,
+            "trends": detect_leaks(self.samples, self.step_deltas),
+            "samples": self.samples,
+        }
+
+    def teardown(self):
+        if self.sink:
+            self.sink.close()
+        if self.driver:
+            self.driver.quit()
+
+
+def print_report(report):
+    print("\n" + "=" * 80)
+    print(f"SOAK TEST ({', '.join(report['flows'])}, {report['iterations']} iterations, "
+          f"{report['duration'] / 60:.1f} min)")
+    print("=" * 80)
+    for trend in report["trends"]:
+        icon = "✗" if trend["leak"] else "✓"
+        print(f"  {icon} {trend['metric']:<15} {trend['start']:>10.1f} → {trend['end']:>10.1f} {trend['unit']:<9} "
+              f"{trend['per_1000_iterations']:+.2f}/1000 runs (r² {trend['r2']:.2f})")
+        if trend["leak"] and trend.get("step"):
+            print(f"      grows in {trend['step']} (+{trend['step_mean_delta']} {trend['unit']} per run)")
+    for step, count in sorted(report["failures"].items()):
+        print(f"  ✗ {step} failed {count}×")
+    leaks = [t["metric"] for t in report["trends"] if t["leak"]]
+    print(f"\n{'⚠️  Leaks: ' + ', '.join(leaks) if leaks else '✓ No steady growth detected'}")
+    print("=" * 80 + "\n")
+
+
+def main(argv=None):
+    """Main execution function"""
+    flows = discover_flows()
+    parser = argparse.ArgumentParser(description="Repeat flows in one browser session and detect leaks")
+    parser.add_argument("flows", nargs="+", choices=sorted(flows), help="flows to run round-robin")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--iterations", type=int, default=None, help="flow runs (default: 1000 without --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--sample-every", type=int, default=50, help="forced-GC sample every N runs")
+    parser.add_argument("--keep-page", action="store_true",
+                        help="load the page once and reset it in place between runs, so in-page leaks accumulate")
+    parser.add_argument("--screenshots", action="store_true", help="keep the flows' screenshots")
+    parser.add_argument("--max-failures", type=int, default=20)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--output", default=None, help="default: screenshots/runs/<timestamp>_soak")
+    args = parser.parse_args(argv)
+    iterations = args.iterations if args.iterations or args.duration else 1000
+
+    output_dir = args.output or os.path.join(
+        SCREENSHOTS_ROOT, "runs", datetime.now().strftime("%Y%m%d_%H%M%S") + "_soak")
+    runner = SoakRunner({name: flows[name] for name in args.flows}, args.url, output_dir,
+                        headless=not args.headed, keep_page=args.keep_page, screenshots=args.screenshots,
+                        sample_every=max(1, args.sample_every), max_failures=args.max_failures)
+    print(f"🔁 Soaking {', '.join(args.flows)} "
+          f"({f'{iterations} runs' if iterations else f'{args.duration:.0f}s'}), samples every {args.sample_every} runs")
+    try:
+        runner.setup()
+        runner.run(iterations, args.duration)
+    finally:
+        runner.teardown()
+
+    report = runner.report()
+    print_report(report)
+    with open(os.path.join(output_dir, "soak.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {os.path.join(output_dir, 'soak.json')}\n")
+    return 1 if any(t["leak"] for t in report["trends"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
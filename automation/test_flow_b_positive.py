@@ -3,56 +3,97 @@ Selenium Automation Script - Flow B (Positive Scenario)
 Tests successful form submission with all valid data
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
 from selenium.common.exceptions import TimeoutException
-import time
 import os
-from datetime import datetime
+import sys
+import time
+import uuid
+
+from driver_factory import create_driver
+from form_fill import fill_form
+from form_snapshot import take_snapshot
+from results import ResultRecorder, run_standalone
+from screenshot_store import get_store
+from waits import FormWaits
+
+
+# Valid registration used by this flow, split by form section
+PERSONAL_INFO = {
+    "firstName": "Priya",
+    "lastName": "Patel",
+    "email": "priya.patel@gmail.com",
+    "phone": "+91 9123456789",
+    "age": "24",
+    "gender": "female",
+    "address": "456 Park Avenue, Block C",
+}
+ADDRESS_INFO = {"country": "India", "state": "Maharashtra", "city": "Pune"}
+PASSWORD_INFO = {"password": "StrongPass@2024", "confirmPassword": "StrongPass@2024"}
+SAMPLE_REGISTRATION = {**PERSONAL_INFO, **ADDRESS_INFO, **PASSWORD_INFO, "terms": True}
+
+
+def unique_contact():
+    """Email and phone no earlier run has registered; the server answers 409 to repeats"""
+    token = uuid.uuid4()
+    local, _, domain = PERSONAL_INFO["email"].partition("@")
+    return {
+        "email": f"{local}+{token.hex[:8]}@{domain}",
+        "phone": f"+91 9{token.int % 10 ** 9:09d}",
+    }
 
 
 class RegistrationFormTestFlowB:
-    def __init__(self, url):
+    # Steps in execution order, used by run_flows.py
+    STEPS = (
+        "test_launch_page",
+        "test_fill_complete_form",
+        "test_verify_password_match",
+        "test_verify_terms_checked",
+        "test_submit_form",
+        "test_form_validation_indicators",
+    )
+
+    def __init__(self, url, screenshots_dir="../screenshots/flow_b", headless=False, keystrokes=False):
         self.url = url
+        self.headless = headless
+        # True types every field with send_keys() instead of the single-script bulk fill
+        self.keystrokes = keystrokes
         self.driver = None
+        self.owns_driver = True
         self.wait = None
-        self.screenshots_dir = "../screenshots/flow_b"
+        self.waits = None
+        self.screenshots_dir = screenshots_dir
+        self.results = ResultRecorder("flow_b")
         
         # Create screenshots directory
         os.makedirs(self.screenshots_dir, exist_ok=True)
         
-    def setup(self):
-        """Initialize WebDriver"""
+    def setup(self, driver=None):
+        """Initialize WebDriver, or adopt a warm one borrowed from a DriverPool"""
         print("=" * 80)
         print("FLOW B - POSITIVE SCENARIO TEST")
         print("=" * 80)
         print("\n[SETUP] Initializing Chrome WebDriver...")
         
-        options = webdriver.ChromeOptions()
-        options.add_argument('--start-maximized')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.owns_driver = driver is None
+        self.driver = driver or create_driver(self.headless)
         self.wait = WebDriverWait(self.driver, 10)
+        self.waits = FormWaits(self.driver)
         print("✓ Chrome WebDriver initialized successfully\n")
         
     def take_screenshot(self, name):
-        """Take and save screenshot"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{self.screenshots_dir}/{timestamp}_{name}.png"
-        self.driver.save_screenshot(filename)
+        """Capture a screenshot; encoding and the disk write happen in the background"""
+        filename = get_store().capture(self.driver, self.screenshots_dir, name)
+        self.results.artifact(filename)
         print(f"  📸 Screenshot saved: {filename}")
         
     def test_launch_page(self):
         """Step 1: Launch web page and verify"""
         print("[STEP 1] Launching web page...")
         self.driver.get(self.url)
-        time.sleep(2)
+        self.waits.page_ready()
         
         page_url = self.driver.current_url
         page_title = self.driver.title
@@ -65,114 +106,45 @@ class RegistrationFormTestFlowB:
         
     def test_fill_complete_form(self):
         """Step 2: Fill form with all valid data"""
-        print("[STEP 2] Filling form with complete valid data...\n")
-        
-        # First Name
-        print("  • Filling First Name...")
-        first_name = self.wait.until(EC.presence_of_element_located((By.ID, "firstName")))
-        first_name.clear()
-        first_name.send_keys("Priya")
-        time.sleep(0.5)
-        
-        # Last Name
-        print("  • Filling Last Name...")
-        last_name = self.driver.find_element(By.ID, "lastName")
-        last_name.clear()
-        last_name.send_keys("Patel")
-        time.sleep(0.5)
-        
-        # Email
-        print("  • Filling Email...")
-        email = self.driver.find_element(By.ID, "email")
-        email.clear()
-        email.send_keys("priya.patel@gmail.com")
-        time.sleep(0.5)
-        
-        # Phone
-        print("  • Filling Phone Number...")
-        phone = self.driver.find_element(By.ID, "phone")
-        phone.clear()
-        phone.send_keys("+91 9123456789")
-        time.sleep(0.5)
-        
-        # Age
-        print("  • Filling Age...")
-        age = self.driver.find_element(By.ID, "age")
-        age.clear()
-        age.send_keys("24")
-        time.sleep(0.5)
-        
-        # Gender
-        print("  • Selecting Gender...")
-        gender_female = self.driver.find_element(By.CSS_SELECTOR, "input[name='gender'][value='female']")
-        self.driver.execute_script("arguments[0].click();", gender_female)
-        time.sleep(0.5)
-        
-        # Address
-        print("  • Filling Address...")
-        address = self.driver.find_element(By.ID, "address")
-        address.clear()
-        address.send_keys("456 Park Avenue, Block C")
-        time.sleep(0.5)
-        
-        self.take_screenshot("02_personal_info_filled")
+        mode = "keystrokes" if self.keystrokes else "bulk fill"
+        print(f"[STEP 2] Filling form with complete valid data ({mode})...\n")
         
-        # Country
-        print("  • Selecting Country...")
-        country = Select(self.driver.find_element(By.ID, "country"))
-        country.select_by_visible_text("India")
-        time.sleep(1.5)
+        # Personal information
+        print("  • Filling First Name, Last Name, Email, Phone, Age, Gender, Address...")
+        fill_form(self.driver, PERSONAL_INFO, keystrokes=self.keystrokes)
         
-        # State
-        print("  • Selecting State...")
-        state = Select(self.driver.find_element(By.ID, "state"))
-        state.select_by_visible_text("Maharashtra")
-        time.sleep(1.5)
+        self.take_screenshot("02_personal_info_filled")
         
-        # City
-        print("  • Selecting City...")
-        city = Select(self.driver.find_element(By.ID, "city"))
-        city.select_by_visible_text("Pune")
-        time.sleep(0.5)
+        # Country, State, City
+        print("  • Selecting Country, State, City...")
+        fill_form(self.driver, ADDRESS_INFO, keystrokes=self.keystrokes)
         
         self.take_screenshot("03_address_info_filled")
         
         # Scroll to password section
         password_field = self.driver.find_element(By.ID, "password")
         self.driver.execute_script("arguments[0].scrollIntoView(true);", password_field)
-        time.sleep(1)
         
-        # Password
-        print("  • Filling Password...")
-        password_field.clear()
-        password_field.send_keys("StrongPass@2024")
-        time.sleep(1)
+        # Password and Confirm Password
+        print("  • Filling Password and Confirm Password...")
+        fill_form(self.driver, PASSWORD_INFO, keystrokes=self.keystrokes)
         
         # Check password strength indicator
         try:
-            strength_text = self.driver.find_element(By.CLASS_NAME, "strength-text")
-            print(f"  • Password Strength: {strength_text.text}")
-        except:
-            pass
-        
-        # Confirm Password
-        print("  • Filling Confirm Password...")
-        confirm_password = self.driver.find_element(By.ID, "confirmPassword")
-        confirm_password.clear()
-        confirm_password.send_keys("StrongPass@2024")
-        time.sleep(0.5)
+            strength_text = self.waits.strength_text_changed("")
+            print(f"  • Password Strength: {strength_text}")
+        except TimeoutException:
+            self.results.warn("Password strength indicator did not update")
         
         self.take_screenshot("04_password_filled")
         
         # Scroll to terms
         terms_checkbox = self.driver.find_element(By.ID, "terms")
         self.driver.execute_script("arguments[0].scrollIntoView(true);", terms_checkbox)
-        time.sleep(1)
         
         # Terms & Conditions
         print("  • Accepting Terms & Conditions...")
-        self.driver.execute_script("arguments[0].click();", terms_checkbox)
-        time.sleep(0.5)
+        fill_form(self.driver, {"terms": True}, keystrokes=self.keystrokes)
         
         print("\n  ✓ All form fields filled successfully\n")
         self.take_screenshot("05_form_complete")
@@ -181,13 +153,11 @@ class RegistrationFormTestFlowB:
         """Step 3: Verify password and confirm password match"""
         print("[STEP 3] Verifying password validation...\n")
         
-        password = self.driver.find_element(By.ID, "password")
-        confirm_password = self.driver.find_element(By.ID, "confirmPassword")
+        snapshot = take_snapshot(self.driver)
+        password_value = snapshot.value("password")
+        confirm_value = snapshot.value("confirmPassword")
         
-        password_value = password.get_attribute("value")
-        confirm_value = confirm_password.get_attribute("value")
-        
-        if password_value == confirm_value:
+        if self.results.check(password_value == confirm_value, "Password and Confirm Password match"):
             print("  ✓ Password and Confirm Password match")
             print(f"  • Password: {'*' * len(password_value)}")
         else:
@@ -197,11 +167,10 @@ class RegistrationFormTestFlowB:
         """Step 4: Verify terms checkbox is checked"""
         print("\n[STEP 4] Verifying Terms & Conditions...\n")
         
-        terms = self.driver.find_element(By.ID, "terms")
-        is_checked = terms.is_selected()
+        is_checked = take_snapshot(self.driver).value("terms")
         
         print(f"  • Terms & Conditions checked: {is_checked}")
-        if is_checked:
+        if self.results.check(is_checked, "Terms & Conditions accepted"):
             print("  ✓ Terms & Conditions accepted")
         else:
             print("  ✗ Terms & Conditions not accepted")
@@ -213,39 +182,48 @@ class RegistrationFormTestFlowB:
         # Scroll to submit button
         submit_btn = self.driver.find_element(By.ID, "submitBtn")
         self.driver.execute_script("arguments[0].scrollIntoView(true);", submit_btn)
-        time.sleep(1)
         
         # Check if button is enabled
+        try:
+            self.waits.submit_enabled()
+        except TimeoutException:
+            pass
         is_disabled = submit_btn.get_attribute("disabled")
         print(f"  • Submit button enabled: {is_disabled is None}")
         
-        if is_disabled is None:
+        if self.results.check(is_disabled is None, "Submit button enabled for a valid form"):
+            # Screenshots keep the fixed sample; only the submitted contact details are new
+            fill_form(self.driver, unique_contact(), keystrokes=self.keystrokes)
+            self.driver.execute_script("arguments[0].scrollIntoView(true);", submit_btn)
             print("  • Clicking Submit button...")
+            started = time.perf_counter()
             self.driver.execute_script("arguments[0].click();", submit_btn)
-            time.sleep(2)
             
             # Wait for success message
             try:
-                success_alert = self.wait.until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "alert-success"))
-                )
+                success_alert = self.waits.alert_present("success")
+                elapsed_ms = (time.perf_counter() - started) * 1000
                 success_message = success_alert.text
                 print(f"\n  ✓ SUCCESS MESSAGE DISPLAYED:")
+                self.results.check(True, "Success message displayed")
                 print(f"  '{success_message}'")
+                print(f"  • Registration round trip: {elapsed_ms:.0f} ms")
                 
                 self.take_screenshot("06_success_state")
                 
             except TimeoutException:
                 print("  ⚠️  Success message not found (might still be loading)")
+                self.results.check(False, "Success message displayed", "not shown within the wait timeout")
                 
             # Wait for form reset
-            time.sleep(3)
-            
-            # Verify form fields are reset
-            first_name = self.driver.find_element(By.ID, "firstName")
-            if first_name.get_attribute("value") == "":
+            try:
+                self.waits.form_reset_complete()
                 print("  ✓ Form fields successfully reset")
+                self.results.check(True, "Form fields reset after submission")
                 self.take_screenshot("07_form_reset")
+            except TimeoutException:
+                print("  ⚠️  Form fields were not reset")
+                self.results.warn("Form fields were not reset after submission")
             
         else:
             print("  ✗ Submit button is disabled!")
@@ -254,18 +232,23 @@ class RegistrationFormTestFlowB:
         """Bonus: Check validation indicators"""
         print("\n[BONUS] Checking form validation indicators...\n")
         
+        snapshot = take_snapshot(self.driver)
+        
         # Check for valid class on filled inputs
-        valid_inputs = self.driver.find_elements(By.CSS_SELECTOR, ".form-control.valid")
-        print(f"  • Fields with valid indicator: {len(valid_inputs)}")
+        valid_fields = snapshot.fields_in_state("valid")
+        print(f"  • Fields with valid indicator: {len(valid_fields)}")
         
         # Check for success icons
-        success_icons = self.driver.find_elements(By.CSS_SELECTOR, ".success-icon[style*='opacity: 1']")
+        success_icons = snapshot.success_icons()
         print(f"  • Success icons displayed: {len(success_icons)}")
         
     def teardown(self):
         """Close browser"""
+        if not self.owns_driver:
+            # Pooled drivers are reset and reused by their DriverPool
+            print("\n[TEARDOWN] Returning browser to pool\n")
+            return
         print("\n[TEARDOWN] Closing browser...")
-        time.sleep(2)
         if self.driver:
             self.driver.quit()
         print("✓ Browser closed\n")
@@ -277,37 +260,8 @@ def main():
     
     test = RegistrationFormTestFlowB(URL)
     
-    try:
-        test.setup()
-        test.test_launch_page()
-        test.test_fill_complete_form()
-        test.test_verify_password_match()
-        test.test_verify_terms_checked()
-        test.test_submit_form()
-        test.test_form_validation_indicators()
-        
-        print("\n" + "=" * 80)
-        print("FLOW B - POSITIVE SCENARIO COMPLETED")
-        print("=" * 80)
-        print("\nTest Results:")
-        print("  ✓ Form filled with all valid data")
-        print("  ✓ Password validation passed")
-        print("  ✓ Terms & Conditions accepted")
-        print("  ✓ Form submitted successfully")
-        print("  ✓ Success message displayed")
-        print("  ✓ Form reset after submission")
-        print("\n" + "🎉 " * 20)
-        print("ALL TESTS PASSED!")
-        print("🎉 " * 20 + "\n")
-        
-    except Exception as e:
-        print(f"\n❌ ERROR: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        
-    finally:
-        test.teardown()
+    return run_standalone(test)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
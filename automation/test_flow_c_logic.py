@@ -3,55 +3,99 @@ Selenium Automation Script - Flow C (Form Logic Validation)
 Tests dynamic form behavior including dropdown dependencies and validation logic
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-from selenium.webdriver.common.keys import Keys
-import time
+from selenium.common.exceptions import TimeoutException
 import os
-from datetime import datetime
+import sys
+
+from driver_factory import create_driver
+from form_fill import fill_form
+from form_snapshot import take_snapshot
+from page_state import reset_page
+from results import ResultRecorder, run_standalone
+from screenshot_store import get_store
+from waits import FormWaits
+
+
+# Complete, valid form used by the submit button case
+SUBMIT_FORM = {
+    "firstName": "Test",
+    "lastName": "User",
+    "email": "test@example.com",
+    "phone": "+91 9876543210",
+    "age": "30",
+    "gender": "male",
+    "address": "12 Residency Road, Block A",
+    "country": "India",
+    "state": "Maharashtra",
+    "city": "Pune",
+    "password": "StrongP@ss123",
+    "confirmPassword": "StrongP@ss123",
+}
+# Password strength cases: (label, password, screenshot)
+PASSWORD_CASES = (
+    ("Weak", "pass123", "06_weak_password"),
+    ("Medium", "Pass1234", "07_medium_password"),
+    ("Strong", "StrongP@ss123", "08_strong_password"),
+)
 
 
 class RegistrationFormTestFlowC:
-    def __init__(self, url):
+    # Steps in execution order, used by run_flows.py
+    STEPS = (
+        "test_launch_page",
+        "test_country_state_dependency",
+        "test_state_city_dependency",
+        "test_password_strength_validation",
+        "test_confirm_password_mismatch",
+        "test_submit_button_validation",
+        "test_disposable_email_validation",
+    )
+
+    def __init__(self, url, screenshots_dir="../screenshots/flow_c", headless=False):
         self.url = url
+        self.headless = headless
         self.driver = None
+        self.owns_driver = True
         self.wait = None
-        self.screenshots_dir = "../screenshots/flow_c"
+        self.waits = None
+        self.screenshots_dir = screenshots_dir
+        self.results = ResultRecorder("flow_c")
         
         os.makedirs(self.screenshots_dir, exist_ok=True)
         
-    def setup(self):
-        """Initialize WebDriver"""
+    def setup(self, driver=None):
+        """Initialize WebDriver, or adopt a warm one borrowed from a DriverPool"""
         print("=" * 80)
         print("FLOW C - FORM LOGIC VALIDATION TEST")
         print("=" * 80)
         print("\n[SETUP] Initializing Chrome WebDriver...")
         
-        options = webdriver.ChromeOptions()
-        options.add_argument('--start-maximized')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.owns_driver = driver is None
+        self.driver = driver or create_driver(self.headless)
         self.wait = WebDriverWait(self.driver, 10)
+        self.waits = FormWaits(self.driver)
         print("✓ Chrome WebDriver initialized successfully\n")
         
     def take_screenshot(self, name):
-        """Take and save screenshot"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{self.screenshots_dir}/{timestamp}_{name}.png"
-        self.driver.save_screenshot(filename)
+        """Capture a screenshot; encoding and the disk write happen in the background"""
+        filename = get_store().capture(self.driver, self.screenshots_dir, name)
+        self.results.artifact(filename)
         print(f"  📸 Screenshot saved: {filename}")
         
+    def reset_page(self):
+        """Return the form to its initial state without reloading the page"""
+        if not reset_page(self.driver):
+            print("  ⚠️  Page did not report a clean state after reset")
+            self.results.warn("Page did not report a clean state after reset")
+        
     def test_launch_page(self):
         """Launch and verify page"""
         print("[TEST 1] Launching web page...")
         self.driver.get(self.url)
-        time.sleep(2)
+        self.waits.page_ready()
         
         print(f"  • Page URL: {self.driver.current_url}")
         print(f"  • Page Title: {self.driver.title}")
@@ -62,26 +106,26 @@ class RegistrationFormTestFlowC:
     def test_country_state_dependency(self):
         """Test 1: Country change should update States dropdown"""
         print("[TEST 2] Testing Country → State dropdown dependency...\n")
+        self.reset_page()
         
         country_select = Select(self.driver.find_element(By.ID, "country"))
-        state_select = Select(self.driver.find_element(By.ID, "state"))
         
         # Scroll to country dropdown
         country_element = self.driver.find_element(By.ID, "country")
         self.driver.execute_script("arguments[0].scrollIntoView(true);", country_element)
-        time.sleep(1)
         
         # Test Case 1: Select India
         print("  • Test Case 1: Selecting 'India'")
         country_select.select_by_visible_text("India")
-        time.sleep(1.5)
+        self.waits.dropdown_ready("state")
         
         # Verify state dropdown is enabled and populated
-        state_element = self.driver.find_element(By.ID, "state")
-        is_disabled = state_element.get_attribute("disabled")
-        print(f"    - State dropdown enabled: {is_disabled is None}")
+        snapshot = take_snapshot(self.driver)
+        state_options = snapshot.options("state")
+        print(f"    - State dropdown enabled: {not snapshot.dropdown_disabled('state')}")
+        self.results.check(not snapshot.dropdown_disabled("state"), "State dropdown enabled after selecting a country")
+        self.results.check(state_options, "State dropdown populated for India")
         
-        state_options = [opt.text for opt in state_select.options if opt.text != "Select State"]
         print(f"    - Available states: {len(state_options)}")
         print(f"    - Sample states: {', '.join(state_options[:3])}...")
         
@@ -90,9 +134,7 @@ class RegistrationFormTestFlowC:
         # Test Case 2: Change to United States
         print("\n  • Test Case 2: Changing to 'United States'")
         country_select.select_by_visible_text("United States")
-        time.sleep(1.5)
-        
-        state_options_us = [opt.text for opt in state_select.options if opt.text != "Select State"]
+        state_options_us = self.waits.dropdown_ready("state", previous=state_options)
         print(f"    - Available states: {len(state_options_us)}")
         print(f"    - Sample states: {', '.join(state_options_us[:3])}...")
         
@@ -101,9 +143,7 @@ class RegistrationFormTestFlowC:
         # Test Case 3: Change to United Kingdom
         print("\n  • Test Case 3: Changing to 'United Kingdom'")
         country_select.select_by_visible_text("United Kingdom")
-        time.sleep(1.5)
-        
-        state_options_uk = [opt.text for opt in state_select.options if opt.text != "Select State"]
+        state_options_uk = self.waits.dropdown_ready("state", previous=state_options_us)
         print(f"    - Available states: {len(state_options_uk)}")
         print(f"    - Sample states: {', '.join(state_options_uk)}...")
         
@@ -113,25 +153,25 @@ class RegistrationFormTestFlowC:
     def test_state_city_dependency(self):
         """Test 2: State change should update Cities dropdown"""
         print("[TEST 3] Testing State → City dropdown dependency...\n")
+        self.reset_page()
         
         # Select India as country
         country_select = Select(self.driver.find_element(By.ID, "country"))
         country_select.select_by_visible_text("India")
-        time.sleep(1.5)
+        self.waits.dropdown_ready("state", expected="Maharashtra")
         
         state_select = Select(self.driver.find_element(By.ID, "state"))
-        city_select = Select(self.driver.find_element(By.ID, "city"))
         
         # Test Case 1: Select Maharashtra
         print("  • Test Case 1: Selecting 'Maharashtra'")
         state_select.select_by_visible_text("Maharashtra")
-        time.sleep(1.5)
+        self.waits.dropdown_ready("city", expected="Pune")
         
-        city_element = self.driver.find_element(By.ID, "city")
-        is_disabled = city_element.get_attribute("disabled")
-        print(f"    - City dropdown enabled: {is_disabled is None}")
+        snapshot = take_snapshot(self.driver)
+        city_options = snapshot.options("city")
+        print(f"    - City dropdown enabled: {not snapshot.dropdown_disabled('city')}")
+        self.results.check(not snapshot.dropdown_disabled("city"), "City dropdown enabled after selecting a state")
         
-        city_options = [opt.text for opt in city_select.options if opt.text != "Select City"]
         print(f"    - Available cities: {len(city_options)}")
         print(f"    - Cities: {', '.join(city_options)}...")
         
@@ -140,9 +180,7 @@ class RegistrationFormTestFlowC:
         # Test Case 2: Change to Karnataka
         print("\n  • Test Case 2: Changing to 'Karnataka'")
         state_select.select_by_visible_text("Karnataka")
-        time.sleep(1.5)
-        
-        city_options_kar = [opt.text for opt in city_select.options if opt.text != "Select City"]
+        city_options_kar = self.waits.dropdown_ready("city", previous=city_options)
         print(f"    - Available cities: {len(city_options_kar)}")
         print(f"    - Cities: {', '.join(city_options_kar)}...")
         
@@ -155,55 +193,25 @@ class RegistrationFormTestFlowC:
         """Test 3: Password strength validation"""
         print("[TEST 4] Testing Password Strength Validation...\n")
         
-        # Scroll to password field
-        password_field = self.driver.find_element(By.ID, "password")
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", password_field)
-        time.sleep(1)
-        
-        # Test Case 1: Weak password
-        print("  • Test Case 1: Weak password - 'pass123'")
-        password_field.clear()
-        password_field.send_keys("pass123")
-        time.sleep(1)
-        
-        try:
-            strength_text = self.driver.find_element(By.CLASS_NAME, "strength-text")
-            print(f"    - Strength indicator: {strength_text.text}")
-            strength_meter = self.driver.find_element(By.CLASS_NAME, "strength-meter-fill")
-            meter_class = strength_meter.get_attribute("class")
-            print(f"    - Meter class: {meter_class}")
-        except:
-            print("    - Strength meter not found")
+        for number, (label, password, screenshot) in enumerate(PASSWORD_CASES, 1):
+            print(f"  • Test Case {number}: {label} password - '{password}'")
+            # Each case starts from an empty meter, not the previous case's password
+            self.reset_page()
+            password_field = self.driver.find_element(By.ID, "password")
+            self.driver.execute_script("arguments[0].scrollIntoView(true);", password_field)
+            password_field.send_keys(password)
             
-        self.take_screenshot("06_weak_password")
-        
-        # Test Case 2: Medium password
-        print("\n  • Test Case 2: Medium password - 'Pass1234'")
-        password_field.clear()
-        password_field.send_keys("Pass1234")
-        time.sleep(1)
-        
-        try:
-            strength_text = self.driver.find_element(By.CLASS_NAME, "strength-text")
-            print(f"    - Strength indicator: {strength_text.text}")
-        except:
-            pass
-            
-        self.take_screenshot("07_medium_password")
-        
-        # Test Case 3: Strong password
-        print("\n  • Test Case 3: Strong password - 'StrongP@ss123'")
-        password_field.clear()
-        password_field.send_keys("StrongP@ss123")
-        time.sleep(1)
-        
-        try:
-            strength_text = self.driver.find_element(By.CLASS_NAME, "strength-text")
-            print(f"    - Strength indicator: {strength_text.text}")
-        except:
-            pass
-            
-        self.take_screenshot("08_strong_password")
+            try:
+                strength_text = self.waits.strength_text_changed("")
+                print(f"    - Strength indicator: {strength_text}")
+                meter_class = take_snapshot(self.driver).data["strength"]["meterClass"]
+                print(f"    - Meter class: {meter_class}")
+            except TimeoutException:
+                print("    - Strength meter not found")
+                self.results.warn(f"Strength meter did not update for a {label.lower()} password")
+                
+            self.take_screenshot(screenshot)
+            print()
         
         print("\n  ✓ Password strength validation working correctly")
         print("  ✓ Visual feedback provided for password strength\n")
@@ -211,6 +219,7 @@ class RegistrationFormTestFlowC:
     def test_confirm_password_mismatch(self):
         """Test 4: Wrong confirm password should show error"""
         print("[TEST 5] Testing Confirm Password Mismatch...\n")
+        self.reset_page()
         
         password_field = self.driver.find_element(By.ID, "password")
         confirm_field = self.driver.find_element(By.ID, "confirmPassword")
@@ -219,34 +228,34 @@ class RegistrationFormTestFlowC:
         print("  • Setting Password: 'MyPassword123'")
         password_field.clear()
         password_field.send_keys("MyPassword123")
-        time.sleep(0.5)
         
         print("  • Setting Confirm Password: 'DifferentPass456'")
         confirm_field.clear()
         confirm_field.send_keys("DifferentPass456")
-        time.sleep(0.5)
         
         # Trigger validation by clicking elsewhere
         password_field.click()
-        time.sleep(1)
         
         # Check for error message
         try:
-            confirm_group = confirm_field.find_element(By.XPATH, "./ancestor::div[@class='form-group']")
-            error_message = confirm_group.find_element(By.CLASS_NAME, "error-message")
-            error_text = error_message.text
+            self.waits.field_state("confirmPassword", "invalid")
+            snapshot = take_snapshot(self.driver)
+            error_text = snapshot.error("confirmPassword")
             
             if error_text:
                 print(f"  ✓ Error message displayed: '{error_text}'")
             else:
                 print("  ⚠️  Error message empty")
+                self.results.warn("Confirm password error message empty")
                 
             # Check if field is marked invalid
-            is_invalid = "invalid" in confirm_field.get_attribute("class")
+            is_invalid = snapshot.state("confirmPassword") == "invalid"
             print(f"  ✓ Confirm password field marked invalid: {is_invalid}")
+            self.results.check(is_invalid, "Confirm password field marked invalid on mismatch")
             
         except Exception as e:
             print(f"  ⚠️  Could not verify error: {str(e)}")
+            self.results.warn(f"Could not verify confirm password error: {e}")
             
         self.take_screenshot("09_password_mismatch")
         
@@ -254,11 +263,15 @@ class RegistrationFormTestFlowC:
         print("\n  • Correcting Confirm Password to match...")
         confirm_field.clear()
         confirm_field.send_keys("MyPassword123")
-        time.sleep(1)
         
         # Check if error is cleared
-        is_valid = "valid" in confirm_field.get_attribute("class")
+        try:
+            self.waits.field_state("confirmPassword", "valid")
+            is_valid = True
+        except TimeoutException:
+            is_valid = False
         print(f"  ✓ Confirm password field now valid: {is_valid}")
+        self.results.check(is_valid, "Confirm password field valid once passwords match")
         
         self.take_screenshot("10_password_match")
         print("\n  ✓ Password mismatch validation working correctly\n")
@@ -266,58 +279,52 @@ class RegistrationFormTestFlowC:
     def test_submit_button_validation(self):
         """Test 5: Submit button disabled until all fields valid"""
         print("[TEST 6] Testing Submit Button State...\n")
+        self.reset_page()
         
         submit_btn = self.driver.find_element(By.ID, "submitBtn")
         self.driver.execute_script("arguments[0].scrollIntoView(true);", submit_btn)
-        time.sleep(1)
         
         # Check initial state (should be disabled)
-        is_disabled = submit_btn.get_attribute("disabled")
-        print(f"  • Submit button initially disabled: {is_disabled is not None}")
+        is_disabled = take_snapshot(self.driver).submit_disabled
+        print(f"  • Submit button initially disabled: {is_disabled}")
+        self.results.check(is_disabled, "Submit button disabled before required fields are filled")
         
         # Fill all required fields to enable button
         print("\n  • Filling all required fields...")
-        
-        # Personal info
-        self.driver.find_element(By.ID, "firstName").send_keys("Test")
-        self.driver.find_element(By.ID, "lastName").send_keys("User")
-        self.driver.find_element(By.ID, "email").send_keys("test@example.com")
-        self.driver.find_element(By.ID, "phone").send_keys("+91 9876543210")
-        
-        # Gender
-        gender = self.driver.find_element(By.CSS_SELECTOR, "input[name='gender'][value='male']")
-        self.driver.execute_script("arguments[0].click();", gender)
-        
-        # Location (already set from previous tests)
-        # Password (already set from previous tests)
+        fill_form(self.driver, SUBMIT_FORM)
         
         # Terms
         terms = self.driver.find_element(By.ID, "terms")
         self.driver.execute_script("arguments[0].click();", terms)
-        time.sleep(1)
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", submit_btn)
         
         # Check if button is now enabled
-        is_disabled_after = submit_btn.get_attribute("disabled")
-        print(f"  • Submit button enabled after filling: {is_disabled_after is None}")
+        try:
+            self.waits.submit_enabled()
+        except TimeoutException:
+            pass
+        is_disabled_after = take_snapshot(self.driver).submit_disabled
+        print(f"  • Submit button enabled after filling: {not is_disabled_after}")
         
         self.take_screenshot("11_submit_button_enabled")
         
-        if is_disabled_after is None:
+        if not is_disabled_after:
             print("\n  ✓ Submit button correctly enables when all fields are valid")
         else:
             print("\n  ⚠️  Submit button still disabled (check validation)")
+            self.results.warn("Submit button still disabled after filling all required fields")
             
         print()
         
     def test_disposable_email_validation(self):
         """Bonus Test: Disposable email validation"""
         print("[BONUS TEST] Testing Disposable Email Validation...\n")
+        self.reset_page()
         
         email_field = self.driver.find_element(By.ID, "email")
         
         # Scroll to email field
         self.driver.execute_script("arguments[0].scrollIntoView(true);", email_field)
-        time.sleep(1)
         
         # Test with disposable email
         print("  • Testing with disposable email: test@tempmail.com")
@@ -326,21 +333,20 @@ class RegistrationFormTestFlowC:
         
         # Trigger validation
         self.driver.find_element(By.ID, "firstName").click()
-        time.sleep(1)
         
         # Check for error
         try:
-            email_group = email_field.find_element(By.XPATH, "./ancestor::div[@class='form-group']")
-            error_message = email_group.find_element(By.CLASS_NAME, "error-message")
-            error_text = error_message.text
+            error_text = self.waits.error_message("email")
             
             if "disposable" in error_text.lower():
                 print(f"  ✓ Disposable email rejected: '{error_text}'")
             else:
                 print(f"  ⚠️  Error message: '{error_text}'")
+                self.results.warn(f"Disposable email error does not mention disposable: '{error_text}'")
                 
         except Exception as e:
             print(f"  ⚠️  Could not verify disposable email check")
+            self.results.warn(f"Could not verify disposable email check: {e}")
             
         self.take_screenshot("12_disposable_email")
         
@@ -348,14 +354,21 @@ class RegistrationFormTestFlowC:
         print("\n  • Correcting with valid email: test@gmail.com")
         email_field.clear()
         email_field.send_keys("test@gmail.com")
-        time.sleep(1)
+        try:
+            self.waits.field_state("email", "valid")
+        except TimeoutException:
+            print("  ⚠️  Email field not re-validated")
+            self.results.warn("Email field not re-validated after correction")
         
         print("\n  ✓ Disposable email validation tested\n")
         
     def teardown(self):
         """Close browser"""
+        if not self.owns_driver:
+            # Pooled drivers are reset and reused by their DriverPool
+            print("[TEARDOWN] Returning browser to pool\n")
+            return
         print("[TEARDOWN] Closing browser...")
-        time.sleep(2)
         if self.driver:
             self.driver.quit()
         print("✓ Browser closed\n")
@@ -367,38 +380,8 @@ def main():
     
     test = RegistrationFormTestFlowC(URL)
     
-    try:
-        test.setup()
-        test.test_launch_page()
-        test.test_country_state_dependency()
-        test.test_state_city_dependency()
-        test.test_password_strength_validation()
-        test.test_confirm_password_mismatch()
-        test.test_submit_button_validation()
-        test.test_disposable_email_validation()
-        
-        print("\n" + "=" * 80)
-        print("FLOW C - FORM LOGIC VALIDATION COMPLETED")
-        print("=" * 80)
-        print("\nTest Results Summary:")
-        print("  ✓ Country → State dependency validated")
-        print("  ✓ State → City dependency validated")
-        print("  ✓ Password strength meter validated")
-        print("  ✓ Password mismatch detection validated")
-        print("  ✓ Submit button state management validated")
-        print("  ✓ Disposable email detection validated")
-        print("\n" + "🎉 " * 20)
-        print("ALL LOGIC TESTS PASSED!")
-        print("🎉 " * 20 + "\n")
-        
-    except Exception as e:
-        print(f"\n❌ ERROR: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        
-    finally:
-        test.teardown()
+    return run_standalone(test)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
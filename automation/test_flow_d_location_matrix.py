@@ -0,0 +1,322 @@
+"""
+Selenium Automation Script - Flow D (Location Matrix)
+Checks every Country → State → City path against the source location data,
+split into deterministic shards that can run in parallel browser workers
+"""
+
+from selenium.webdriver.support.ui import WebDriverWait
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from backend.frontend_data import load_frontend_data
+from driver_factory import create_driver
+from page_state import reset_page
+from results import ResultRecorder, run_standalone
+from screenshot_store import get_store
+from waits import FormWaits
+
+
+# Pairs checked per execute_script call, keeps each script well under the script timeout
+BATCH_SIZE = 100
+
+# Every country's chunk as the page loads it, keyed by country
+LOCATION_DATA_JS = """
+const done = arguments[arguments.length - 1];
+const countries = Object.keys(locationIndex);
+Promise.all(countries.map(name => loadCountryLocations(name)))
+    .then(chunks => done(Object.fromEntries(countries.map((name, i) => [name, chunks[i]]))));
+"""
+
+# Replaces the page's country index in place (it is a const binding), seeds the chunk
+# cache so nothing is fetched, and rebuilds the country list
+LOAD_LOCATION_DATA_JS = """
+Object.keys(locationIndex).forEach(key => delete locationIndex[key]);
+locationChunks.clear();
+Object.entries(arguments[0]).forEach(([name, states]) => {
+    locationIndex[name] = 'generated';
+    locationChunks.set(name, Promise.resolve(states));
+});
+const country = document.getElementById('country');
+country.innerHTML = '<option value="">Select Country</option>';
+initializeCountryDropdown();
+return country.options.length - 1;
+"""
+
+# Drives the real change handlers for each (country, state) pair and reports what the dropdowns show
+MATRIX_JS = """
+const pairs = arguments[0];
+const done = arguments[arguments.length - 1];
+const country = document.getElementById('country');
+const state = document.getElementById('state');
+const city = document.getElementById('city');
+const citySearch = document.getElementById('citySearch');
+
+// Waits for the handler to populate the next dropdown
+async function select(el, value) {
+    el.value = value;
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+    await locationUpdate;
+    return el.value === value;
+}
+
+function options(el) {
+    return Array.from(el.options).filter(o => o.value).map(o => o.text);
+}
+
+async function check([countryName, stateName]) {
+    const observed = { country: countryName, state: stateName };
+    if (country.value !== countryName) {
+        observed.countrySelected = await select(country, countryName);
+    } else {
+        observed.countrySelected = true;
+    }
+    observed.stateDisabled = state.disabled;
+    observed.states = options(state);
+    observed.stateSelected = await select(state, stateName);
+    observed.unselectableCities = [];
+    if (!citySearch.hidden) {
+        // Large state: every city must be selectable through the type-ahead instead
+        const locations = await loadCountryLocations(countryName);
+        observed.cityDisabled = false;
+        observed.cities = [...locations[stateName]].sort();
+        for (const name of observed.cities) {
+            citySearch.value = name;
+            await handleCitySearchChange();
+            if (city.value !== name) observed.unselectableCities.push(name);
+        }
+        return observed;
+    }
+    observed.cityDisabled = city.disabled;
+    observed.cities = options(city);
+    for (const name of observed.cities) {
+        if (!(await select(city, name))) observed.unselectableCities.push(name);
+    }
+    return observed;
+}
+
+(async () => {
+    const results = [];
+    for (const pair of pairs) results.push(await check(pair));
+    return results;
+})().then(done, error => done({ error: String(error) }));
+"""
+
+
+def generate_location_data(countries, states, cities, seed=0):
+    """Synthetic locationData with the given number of countries, states per country and cities per state
+
+    Keys are inserted in shuffled order so the page's sorting is exercised.
+    """
+    rng = random.Random(seed)
+    data = {}
+    country_ids = list(range(1, countries + 1))
+    rng.shuffle(country_ids)
+    for c in country_ids:
+        country_states = {}
+        state_ids = list(range(1, states + 1))
+        rng.shuffle(state_ids)
+        for s in state_ids:
+            city_ids = list(range(1, cities + 1))
+            rng.shuffle(city_ids)
+            country_states[f"State {c:03d}-{s:03d}"] = [f"City {c:03d}-{s:03d}-{i:04d}" for i in city_ids]
+        data[f"Country {c:03d}"] = country_states
+    return data
+
+
+def location_pairs(location_data):
+    """Every (country, state) pair in a stable order"""
+    return [
+        (country, state)
+        for country in sorted(location_data)
+        for state in sorted(location_data[country])
+    ]
+
+
+def shard(items, shard_index, shard_count):
+    """Deterministic round-robin slice of items for one shard"""
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"shard_index must be in [0, {shard_count}), got {shard_index}")
+    return items[shard_index::shard_count]
+
+
+class RegistrationFormTestFlowD:
+    # Steps in execution order, used by run_flows.py
+    STEPS = (
+        "test_launch_page",
+        "test_load_location_data",
+        "test_country_options",
+        "test_location_matrix",
+    )
+    # run_flows.py may split this flow across workers with shard_index/shard_count
+    SHARDABLE = True
+
+    def __init__(self, url, screenshots_dir="../screenshots/flow_d", headless=False,
+                 shard_index=0, shard_count=1, generated=None):
+        self.url = url
+        self.headless = headless
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        # (countries, states, cities) to test a synthetic dataset instead of data.js
+        self.generated = generated
+        self.driver = None
+        self.owns_driver = True
+        self.wait = None
+        self.waits = None
+        self.location_data = None
+        self.screenshots_dir = screenshots_dir
+        self.results = ResultRecorder("flow_d")
+
+        os.makedirs(self.screenshots_dir, exist_ok=True)
+
+    def setup(self, driver=None):
+        """Initialize WebDriver, or adopt a warm one borrowed from a DriverPool"""
+        print("=" * 80)
+        print(f"FLOW D - LOCATION MATRIX TEST (shard {self.shard_index + 1}/{self.shard_count})")
+        print("=" * 80)
+        print("\n[SETUP] Initializing Chrome WebDriver...")
+
+        self.owns_driver = driver is None
+        self.driver = driver or create_driver(self.headless)
+        self.wait = WebDriverWait(self.driver, 10)
+        self.waits = FormWaits(self.driver)
+        print("✓ Chrome WebDriver initialized successfully\n")
+
+    def take_screenshot(self, name):
+        """Capture a screenshot; encoding and the disk write happen in the background"""
+        filename = get_store().capture(self.driver, self.screenshots_dir, name)
+        self.results.artifact(filename)
+        print(f"  📸 Screenshot saved: {filename}")
+
+    def test_launch_page(self):
+        """Launch and verify page"""
+        print("[TEST 1] Launching web page...")
+        self.driver.get(self.url)
+        self.waits.page_ready()
+
+        print(f"  • Page URL: {self.driver.current_url}")
+        print("  ✓ Page loaded successfully\n")
+
+    def test_load_location_data(self):
+        """Read the source location data, or load a generated dataset into the page"""
+        print("[TEST 2] Loading location data...\n")
+
+        if self.generated:
+            countries, states, cities = self.generated
+            self.location_data = generate_location_data(countries, states, cities)
+            loaded = self.driver.execute_script(LOAD_LOCATION_DATA_JS, self.location_data)
+            print(f"  • Generated dataset: {countries} countries × {states} states × {cities} cities")
+            print(f"  • Countries loaded into page: {loaded}")
+        else:
+            self.location_data = load_frontend_data().location_data
+            print(f"  • Source dataset: {len(self.location_data)} countries parsed from data.js")
+            if self.driver.execute_async_script(LOCATION_DATA_JS) != self.location_data:
+                raise AssertionError("Page location chunks differ from frontend/data.js")
+
+        print("  ✓ Location data ready\n")
+
+    def test_country_options(self):
+        """Country dropdown lists every country in sorted order"""
+        print("[TEST 3] Checking Country dropdown...\n")
+
+        expected = sorted(self.location_data)
+        observed = self.waits.dropdown_ready("country")
+        if observed != expected:
+            raise AssertionError(f"Country options {observed} != expected {expected}")
+
+        print(f"  ✓ All {len(expected)} countries listed in sorted order\n")
+        self.take_screenshot("01_country_options")
+
+    def test_location_matrix(self):
+        """Every Country → State → City path in this shard populates the dropdowns correctly"""
+        pairs = shard(location_pairs(self.location_data), self.shard_index, self.shard_count)
+        city_paths = sum(len(self.location_data[c][s]) for c, s in pairs)
+        print(f"[TEST 4] Checking {len(pairs)} state paths and {city_paths} city paths...\n")
+
+        reset_page(self.driver)
+        failures = []
+        for start in range(0, len(pairs), BATCH_SIZE):
+            batch = pairs[start:start + BATCH_SIZE]
+            observed_batch = self.driver.execute_async_script(MATRIX_JS, [list(p) for p in batch])
+            if isinstance(observed_batch, dict):
+                raise AssertionError(f"Location matrix script failed: {observed_batch['error']}")
+            for observed in observed_batch:
+                failures.extend(self.check_path(observed))
+
+        self.results.check(not failures, f"{city_paths} city paths match the source data",
+                           "; ".join(failures[:20]) or None)
+        if failures:
+            for failure in failures[:20]:
+                print(f"  ✗ {failure}")
+            if len(failures) > 20:
+                print(f"  ✗ ... and {len(failures) - 20} more")
+            raise AssertionError(f"{len(failures)} location paths did not match the source data")
+
+        print(f"  ✓ All {city_paths} Country → State → City paths match the source data\n")
+
+    def check_path(self, observed):
+        """Compare one observed (country, state) pair with the source data; returns failure messages"""
+        country, state = observed["country"], observed["state"]
+        path = f"{country} → {state}"
+        failures = []
+
+        if not observed["countrySelected"]:
+            return [f"{country}: country not selectable"]
+        if observed["stateDisabled"]:
+            failures.append(f"{country}: state dropdown disabled")
+        expected_states = sorted(self.location_data[country])
+        if observed["states"] != expected_states:
+            failures.append(f"{country}: states {observed['states']} != {expected_states}")
+        if not observed["stateSelected"]:
+            return failures + [f"{path}: state not selectable"]
+        if observed["cityDisabled"]:
+            failures.append(f"{path}: city dropdown disabled")
+        expected_cities = sorted(self.location_data[country][state])
+        if observed["cities"] != expected_cities:
+            failures.append(f"{path}: cities {observed['cities']} != {expected_cities}")
+        for city in observed["unselectableCities"]:
+            failures.append(f"{path} → {city}: city not selectable")
+        return failures
+
+    def teardown(self):
+        """Close browser"""
+        if not self.owns_driver:
+            # Pooled drivers are reset and reused by their DriverPool
+            print("[TEARDOWN] Returning browser to pool\n")
+            return
+        print("[TEARDOWN] Closing browser...")
+        if self.driver:
+            self.driver.quit()
+        print("✓ Browser closed\n")
+
+
+def parse_dimensions(value):
+    """'20x10x50' -> (20, 10, 50)"""
+    parts = value.lower().split("x")
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError("expected COUNTRIESxSTATESxCITIES, e.g. 20x10x50")
+    return tuple(int(p) for p in parts)
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Flow D - location matrix")
+    parser.add_argument("--url", default="http://localhost:8000/registration.html")
+    parser.add_argument("--shard-index", type=int, default=0)
+    parser.add_argument("--shard-count", type=int, default=1)
+    parser.add_argument("--generated", type=parse_dimensions, default=None,
+                        help="test a synthetic dataset, e.g. 20x10x50")
+    args = parser.parse_args()
+
+    test = RegistrationFormTestFlowD(
+        args.url, shard_index=args.shard_index, shard_count=args.shard_count, generated=args.generated
+    )
+
+    return run_standalone(test)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Step Timing
+Times every flow step, WebDriver command, condition wait and screenshot of a flow run,
+then exports the spans as JSON, as a Chrome trace (open in chrome://tracing or
+https://ui.perfetto.dev) and as a per-step summary table
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Span categories, outermost first
+CATEGORY_FLOW = "flow"
+CATEGORY_SETUP = "setup"
+CATEGORY_STEP = "step"
+CATEGORY_WAIT = "wait"
+CATEGORY_SCREENSHOT = "screenshot"
+CATEGORY_COMMAND = "command"
+
+# FormWaits helpers that only implement the others
+WAIT_PRIMITIVES = ("until", "until_script")
+
+
+def now_us():
+    """Monotonic microseconds; CLOCK_MONOTONIC is shared by processes, so traces from
+    different workers line up"""
+    return time.perf_counter_ns() // 1000
+
+
+class StepTimer:
+    """Collects timed spans as Chrome trace 'complete' events"""
+
+    def __init__(self, process_name=None):
+        self.pid = os.getpid()
+        self.process_name = process_name
+        self.events = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """Time a with-block; exceptions are recorded on the span and re-raised"""
+        started = now_us()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(name, category, started, now_us() - started, args)
+
+    def record(self, name, category, start_us, duration_us, args=None):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_us,
+            "dur": duration_us,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def wrap(self, func, name, category):
+        """func timed as a span on every call"""
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with self.span(name, category):
+                return func(*args, **kwargs)
+        return timed
+
+    def metadata(self):
+        """Trace metadata event naming this timer's process"""
+        if not self.process_name:
+            return []
+        return [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": self.process_name}}]
+
+    def trace_events(self):
+        return self.metadata() + sorted(self.events, key=lambda e: e["ts"])
+
+
+def instrument_flow(flow, timer):
+    """Time the flow's test_* steps, take_screenshot() and FormWaits calls"""
+    for name in dir(type(flow)):
+        if name.startswith("test_") and callable(getattr(flow, name)):
+            setattr(flow, name, timer.wrap(getattr(flow, name), name, CATEGORY_STEP))
+    if callable(getattr(flow, "take_screenshot", None)):
+        flow.take_screenshot = _wrap_screenshot(flow.take_screenshot, timer)
+    if getattr(flow, "waits", None) is not None:
+        instrument_waits(flow.waits, timer)
+    return flow
+
+
+def _wrap_screenshot(take_screenshot, timer):
+    @functools.wraps(take_screenshot)
+    def timed(name, *args, **kwargs):
+        with timer.span("take_screenshot", CATEGORY_SCREENSHOT, screenshot=name):
+            return take_screenshot(name, *args, **kwargs)
+    return timed
+
+
+def instrument_waits(waits, timer):
+    """Time each FormWaits condition (dropdown_ready, alert_present, ...)"""
+    for name in dir(type(waits)):
+        if name.startswith("_") or name in WAIT_PRIMITIVES or not callable(getattr(waits, name)):
+            continue
+        setattr(waits, name, timer.wrap(getattr(waits, name), name, CATEGORY_WAIT))
+    return waits
+
+
+def instrument_driver(driver, timer):
+    """Time every WebDriver command (get, findElement, executeScript, ...)
+
+    Shadows driver.execute on the instance, so pooled drivers must be passed to
+    uninstrument_driver() before they go back to their pool.
+    """
+    execute = type(driver).execute.__get__(driver)
+
+    @functools.wraps(execute)
+    def timed(driver_command, params=None):
+        with timer.span(driver_command, CATEGORY_COMMAND):
+            return execute(driver_command, params)
+
+    driver.execute = timed
+    return driver
+
+
+def uninstrument_driver(driver):
+    driver.__dict__.pop("execute", None)
+    return driver
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(events):
+    """Per (category, name) totals in milliseconds, slowest total first"""
+    groups = {}
+    for event in events:
+        if event.get("ph") == "X":
+            durations, errors = groups.setdefault((event["cat"], event["name"]), ([], []))
+            durations.append(event["dur"])
+            if event.get("args", {}).get("error"):
+                errors.append(event["args"]["error"])
+
+    rows = []
+    for (category, name), (durations, errors) in groups.items():
+        durations.sort()
+        total = sum(durations)
+        rows.append({
+            "category": category,
+            "name": name,
+            "count": len(durations),
+            "total_ms": round(total / 1000, 2),
+            "mean_ms": round(total / len(durations) / 1000, 2),
+            "p50_ms": round(percentile(durations, 0.50) / 1000, 2),
+            "p95_ms": round(percentile(durations, 0.95) / 1000, 2),
+            "max_ms": round(durations[-1] / 1000, 2),
+            "errors": len(errors),
+        })
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+
+def print_summary(rows, limit=25):
+    """Print summarize() rows as a table"""
+    print(f"{'CATEGORY':<11} {'NAME':<34} {'COUNT':>6} {'TOTAL ms':>10} {'MEAN':>8} "
+          f"{'P50':>8} {'P95':>8} {'MAX':>8}")
+    for row in rows[:limit]:
+        name = row["name"] if len(row["name"]) <= 34 else row["name"][:31] + "..."
+        errors = f"  ✗ {row['errors']}" if row["errors"] else ""
+        print(f"{row['category']:<11} {name:<34} {row['count']:>6} {row['total_ms']:>10.1f} "
+              f"{row['mean_ms']:>8.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+              f"{row['max_ms']:>8.1f}{errors}")
+    if len(rows) > limit:
+        print(f"... {len(rows) - limit} more in timing.json")
+
+
+def write_trace(path, events):
+    """Write trace events in Chrome's JSON object format"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def write_timing(path, events):
+    """Write raw spans and their summary as plain JSON"""
+    spans = [
+        {key: event[key] for key in ("name", "cat", "ts", "dur", "pid", "tid", "args") if key in event}
+        for event in events if event.get("ph") == "X"
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"summary": summarize(events), "spans": spans}, f, indent=2)
\ No newline at end of file
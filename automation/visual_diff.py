@@ -0,0 +1,277 @@
+"""
+Visual Regression
+Compares every named screenshot of a run (flow_b/08_strong_password, ...) with its
+baseline in screenshots/baselines/. Pixels whose largest channel difference exceeds a
+threshold count as changed; a screenshot fails when the changed share of its unmasked
+area exceeds its tolerance. Failures get a heatmap of where the page changed.
+
+Masks and tolerances live in screenshots/baselines/visual.json:
+    {
+      "defaults": {"pixel_threshold": 16, "max_diff_ratio": 0.001},
+      "masks": [[x, y, width, height]],
+      "screenshots": {
+        "flow_b/06_success_state": {"max_diff_ratio": 0.01, "masks": [[0, 0, 1920, 120]]}
+      }
+    }
+
+Usage (from automation/):
+    python visual_diff.py compare ../screenshots/runs/<timestamp>
+    python visual_diff.py approve ../screenshots/runs/<timestamp> flow_b/08_strong_password
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from screenshot_store import link_or_copy
+
+
+AUTOMATION_DIR = os.path.dirname(os.path.abspath(__file__))
+SCREENSHOTS_ROOT = os.path.normpath(os.path.join(AUTOMATION_DIR, os.pardir, "screenshots"))
+BASELINES_DIR = os.path.join(SCREENSHOTS_ROOT, "baselines")
+CONFIG_NAME = "visual.json"
+DIFF_DIR_NAME = "visual_diff"
+
+DEFAULT_PIXEL_THRESHOLD = 16
+DEFAULT_MAX_DIFF_RATIO = 0.001
+
+# '<YYYYmmdd_HHMMSS>_<name>.png' as written by take_screenshot()
+SCREENSHOT_NAME = re.compile(r"^\d{8}_\d{6}_(?P<name>.+)\.png$")
+# Shard and profile suffixes added by run_flows.py ('flow_d.2of4', 'flow_b@3g'); every
+# shard and profile of a flow shares its baselines
+TASK_SUFFIX = re.compile(r"(\.\d+of\d+)?(@[\w-]+)?$")
+
+
+def load_config(baselines_dir=BASELINES_DIR):
+    path = os.path.join(baselines_dir, CONFIG_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def baseline_key(key):
+    """'flow_b@3g/01_empty_form' -> 'flow_b/01_empty_form', the baseline it is compared with"""
+    task, _, name = key.rpartition("/")
+    return f"{TASK_SUFFIX.sub('', task)}/{name}"
+
+
+def settings_for(config, key):
+    """(pixel_threshold, max_diff_ratio, masks) for a 'flow/name' screenshot key"""
+    key = baseline_key(key)
+    defaults = config.get("defaults", {})
+    specific = config.get("screenshots", {}).get(key, {})
+    return (
+        specific.get("pixel_threshold", defaults.get("pixel_threshold", DEFAULT_PIXEL_THRESHOLD)),
+        specific.get("max_diff_ratio", defaults.get("max_diff_ratio", DEFAULT_MAX_DIFF_RATIO)),
+        config.get("masks", []) + specific.get("masks", []),
+    )
+
+
+def run_screenshots(run_dir):
+    """{'task/name': path} for the latest screenshot of each name in each task directory
+    of a run ('flow_b/...', 'flow_b@3g/...', 'flow_d.2of4/...')"""
+    shots = {}
+    for flow in sorted(os.listdir(run_dir)):
+        flow_dir = os.path.join(run_dir, flow)
+        if not os.path.isdir(flow_dir) or flow == DIFF_DIR_NAME:
+            continue
+        for filename in sorted(os.listdir(flow_dir)):
+            match = SCREENSHOT_NAME.match(filename)
+            if match:
+                shots[f"{flow}/{match.group('name')}"] = os.path.join(flow_dir, filename)
+    return shots
+
+
+def same_bytes(a, b):
+    if os.path.getsize(a) != os.path.getsize(b):
+        return False
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        return fa.read() == fb.read()
+
+
+def load_rgb(path):
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def mask_array(shape, masks):
+    """Boolean array, False inside the [x, y, width, height] masks"""
+    keep = np.ones(shape[:2], dtype=bool)
+    for x, y, width, height in masks:
+        keep[max(0, y):max(0, y + height), max(0, x):max(0, x + width)] = False
+    return keep
+
+
+def changed_band(current, baseline):
+    """(first, last + 1) rows that differ at all, or None; compares 8 bytes at a time"""
+    a = current.reshape(current.shape[0], -1)
+    b = baseline.reshape(baseline.shape[0], -1)
+    if a.shape[1] % 8 == 0:
+        a, b = a.view(np.uint64), b.view(np.uint64)
+    rows = np.flatnonzero((a != b).any(axis=1))
+    return (int(rows[0]), int(rows[-1]) + 1) if rows.size else None
+
+
+def pixel_diff(current, baseline):
+    """Largest per-channel absolute difference of two uint8 RGB arrays"""
+    diff = np.maximum(current, baseline)
+    diff -= np.minimum(current, baseline)
+    # Channel-by-channel maximum is much faster than a strided .max(axis=2)
+    return np.maximum(np.maximum(diff[..., 0], diff[..., 1]), diff[..., 2])
+
+
+def heatmap(current, diff, keep, pixel_threshold):
+    """Dimmed grayscale of the current frame, changed pixels in red by intensity, masks in blue"""
+    # Integer luma (0.30 R + 0.59 G + 0.11 B), dimmed to about a third
+    channels = current.astype(np.uint16)
+    gray = ((channels[..., 0] * 77 + channels[..., 1] * 150 + channels[..., 2] * 29) >> 10).astype(np.uint8)
+    out = np.empty(current.shape, dtype=np.uint8)
+    out[..., 0] = out[..., 1] = out[..., 2] = gray
+    changed = (diff > pixel_threshold) & keep
+    out[..., 0][changed] = np.minimum(diff[changed].astype(np.uint16) * 2 + 96, 255).astype(np.uint8)
+    out[..., 1][changed] = 0
+    out[..., 2][changed] = 0
+    # Saturating, so bright masked pixels are tinted instead of wrapping around to dark
+    out[..., 2][~keep] = np.minimum(out[..., 2][~keep].astype(np.uint16) + 96, 255).astype(np.uint8)
+    return Image.fromarray(out)
+
+
+def compare(key, current_path, baseline_path, config, diff_dir=None):
+    """Compare one screenshot with its baseline; returns a result record"""
+    result = {"screenshot": key, "current": current_path, "baseline": baseline_path}
+    if not os.path.exists(baseline_path):
+        result["status"] = "new"
+        return result
+    # Content-addressed screenshots: an unchanged frame is usually the very same file
+    if os.path.samefile(current_path, baseline_path) or same_bytes(current_path, baseline_path):
+        result.update(status="passed", diff_ratio=0.0, changed_pixels=0)
+        return result
+
+    pixel_threshold, max_diff_ratio, masks = settings_for(config, key)
+    current, baseline = load_rgb(current_path), load_rgb(baseline_path)
+    if current.shape != baseline.shape:
+        result.update(status="failed", reason=f"size {current.shape[1]}x{current.shape[0]} "
+                                              f"!= baseline {baseline.shape[1]}x{baseline.shape[0]}")
+        return result
+
+    keep = mask_array(current.shape, masks)
+    # Pages usually change in one region: only diff the rows between the first and
+    # last differing ones
+    diff = np.zeros(current.shape[:2], dtype=np.uint8)
+    band = changed_band(current, baseline)
+    if band:
+        top, bottom = band
+        diff[top:bottom] = pixel_diff(current[top:bottom], baseline[top:bottom])
+    else:
+        top = bottom = 0
+    changed = (diff[top:bottom] > pixel_threshold) & keep[top:bottom]
+    changed_pixels = int(np.count_nonzero(changed))
+    ratio = changed_pixels / (int(np.count_nonzero(keep)) or 1)
+    result.update(
+        status="passed" if ratio <= max_diff_ratio else "failed",
+        changed_pixels=changed_pixels,
+        diff_ratio=round(ratio, 6),
+        max_diff_ratio=max_diff_ratio,
+    )
+    if changed_pixels:
+        rows = np.flatnonzero(changed.any(axis=1)) + top
+        cols = np.flatnonzero(changed.any(axis=0))
+        result["changed_box"] = [int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1)]
+    if result["status"] == "failed" and diff_dir:
+        heatmap_path = os.path.join(diff_dir, f"{key}.png")
+        os.makedirs(os.path.dirname(heatmap_path), exist_ok=True)
+        heatmap(current, diff, keep, pixel_threshold).save(heatmap_path, compress_level=1)
+        result["heatmap"] = heatmap_path
+    return result
+
+
+def compare_run(run_dir, baselines_dir=BASELINES_DIR, workers=None):
+    """Compare every screenshot of a run; heatmaps go to <run_dir>/visual_diff/"""
+    config = load_config(baselines_dir)
+    shots = run_screenshots(run_dir)
+    diff_dir = os.path.join(run_dir, DIFF_DIR_NAME)
+    # PNG decoding and the NumPy passes release the GIL, so threads scale across cores
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) + 4)) as pool:
+        results = list(pool.map(
+            lambda item: compare(item[0], item[1], os.path.join(baselines_dir, f"{baseline_key(item[0])}.png"),
+                                 config, diff_dir),
+            sorted(shots.items()),
+        ))
+    summary = {status: sum(1 for r in results if r["status"] == status) for status in ("passed", "failed", "new")}
+    return {"summary": summary, "results": results}
+
+
+def approve(run_dir, keys=None, baselines_dir=BASELINES_DIR):
+    """Make a run's screenshots (all, or the given keys) the new baselines; returns the keys"""
+    shots = run_screenshots(run_dir)
+    selected = keys or sorted(shots)
+    unknown = [key for key in selected if key not in shots]
+    if unknown:
+        raise ValueError(f"Not in this run: {', '.join(unknown)}")
+    # Profiles of a flow share its baselines, so only one of them can be approved
+    targets = {}
+    for key in selected:
+        targets.setdefault(baseline_key(key), []).append(key)
+    clashes = [" / ".join(group) for group in targets.values() if len(group) > 1]
+    if clashes:
+        raise ValueError(f"Same baseline for {'; '.join(clashes)}; name the one to approve")
+    for key in selected:
+        target = os.path.join(baselines_dir, f"{baseline_key(key)}.png")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Linked to the run's stored object, so identical future frames match by inode
+        link_or_copy(shots[key], target)
+    return selected
+
+
+def print_report(report):
+    summary = report["summary"]
+    print("=" * 80)
+    print("VISUAL REGRESSION")
+    print("=" * 80)
+    for result in report["results"]:
+        if result["status"] == "failed":
+            detail = result.get("reason") or f"{result['diff_ratio'] * 100:.3f}% changed"
+            print(f"  ✗ {result['screenshot']}: {detail}")
+            if result.get("heatmap"):
+                print(f"      heatmap: {result['heatmap']}")
+        elif result["status"] == "new":
+            print(f"  • {result['screenshot']}: no baseline")
+    print(f"\n  ✓ {summary['passed']} passed, ✗ {summary['failed']} failed, • {summary['new']} without baseline")
+    print("=" * 80 + "\n")
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Visual regression against baseline screenshots")
+    parser.add_argument("--baselines", default=BASELINES_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    compare_parser = commands.add_parser("compare", help="compare a run with the baselines")
+    compare_parser.add_argument("run_dir")
+    compare_parser.add_argument("--workers", type=int, default=None)
+    approve_parser = commands.add_parser("approve", help="store a run's screenshots as baselines")
+    approve_parser.add_argument("run_dir")
+    approve_parser.add_argument("screenshots", nargs="*", help="task/name keys, e.g. flow_b@3g/01_empty_form "
+                                                                "(default: all)")
+    args = parser.parse_args(argv)
+
+    if args.command == "approve":
+        approved = approve(args.run_dir, args.screenshots, args.baselines)
+        print(f"✓ Approved {len(approved)} baselines into {args.baselines}")
+        return 0
+
+    report = compare_run(args.run_dir, args.baselines, args.workers)
+    print_report(report)
+    with open(os.path.join(args.run_dir, "visual.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return 1 if report["summary"]["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Condition-based waits shared by all automation flows
+Polls the registration page with small JavaScript predicates instead of fixed time.sleep() pauses
+"""
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_POLL_INTERVAL = 0.05
+
+
+# Each predicate runs in a single execute_script round trip and returns a
+# falsy value until the condition holds, then the value the caller needs.
+PAGE_READY_JS = """
+return document.readyState === 'complete'
+    && document.getElementById('country').options.length > 1;
+"""
+
+DROPDOWN_READY_JS = """
+const select = document.getElementById(arguments[0]);
+if (!select || select.disabled) return null;
+const options = Array.from(select.options).filter(o => o.value).map(o => o.text);
+return options.length ? options : null;
+"""
+
+DROPDOWN_DISABLED_JS = """
+const select = document.getElementById(arguments[0]);
+return select.disabled && select.options.length <= 1;
+"""
+
+CITY_INPUT_JS = """
+if (!document.getElementById('citySearch').hidden) return 'search';
+const city = document.getElementById('city');
+return !city.disabled && city.options.length > 1 ? 'dropdown' : null;
+"""
+
+STRENGTH_TEXT_JS = """
+const text = document.querySelector('.strength-text');
+return text ? text.textContent : '';
+"""
+
+FIELD_STATE_JS = """
+const field = document.getElementById(arguments[0]);
+if (field.classList.contains('invalid')) return 'invalid';
+if (field.classList.contains('valid')) return 'valid';
+return '';
+"""
+
+ERROR_MESSAGE_JS = """
+const group = document.getElementById(arguments[0]).closest('.form-group');
+const error = group ? group.querySelector('.error-message') : null;
+return error ? error.textContent : '';
+"""
+
+ALERT_JS = """
+return document.querySelector('#alertContainer .alert-' + arguments[0]);
+"""
+
+SUBMIT_ENABLED_JS = """
+return !document.getElementById('submitBtn').disabled;
+"""
+
+FORM_RESET_JS = """
+const form = document.getElementById('registrationForm');
+return document.getElementById('firstName').value === ''
+    && document.getElementById('state').disabled
+    && document.getElementById('city').disabled
+    && !document.getElementById('terms').checked
+    && form.querySelectorAll('.valid, .invalid').length === 0;
+"""
+
+SCROLL_POSITION_JS = """
+return [window.scrollX, window.scrollY];
+"""
+
+
+class FormWaits:
+    """Wait for registration page states with a configurable timeout and poll interval"""
+
+    def __init__(self, driver, timeout=DEFAULT_TIMEOUT, poll_interval=DEFAULT_POLL_INTERVAL):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def until(self, condition, message="", timeout=None):
+        """Poll a callable taking the driver until it returns a truthy value"""
+        wait = WebDriverWait(
+            self.driver,
+            self.timeout if timeout is None else timeout,
+            poll_frequency=self.poll_interval
+        )
+        return wait.until(condition, message)
+
+    def until_script(self, script, *args, message="", timeout=None):
+        """Poll a JavaScript predicate until it returns a truthy value"""
+        return self.until(lambda d: d.execute_script(script, *args), message, timeout)
+
+    def page_ready(self, timeout=None):
+        """Document loaded and country dropdown initialized"""
+        return self.until_script(PAGE_READY_JS, message="registration page not ready", timeout=timeout)
+
+    def dropdown_ready(self, select_id, previous=None, expected=None, timeout=None):
+        """Dropdown enabled and populated; returns its option texts without the placeholder
+
+        Pass the previously returned options to wait until the list is rebuilt for a new parent
+        value, or an expected option text to wait until that option is available.
+        """
+        def condition(driver):
+            options = driver.execute_script(DROPDOWN_READY_JS, select_id)
+            if not options or options == previous:
+                return None
+            if expected is not None and expected not in options:
+                return None
+            return options
+
+        return self.until(condition, f"'{select_id}' dropdown not populated", timeout)
+
+    def dropdown_disabled(self, select_id, timeout=None):
+        """Dropdown disabled and holding only its placeholder option"""
+        return self.until_script(
+            DROPDOWN_DISABLED_JS, select_id,
+            message=f"'{select_id}' dropdown not disabled", timeout=timeout
+        )
+
+    def city_input_ready(self, timeout=None):
+        """City dropdown populated, or the type-ahead shown for a large state; returns
+        'dropdown' or 'search'"""
+        return self.until_script(CITY_INPUT_JS, message="city input not ready", timeout=timeout)
+
+    def strength_text_changed(self, previous="", timeout=None):
+        """Password strength text differs from the previous value; returns the new text"""
+        def condition(driver):
+            text = driver.execute_script(STRENGTH_TEXT_JS)
+            return text if text != previous else None
+
+        return self.until(condition, "strength text did not change", timeout)
+
+    def field_state(self, field_id, state, timeout=None):
+        """Field carries the 'valid' or 'invalid' class"""
+        return self.until(
+            lambda d: d.execute_script(FIELD_STATE_JS, field_id) == state,
+            f"'{field_id}' not marked {state}", timeout
+        )
+
+    def error_message(self, field_id, timeout=None):
+        """Error message under the field is non-empty; returns its text"""
+        return self.until_script(
+            ERROR_MESSAGE_JS, field_id,
+            message=f"no error message for '{field_id}'", timeout=timeout
+        )
+
+    def alert_present(self, kind="success", timeout=None):
+        """Alert of the given kind shown; returns the alert element"""
+        return self.until_script(ALERT_JS, kind, message=f"alert-{kind} not shown", timeout=timeout)
+
+    def submit_enabled(self, timeout=None):
+        """Submit button enabled"""
+        return self.until_script(SUBMIT_ENABLED_JS, message="submit button still disabled", timeout=timeout)
+
+    def form_reset_complete(self, timeout=None):
+        """Form cleared, validation classes removed and dependent dropdowns disabled"""
+        return self.until_script(FORM_RESET_JS, message="form was not reset", timeout=timeout)
+
+    def scroll_settled(self, timeout=None):
+        """Smooth scrolling finished (position unchanged between two polls)"""
+        last = [None]
+
+        def condition(driver):
+            position = driver.execute_script(SCROLL_POSITION_JS)
+            settled = position == last[0]
+            last[0] = position
+            return settled
+
+        return self.until(condition, "page still scrolling", timeout)
@@ -0,0 +1,3 @@
+"""
+Server-side Python for the registration system
+"""
@@ -0,0 +1,296 @@
+"""
+Disposable Email Domain Index
+Suffix-aware blocklist: a domain matches when it or any parent domain is listed, so
+x.mailinator.com is caught by mailinator.com. Domains are IDNA-normalized and stored as
+a sorted array of reversed labels ('com.mailinator'), which is built offline from a text
+list into a file that is memory-mapped on load, and exported as a front-coded text blob
+that validation.js fetches lazily.
+
+Run from the project root:
+    python -m backend.disposable_index build --list blocklist.txt
+    python -m backend.disposable_index check x.mailinator.com
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+from backend.frontend_data import CACHE_DIR, PROJECT_DIR, load_frontend_data
+
+
+DOMAIN_LIST_PATH = os.path.join(PROJECT_DIR, "backend", "disposable_domains.txt")
+FRONTEND_BLOB_PATH = os.path.join(PROJECT_DIR, "frontend", "disposable-domains.txt")
+
+MAGIC = b"DDIX"
+INDEX_VERSION = 2
+# Label separator inside the binary index. It sorts below every domain character, so a
+# domain's subdomains directly follow it and a lookup needs a single binary search.
+SEPARATOR = "\x01"
+# magic, version, entry count; followed by count + 1 uint32 offsets and the key bytes
+HEADER = struct.Struct("<4sII")
+BLOB_HEADER = "# disposable-domains v1"
+# Distinct domains remembered by DisposableIndex.is_disposable()
+LOOKUP_CACHE_SIZE = 65536
+
+_memo = {}
+
+
+def normalize_domain(domain):
+    """Lowercase ASCII form of a domain, with IDN labels in punycode; '' when unusable"""
+    domain = domain.strip().rstrip(".").lower()
+    if domain.startswith("*."):
+        domain = domain[2:]
+    domain = domain.lstrip(".@")
+    if not domain or domain.isascii():
+        return domain
+    try:
+        return domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return ""
+
+
+def reverse_labels(domain):
+    """'x.mailinator.com' -> 'com.mailinator.x'"""
+    return ".".join(reversed(domain.split(".")))
+
+
+def index_order(key):
+    return key.replace(".", SEPARATOR)
+
+
+def compact_keys(domains):
+    """Reversed keys in index order, dropping entries already covered by a listed parent"""
+    keys = sorted({reverse_labels(d) for d in map(normalize_domain, domains) if d}, key=index_order)
+    compacted = []
+    for key in keys:
+        # Index order puts a parent ('com.mailinator') right before its subdomains
+        if compacted and key.startswith(compacted[-1] + "."):
+            continue
+        compacted.append(key)
+    return compacted
+
+
+def read_domain_list(path):
+    """Domains from a text list: one per line, '#' comments and blank lines ignored"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            domain = line.split("#", 1)[0].strip()
+            if domain:
+                yield domain
+
+
+def build_index(keys):
+    """Binary index for compact_keys() output"""
+    encoded = [index_order(key).encode("ascii") for key in keys]
+    offsets = array("I", [0])
+    for key in encoded:
+        offsets.append(offsets[-1] + len(key))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return HEADER.pack(MAGIC, INDEX_VERSION, len(encoded)) + offsets.tobytes() + b"".join(encoded)
+
+
+def encode_blob(keys):
+    """Front-coded text: each line is '<chars shared with previous key> <rest of key>'"""
+    lines = [BLOB_HEADER]
+    previous = ""
+    for key in keys:
+        shared = 0
+        limit = min(len(key), len(previous))
+        while shared < limit and key[shared] == previous[shared]:
+            shared += 1
+        lines.append(f"{shared} {key[shared:]}")
+        previous = key
+    return "\n".join(lines) + "\n"
+
+
+def decode_blob(text):
+    """Reversed keys from encode_blob() output"""
+    keys = []
+    previous = ""
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        shared, _, rest = line.partition(" ")
+        previous = previous[:int(shared)] + rest
+        keys.append(previous)
+    return keys
+
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class DisposableIndex:
+    """Read-only suffix index over a build_index() buffer, usually a memory map"""
+
+    def __init__(self, buffer, source=None):
+        magic, version, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != INDEX_VERSION:
+            raise ValueError("Not a disposable domain index (or an older version)")
+        self.source = source
+        self.count = count
+        self._buffer = buffer
+        offsets_end = HEADER.size + 4 * (count + 1)
+        if sys.byteorder == "little":
+            self._offsets = memoryview(buffer)[HEADER.size:offsets_end].cast("I")
+        else:
+            self._offsets = array("I", buffer[HEADER.size:offsets_end])
+            self._offsets.byteswap()
+        self._keys_start = offsets_end
+        self._file = None
+        self.is_disposable = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._is_disposable)
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map an index file"""
+        f = open(path, "rb")
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            f.close()
+            raise ValueError(f"{path} is empty")
+        index = cls(buffer, source=path)
+        index._file = f
+        return index
+
+    @classmethod
+    def from_domains(cls, domains):
+        """In-memory index, mainly for tests and small lists"""
+        return cls(build_index(compact_keys(domains)))
+
+    def close(self):
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return self.count
+
+    def key(self, i):
+        start = self._keys_start + self._offsets[i]
+        end = self._keys_start + self._offsets[i + 1]
+        return self._buffer[start:end]
+
+    def keys(self):
+        """Reversed keys ('com.mailinator') in index order"""
+        for i in range(self.count):
+            yield self.key(i).decode("ascii").replace(SEPARATOR, ".")
+
+    def match(self, domain):
+        """Listed domain that blocks `domain` (itself or a parent), or None"""
+        normalized = normalize_domain(domain)
+        if not normalized:
+            return None
+        query = index_order(reverse_labels(normalized)).encode("ascii")
+
+        # Last key <= query. Subdomains of listed domains were compacted away, so if
+        # any parent of the query is listed it is exactly this key.
+        buffer, offsets, base = self._buffer, self._offsets, self._keys_start
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if query < buffer[base + offsets[mid]:base + offsets[mid + 1]]:
+                hi = mid
+            else:
+                lo = mid + 1
+        if lo == 0:
+            return None
+        key = self.key(lo - 1)
+        if query == key or query.startswith(key + SEPARATOR.encode()):
+            return reverse_labels(key.decode("ascii").replace(SEPARATOR, "."))
+        return None
+
+    def _is_disposable(self, domain):
+        return self.match(domain) is not None
+
+
+def collect_domains(list_paths=(DOMAIN_LIST_PATH,)):
+    """Every domain from the text lists plus the inline data.js list"""
+    domains = set(load_frontend_data().disposable_domains)
+    for path in list_paths:
+        domains.update(read_domain_list(path))
+    return domains
+
+
+def index_cache_path(list_paths, cache_dir=CACHE_DIR):
+    """Index location keyed by the content of the source lists and data.js"""
+    digest = hashlib.sha256(load_frontend_data().source_hash.encode())
+    for path in list_paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return os.path.join(cache_dir, f"disposable-v{INDEX_VERSION}-{digest.hexdigest()[:16]}.idx")
+
+
+def build(list_paths=(DOMAIN_LIST_PATH,), index_path=None, blob_path=FRONTEND_BLOB_PATH):
+    """Build the mmap index and frontend blob; returns (index path, key count)"""
+    keys = compact_keys(collect_domains(list_paths))
+    index_path = index_path or index_cache_path(list_paths)
+    write_atomic(index_path, build_index(keys))
+    if blob_path:
+        write_atomic(blob_path, encode_blob(keys).encode("ascii"))
+    return index_path, len(keys)
+
+
+def load_disposable_index(list_paths=(DOMAIN_LIST_PATH,), cache_dir=CACHE_DIR):
+    """Memory-mapped index for the given lists, built into the cache on first use"""
+    list_paths = tuple(list_paths)
+    index_path = index_cache_path(list_paths, cache_dir)
+    if index_path in _memo:
+        return _memo[index_path]
+    if not os.path.exists(index_path):
+        build(list_paths, index_path, blob_path=None)
+    index = _memo[index_path] = DisposableIndex.open(index_path)
+    return index
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Disposable email domain index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="build the index and the frontend blob")
+    build_parser.add_argument("--list", action="append", dest="lists",
+                              help=f"domain list, repeatable (default: {os.path.relpath(DOMAIN_LIST_PATH)})")
+    build_parser.add_argument("--blob", default=FRONTEND_BLOB_PATH, help="frontend blob to write")
+
+    check_parser = commands.add_parser("check", help="look up domains or email addresses")
+    check_parser.add_argument("domains", nargs="+")
+    check_parser.add_argument("--list", action="append", dest="lists")
+
+    args = parser.parse_args(argv)
+    lists = tuple(args.lists or (DOMAIN_LIST_PATH,))
+
+    if args.command == "build":
+        index_path, count = build(lists, blob_path=args.blob)
+        print(f"✓ Indexed {count:,} domains")
+        print(f"  • Index: {index_path} ({os.path.getsize(index_path):,} bytes)")
+        print(f"  • Frontend blob: {args.blob} ({os.path.getsize(args.blob):,} bytes)")
+        return 0
+
+    index = load_disposable_index(lists)
+    for value in args.domains:
+        domain = value.rsplit("@", 1)[-1]
+        blocked_by = index.match(domain)
+        if blocked_by:
+            print(f"✗ {value}: disposable (listed: {blocked_by})")
+        else:
+            print(f"✓ {value}: not listed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
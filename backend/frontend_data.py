@@ -0,0 +1,169 @@
+"""
+Python loader for frontend/data.js
+Parses locationData, countryPhoneCodes and disposableEmailDomains once, builds lookup
+indexes and caches the result on disk keyed by the file's SHA-256
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BACKEND_DIR)
+DATA_JS_PATH = os.path.join(PROJECT_DIR, "frontend", "data.js")
+CACHE_DIR = os.path.join(PROJECT_DIR, ".cache")
+
+CONSTANTS = ("locationData", "countryPhoneCodes", "disposableEmailDomains")
+# Bump when the pickled layout changes so stale caches are ignored
+CACHE_VERSION = 1
+
+_DECLARATION = re.compile(r"\bconst\s+(\w+)\s*=\s*")
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+_memo = {}
+
+
+def extract_literal(source, start):
+    """Return the object/array literal starting at source[start], honoring strings and comments"""
+    opener = source[start]
+    closer = {"{": "}", "[": "]"}[opener]
+    depth = 0
+    out = []
+    i = start
+    while i < len(source):
+        ch = source[i]
+        if ch in "\"'":
+            end = i + 1
+            while source[end] != ch:
+                end += 2 if source[end] == "\\" else 1
+            literal = source[i + 1:end]
+            if ch == "'":
+                literal = literal.replace("\\'", "'").replace('"', '\\"')
+            out.append('"' + literal + '"')
+            i = end + 1
+            continue
+        if source.startswith("//", i):
+            i = source.index("\n", i)
+            continue
+        if ch == opener:
+            depth += 1
+        elif ch == closer:
+            depth -= 1
+            if depth == 0:
+                out.append(ch)
+                return "".join(out)
+        out.append(ch)
+        i += 1
+    raise ValueError("Unterminated literal in data.js")
+
+
+def parse_data_js(source):
+    """Parse the const declarations of data.js into Python objects"""
+    values = {}
+    for match in _DECLARATION.finditer(source):
+        name = match.group(1)
+        if name in CONSTANTS:
+            literal = extract_literal(source, match.end())
+            values[name] = json.loads(_TRAILING_COMMA.sub(r"\1", literal))
+    missing = [name for name in CONSTANTS if name not in values]
+    if missing:
+        raise ValueError(f"data.js is missing: {', '.join(missing)}")
+    return values
+
+
+class FrontendData:
+    """Indexed, read-only view of the registration form's reference data"""
+
+    def __init__(self, location_data, phone_codes, disposable_domains, source_hash=""):
+        self.source_hash = source_hash
+        self.location_data = location_data
+        self.phone_codes = phone_codes
+        self.countries = tuple(sorted(location_data))
+
+        # Sorted the way the page sorts its dropdowns
+        self.states_by_country = {
+            country: tuple(sorted(states)) for country, states in location_data.items()
+        }
+        self.cities_by_state = {
+            (country, state): tuple(sorted(cities))
+            for country, states in location_data.items()
+            for state, cities in states.items()
+        }
+
+        city_paths = {}
+        for (country, state), cities in self.cities_by_state.items():
+            for city in cities:
+                city_paths.setdefault(city, []).append((country, state))
+        self.city_paths = {city: tuple(sorted(paths)) for city, paths in city_paths.items()}
+
+        countries_by_code = {}
+        for country, code in phone_codes.items():
+            countries_by_code.setdefault(code, []).append(country)
+        self.countries_by_phone_code = {code: tuple(sorted(c)) for code, c in countries_by_code.items()}
+
+        self.disposable_domains = frozenset(domain.lower() for domain in disposable_domains)
+
+    def states(self, country):
+        return self.states_by_country.get(country, ())
+
+    def cities(self, country, state):
+        return self.cities_by_state.get((country, state), ())
+
+    def paths_for_city(self, city):
+        """(country, state) pairs that contain a city name"""
+        return self.city_paths.get(city, ())
+
+    def phone_code(self, country):
+        return self.phone_codes.get(country)
+
+    def is_disposable(self, domain):
+        """Exact match against the inline list; backend.disposable_index also matches parents"""
+        return domain.lower() in self.disposable_domains
+
+    def paths(self):
+        """Every (country, state, city) path in dropdown order"""
+        for (country, state), cities in sorted(self.cities_by_state.items()):
+            for city in cities:
+                yield country, state, city
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_frontend_data(path=DATA_JS_PATH, cache_dir=CACHE_DIR):
+    """Load data.js, reusing the in-process or on-disk cache when the file is unchanged"""
+    digest = file_hash(path)
+    if digest in _memo:
+        return _memo[digest]
+
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, f"frontend_data-v{CACHE_VERSION}-{digest[:16]}.pickle")
+        try:
+            with open(cache_path, "rb") as f:
+                data = pickle.load(f)
+            _memo[digest] = data
+            return data
+        except (OSError, ImportError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+
+    with open(path, encoding="utf-8") as f:
+        values = parse_data_js(f.read())
+    data = FrontendData(
+        values["locationData"], values["countryPhoneCodes"], values["disposableEmailDomains"], digest
+    )
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+
+    _memo[digest] = data
+    return data
@@ -0,0 +1,460 @@
+"""
+Bulk Registration Ingest
+Streams CSV or JSONL registration records in constant memory, validates them in chunks
+across a process pool with the same rules as frontend/validation.js, and writes accepted
+and rejected rows to separate JSONL files. Rows whose email or phone appeared earlier are
+rejected as duplicates, checked against a uniqueness index in the output directory (or
+the server's data/uniqueness.sqlite with --unique-index, to also catch people who
+registered through the form). A checkpoint written after every chunk lets an interrupted
+run resume where it stopped.
+
+Run from the project root:
+    python -m backend.ingest partners.csv --out-dir data/ingest --workers 8
+    python -m backend.ingest partners.csv --out-dir data/ingest --resume
+    python -m backend.ingest partners.csv --unique-index data/uniqueness.sqlite
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from json.encoder import encode_basestring as encode_string
+
+from backend.uniqueness import INDEX_FILE, UniquenessIndex, print_report, record_digests, source_key
+from backend.validator import FORM_FIELDS, SECRET_FIELDS, FormValidator, form_columns
+
+
+ACCEPTED_FILE = "accepted.jsonl"
+REJECTED_FILE = "rejected.jsonl"
+CHECKPOINT_FILE = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+# Chunks are cut on line boundaries after roughly this many bytes
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+# Seconds between throughput reports
+REPORT_INTERVAL = 2.0
+FORMATS = ("csv", "jsonl")
+
+# Accepted rows keep every form field except the passwords, in form order
+PUBLIC_FIELDS = tuple(name for name in FORM_FIELDS if name not in SECRET_FIELDS)
+ACCEPTED_TEMPLATE = "{" + ",".join(f'"{name}":%s' for name in PUBLIC_FIELDS) + "}\n"
+
+_validator = None
+
+
+def detect_format(path):
+    """'csv' or 'jsonl' from the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {path}; pass --format csv|jsonl")
+
+
+def read_csv_line(f):
+    """One CSV record's raw bytes, following quoted fields across line breaks; b'' at EOF"""
+    record = f.readline()
+    while record and record.count(b'"') % 2:
+        line = f.readline()
+        if not line:
+            break
+        record += line
+    return record
+
+
+def read_csv_header(f):
+    """Column names from the first CSV record; leaves f positioned at the first data row"""
+    line = read_csv_line(f)
+    if not line:
+        raise ValueError("CSV input is empty")
+    return next(csv.reader([line.decode("utf-8-sig")]))
+
+
+def iter_chunks(f, fmt, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Yield (end_offset, raw_bytes) chunks that always end on a record boundary"""
+    while True:
+        lines = f.readlines(chunk_bytes)
+        if not lines:
+            return
+        # A line break inside a quoted CSV field leaves an odd number of quotes
+        if fmt == "csv":
+            odd = sum(line.count(b'"') for line in lines) % 2
+            while odd:
+                line = f.readline()
+                if not line:
+                    break
+                lines.append(line)
+                odd ^= line.count(b'"') % 2
+        yield f.tell(), b"".join(lines)
+
+
+def parse_chunk(fmt, header, chunk):
+    """Parse a raw chunk into (rows, raw columns, failures)
+
+    rows are value lists (CSV) or dicts (JSONL) in input order, columns map each field to
+    its values across them, and failures maps the index of an unparseable row to the
+    reason. Such rows hold {}.
+    """
+    text = chunk.decode("utf-8", errors="replace")
+    failures = {}
+    if fmt == "csv":
+        width = len(header)
+        rows = [
+            row if len(row) == width else (row + [""] * width)[:width]
+            for row in csv.reader(io.StringIO(text, newline=""))
+            if row
+        ]
+        columns = dict(zip(header, map(list, zip(*rows)))) if rows else {}
+        return rows, columns, failures
+
+    records = []
+    # Only "\n" ends a record, as in iter_chunks(); splitlines() would also break on
+    # U+2028, \x85 and other characters that are legal inside JSON strings
+    for line in text.split("\n"):
+        line = line.removesuffix("\r")
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            failures[len(records)] = f"Invalid JSON: {e}"
+            record = {}
+        if not isinstance(record, dict):
+            failures[len(records)] = "Record is not a JSON object"
+            record = {}
+        records.append(record)
+    columns = {name: [record.get(name) for record in records] for name in FORM_FIELDS}
+    return records, columns, failures
+
+
+def public_fields(record):
+    return {name: value for name, value in record.items() if name not in SECRET_FIELDS}
+
+
+def accepted_lines(columns, indexes):
+    """JSONL for the given rows of form_columns() output, password fields left out"""
+    quoted = [[encode_string(columns[name][i]) for i in indexes] for name in PUBLIC_FIELDS]
+    return "".join(ACCEPTED_TEMPLATE % values for values in zip(*quoted)).encode("utf-8")
+
+
+def _init_worker():
+    global _validator
+    _validator = FormValidator()
+
+
+def validate_chunk(fmt, header, chunk):
+    """Worker entry point: returns (record count, accepted JSONL bytes, rejected entries,
+    accepted keys)
+
+    Rejected entries are (index within chunk, original record without secrets, errors)
+    so the parent can number them. Accepted keys are (index within chunk, email and phone
+    digests) per accepted row, hashed here so the parent only has to look them up.
+    """
+    validator = _validator or FormValidator()
+    rows, raw_columns, failures = parse_chunk(fmt, header, chunk)
+    columns = form_columns(raw_columns, len(rows))
+    results = validator.validate_columns(columns)
+
+    accepted = []
+    rejected = []
+    for index, result in enumerate(results):
+        if index in failures:
+            rejected.append((index, None, {"record": failures[index]}))
+        elif result.is_valid:
+            accepted.append(index)
+        else:
+            # Original values, so partners can fix the row and resubmit it
+            record = dict(zip(header, rows[index])) if header else rows[index]
+            rejected.append((index, public_fields(record), result.errors))
+
+    keys = [(index, record_digests({name: columns[name][index] for name in ("email", "phone")}))
+            for index in accepted]
+    return len(rows), accepted_lines(columns, accepted), rejected, keys
+
+
+class Checkpoint:
+    """Input offset and output sizes after the last fully written chunk"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {self.path}")
+        return state
+
+    def save(self, state, fsync=False):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(state, version=CHECKPOINT_VERSION), f, indent=2)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class ThroughputReporter:
+    """Prints rows/s and MB/s at most every `interval` seconds"""
+
+    def __init__(self, total_bytes, interval=REPORT_INTERVAL, stream=sys.stdout):
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.stream = stream
+        self.started = time.perf_counter()
+        self.last_report = self.started
+
+    def update(self, stats, offset, start_offset, force=False):
+        now = time.perf_counter()
+        if not force and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+        elapsed = max(now - self.started, 1e-9)
+        rows = stats["rows"] - stats["resumed_rows"]
+        mb = (offset - start_offset) / 1e6
+        percent = 100.0 * offset / self.total_bytes if self.total_bytes else 100.0
+        print(
+            f"  ⏱️  {percent:5.1f}% | {stats['rows']:,} rows | {rows / elapsed:,.0f} rows/s | "
+            f"{mb / elapsed:,.1f} MB/s | ✓ {stats['accepted']:,} ✗ {stats['rejected']:,}",
+            file=self.stream,
+            flush=True,
+        )
+
+
+def open_outputs(out_dir, state):
+    """Open accepted/rejected outputs, truncated to the checkpointed sizes when resuming"""
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = {}
+    for key, name in (("accepted", ACCEPTED_FILE), ("rejected", REJECTED_FILE)):
+        path = os.path.join(out_dir, name)
+        size = state[f"{key}_bytes"] if state else 0
+        f = open(path, "r+b" if state and os.path.exists(path) else "wb")
+        # Drops rows written after the last checkpoint so they are not duplicated
+        f.truncate(size)
+        f.seek(size)
+        outputs[key] = f
+    return outputs
+
+
+def ingest(input_path, out_dir, fmt=None, workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES,
+           resume=False, fsync=False, report_interval=REPORT_INTERVAL, check_duplicates=True,
+           unique_index=None):
+    """Validate every record in input_path; returns the final stats dict
+
+    With check_duplicates, accepted rows are checked against and added to the uniqueness
+    index at unique_index, by default one in out_dir.
+    """
+    fmt = fmt or detect_format(input_path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}")
+    workers = workers or os.cpu_count() or 1
+    input_path = os.path.abspath(input_path)
+    total_bytes = os.path.getsize(input_path)
+
+    checkpoint = Checkpoint(os.path.join(out_dir, CHECKPOINT_FILE))
+    state = checkpoint.load() if resume else None
+    if state and (state["input"] != input_path or state["format"] != fmt):
+        raise ValueError(f"Checkpoint in {out_dir} belongs to {state['input']} ({state['format']})")
+    if state and state.get("complete"):
+        print(f"✓ {input_path} was already ingested ({state['rows']:,} rows)")
+        return state
+
+    stats = {
+        "input": input_path,
+        "format": fmt,
+        "offset": 0,
+        "rows": 0,
+        "accepted": 0,
+        "rejected": 0,
+        "duplicates": 0,
+        "accepted_bytes": 0,
+        "rejected_bytes": 0,
+        "complete": False,
+    }
+    if state:
+        stats.update({key: state[key] for key in stats if key in state})
+    stats["resumed_rows"] = stats["rows"]
+
+    print("=" * 80)
+    print(f"INGEST - {input_path} ({fmt}, {total_bytes / 1e6:,.1f} MB, {workers} workers)")
+    print("=" * 80)
+    if state:
+        print(f"↻ Resuming at byte {stats['offset']:,} after {stats['rows']:,} rows\n")
+
+    outputs = open_outputs(out_dir, state)
+    unique_index = unique_index or os.path.join(out_dir, INDEX_FILE)
+    unique = UniquenessIndex(unique_index) if check_duplicates else None
+    source = source_key(input_path)
+    if unique is not None:
+        # Keys claimed by rows past the checkpoint belong to rows about to be validated
+        # again; without a checkpoint, to the earlier run whose outputs were just truncated
+        released = unique.release_after(source, stats["rows"])
+        if released:
+            since = "past the checkpoint" if state else "by an earlier run of this input"
+            print(f"↻ Released {released:,} uniqueness keys claimed {since}\n")
+    reporter = ThroughputReporter(total_bytes, report_interval)
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker) if workers > 1 else None
+    start_offset = stats["offset"]
+
+    try:
+        with open(input_path, "rb") as f:
+            header = read_csv_header(f) if fmt == "csv" else None
+            if stats["offset"]:
+                f.seek(stats["offset"])
+            else:
+                stats["offset"] = start_offset = f.tell()
+
+            # Keeps at most 2 chunks per worker in flight, so memory stays flat
+            pending = []
+            for end_offset, chunk in iter_chunks(f, fmt, chunk_bytes):
+                if executor:
+                    pending.append((end_offset, executor.submit(validate_chunk, fmt, header, chunk)))
+                    if len(pending) < workers * 2:
+                        continue
+                    end_offset, future = pending.pop(0)
+                    result = future.result()
+                else:
+                    if _validator is None:
+                        _init_worker()
+                    result = validate_chunk(fmt, header, chunk)
+                write_result(result, end_offset, stats, outputs, checkpoint, fsync, unique, source)
+                reporter.update(stats, stats["offset"], start_offset)
+
+            for end_offset, future in pending:
+                write_result(future.result(), end_offset, stats, outputs, checkpoint, fsync, unique, source)
+                reporter.update(stats, stats["offset"], start_offset)
+
+        stats["complete"] = True
+        save_checkpoint(checkpoint, stats, fsync)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        for output in outputs.values():
+            output.close()
+        if unique is not None:
+            report = unique.report()
+            unique.close()
+
+    reporter.update(stats, stats["offset"], start_offset, force=True)
+    elapsed = time.perf_counter() - reporter.started
+    print(f"\n✓ {stats['rows']:,} rows in {elapsed:.1f}s: "
+          f"{stats['accepted']:,} accepted, {stats['rejected']:,} rejected "
+          f"({stats['duplicates']:,} duplicates)")
+    print(f"  • Accepted: {os.path.join(out_dir, ACCEPTED_FILE)}")
+    print(f"  • Rejected: {os.path.join(out_dir, REJECTED_FILE)}")
+    if unique is not None:
+        print(f"\n🔑 Uniqueness index: {unique_index}")
+        print_report(report)
+    return stats
+
+
+def write_result(result, end_offset, stats, outputs, checkpoint, fsync, unique=None, source=None):
+    """Append one chunk's results in input order, then checkpoint past it"""
+    count, accepted_bytes, rejected, keys = result
+    base_row = stats["rows"]
+
+    duplicates = 0
+    if unique is not None and keys:
+        accepted_bytes, duplicated = claim_keys(unique, accepted_bytes, keys, base_row, source)
+        duplicates = len(duplicated)
+        if duplicated:
+            rejected = sorted(rejected + duplicated, key=lambda entry: entry[0])
+
+    lines = []
+    for index, record, errors in rejected:
+        entry = {"row": base_row + index + 1, "errors": errors, "record": record}
+        lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+    rejected_bytes = "".join(lines).encode("utf-8")
+
+    outputs["accepted"].write(accepted_bytes)
+    outputs["rejected"].write(rejected_bytes)
+    for output in outputs.values():
+        output.flush()
+        if fsync:
+            os.fsync(output.fileno())
+
+    stats["rows"] += count
+    stats["accepted"] += count - len(rejected)
+    stats["rejected"] += len(rejected)
+    stats["duplicates"] += duplicates
+    stats["accepted_bytes"] += len(accepted_bytes)
+    stats["rejected_bytes"] += len(rejected_bytes)
+    stats["offset"] = end_offset
+    if unique is not None:
+        # Claims are durable before the checkpoint that covers them
+        unique.commit()
+    save_checkpoint(checkpoint, stats, fsync)
+
+
+def claim_keys(unique, accepted_bytes, keys, base_row, source):
+    """Claim the email and phone of each accepted row in order; returns the accepted
+    JSONL without duplicates, and the duplicates as rejected entries"""
+    conflicts = unique.claim_many([(base_row + index + 1, digests) for index, digests in keys], source)
+    if not conflicts:
+        return accepted_bytes, []
+    kept = []
+    duplicated = []
+    for line, (index, _) in zip(accepted_bytes.split(b"\n"), keys):
+        taken = conflicts.get(base_row + index + 1)
+        if taken:
+            duplicated.append((index, json.loads(line), taken))
+        else:
+            kept.append(line + b"\n")
+    return b"".join(kept), duplicated
+
+
+def save_checkpoint(checkpoint, stats, fsync):
+    checkpoint.save({key: value for key, value in stats.items() if key != "resumed_rows"}, fsync)
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Validate and split bulk registration records")
+    parser.add_argument("input", help="CSV (with a header row) or JSONL file")
+    parser.add_argument("--out-dir", default=os.path.join("data", "ingest"))
+    parser.add_argument("--format", choices=FORMATS, default=None, help="default: from the file extension")
+    parser.add_argument("--workers", type=int, default=None, help="validation processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=float, default=DEFAULT_CHUNK_BYTES / (1024 * 1024))
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint in --out-dir")
+    parser.add_argument("--fsync", action="store_true", help="fsync outputs before every checkpoint")
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL)
+    parser.add_argument("--unique-index", default=None,
+                        help=f"uniqueness index of registered emails and phones (default: {INDEX_FILE} in "
+                             "--out-dir; data/uniqueness.sqlite checks against the server's registrations)")
+    parser.add_argument("--allow-duplicates", action="store_true",
+                        help="accept rows whose email or phone is already registered")
+    args = parser.parse_args(argv)
+
+    try:
+        ingest(
+            args.input,
+            args.out_dir,
+            fmt=args.format,
+            workers=args.workers,
+            chunk_bytes=int(args.chunk_mb * 1024 * 1024),
+            resume=args.resume,
+            fsync=args.fsync,
+            report_interval=args.report_interval,
+            check_duplicates=not args.allow_duplicates,
+            unique_index=args.unique_index,
+        )
+    except (OSError, ValueError) as e:
+        print(f"❌ ERROR: {e}")
+        return 1
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted; rerun with --resume to continue from the last checkpoint")
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
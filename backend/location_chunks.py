@@ -0,0 +1,234 @@
+"""
+Per-Country Location Chunks
+Splits locationData out of frontend/data.js into one JSON chunk per country, with a
+gzip copy of each, an index, and frontend/data.core.js: the phone codes, disposable
+domains and a country -> chunk version map the page loads instead of data.js. States
+and cities are fetched from /api/locations/<country> the first time a country is
+picked, so page weight no longer grows with the location data.
+
+data.js stays the source of truth; rerun the build after editing it (backend.server
+also rebuilds on startup when the chunks are stale).
+
+Run from the project root:
+    python -m backend.location_chunks build
+    python -m backend.location_chunks show India
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+from backend.disposable_index import write_atomic
+from backend.frontend_data import DATA_JS_PATH, PROJECT_DIR, load_frontend_data
+
+
+LOCATIONS_DIR = os.path.join(PROJECT_DIR, "frontend", "locations")
+CORE_JS_PATH = os.path.join(PROJECT_DIR, "frontend", "data.core.js")
+INDEX_FILE = "index.json"
+# Bump when the chunk or index layout changes so old builds are replaced
+CHUNK_VERSION = 1
+GZIP_LEVEL = 9
+# '<slug>.<version>.json' and its gzip copy: the only files a build removes
+CHUNK_FILE = re.compile(r"[a-z0-9-]+\.[0-9a-f]{16}\.json(?:\.gz)?")
+
+CORE_JS_HEADER = """\
+// Generated from data.js by `python -m backend.location_chunks build`; do not edit.
+// States and cities are fetched per country by loadCountryLocations() in script.js.
+"""
+
+CORE_JS_FOOTER = """
+// Export data for use in other scripts
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = {
+        locationIndex,
+        countryPhoneCodes,
+        disposableEmailDomains
+    };
+}
+"""
+
+
+def country_slug(country):
+    """'United States' -> 'united-states'"""
+    return re.sub(r"[^a-z0-9]+", "-", country.lower()).strip("-") or "country"
+
+
+def encode_chunk(states):
+    """Compact UTF-8 JSON of one country's {state: [cities]}"""
+    return json.dumps(states, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def chunk_version(body):
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def write_core_js(path, index, phone_codes, disposable_domains):
+    """data.js without locationData: what the page needs before any country is picked"""
+    versions = {country: entry["version"] for country, entry in index["countries"].items()}
+    source = "".join((
+        CORE_JS_HEADER,
+        "\n// ==================== Country Index ====================\n",
+        "// Country -> version of its location chunk, sent as ?v= so chunks cache indefinitely\n",
+        f"const locationIndex = {json.dumps(versions, ensure_ascii=False, indent=4)};\n",
+        "\n// ==================== Country Phone Codes ====================\n",
+        f"const countryPhoneCodes = {json.dumps(phone_codes, ensure_ascii=False, indent=4)};\n",
+        "\n// ==================== Disposable Email Domains ====================\n",
+        f"const disposableEmailDomains = {json.dumps(disposable_domains, ensure_ascii=False, indent=4)};\n",
+        CORE_JS_FOOTER,
+    ))
+    write_atomic(path, source.encode("utf-8"))
+
+
+def build(data_js=DATA_JS_PATH, out_dir=LOCATIONS_DIR, core_path=CORE_JS_PATH):
+    """Write the chunks, their gzip copies, the index and data.core.js; returns the index"""
+    data = load_frontend_data(data_js)
+    return write_chunks(data.location_data, data.phone_codes, sorted(data.disposable_domains),
+                        data.source_hash, out_dir, core_path)
+
+
+def write_chunks(location_data, phone_codes, disposable_domains, source_hash, out_dir=LOCATIONS_DIR,
+                 core_path=CORE_JS_PATH):
+    """build() for data already in memory; source_hash identifies the data.js it came from"""
+    index = {"format": CHUNK_VERSION, "source": source_hash, "countries": {}}
+    for country in sorted(location_data):
+        states = location_data[country]
+        body = encode_chunk(states)
+        compressed = gzip.compress(body, GZIP_LEVEL, mtime=0)
+        version = chunk_version(body)
+        name = f"{country_slug(country)}.{version}.json"
+        write_atomic(os.path.join(out_dir, name), body)
+        write_atomic(os.path.join(out_dir, name + ".gz"), compressed)
+        index["countries"][country] = {
+            "file": name,
+            "version": version,
+            "states": len(states),
+            "cities": sum(len(cities) for cities in states.values()),
+            "bytes": len(body),
+            "gzip_bytes": len(compressed),
+        }
+    write_atomic(os.path.join(out_dir, INDEX_FILE),
+                 json.dumps(index, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    # Chunks of earlier builds are no longer referenced; anything else in out_dir is not ours
+    current = {e["file"] for e in index["countries"].values()}
+    current |= {name + ".gz" for name in current}
+    for name in os.listdir(out_dir):
+        if name not in current and CHUNK_FILE.fullmatch(name):
+            os.remove(os.path.join(out_dir, name))
+
+    if core_path:
+        write_core_js(core_path, index, phone_codes, disposable_domains)
+    return index
+
+
+def load_index(out_dir=LOCATIONS_DIR):
+    """The build's index, or None when there is no usable build"""
+    try:
+        with open(os.path.join(out_dir, INDEX_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get("format") == CHUNK_VERSION else None
+
+
+def is_stale(data_js=DATA_JS_PATH, out_dir=LOCATIONS_DIR, core_path=CORE_JS_PATH):
+    """True when data.js changed since the last build or any built file is missing"""
+    index = load_index(out_dir)
+    if not index or index["source"] != load_frontend_data(data_js).source_hash:
+        return True
+    files = [os.path.join(out_dir, e["file"]) for e in index["countries"].values()]
+    files += [path + ".gz" for path in files]
+    if core_path:
+        files.append(core_path)
+    return not all(os.path.isfile(path) for path in files)
+
+
+def ensure_built(data_js=DATA_JS_PATH, out_dir=LOCATIONS_DIR, core_path=CORE_JS_PATH):
+    """Rebuild when stale; returns True when a build ran"""
+    if not is_stale(data_js, out_dir, core_path):
+        return False
+    build(data_js, out_dir, core_path)
+    return True
+
+
+class LocationStore:
+    """Chunks of one build, read from disk once per version and served from memory"""
+
+    def __init__(self, directory=LOCATIONS_DIR):
+        self.directory = directory
+        self._index = None
+        self._index_mtime = None
+        self._chunks = {}
+
+    def index(self):
+        """The current index, reloaded when the build is replaced; None without a build"""
+        try:
+            mtime = os.stat(os.path.join(self.directory, INDEX_FILE)).st_mtime_ns
+        except OSError:
+            return None
+        if mtime != self._index_mtime:
+            self._index = load_index(self.directory)
+            self._index_mtime = mtime
+            self._chunks = {}
+        return self._index
+
+    def chunk(self, country):
+        """(version, JSON bytes, gzip bytes) of a country's chunk, or None when unknown"""
+        index = self.index()
+        entry = index and index["countries"].get(country)
+        if not entry:
+            return None
+        cached = self._chunks.get(country)
+        if cached is None:
+            path = os.path.join(self.directory, entry["file"])
+            with open(path, "rb") as f:
+                body = f.read()
+            with open(path + ".gz", "rb") as f:
+                compressed = f.read()
+            cached = self._chunks[country] = (entry["version"], body, compressed)
+        return cached
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Per-country location chunks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="split data.js into chunks and data.core.js")
+    build_parser.add_argument("--data-js", default=DATA_JS_PATH)
+    build_parser.add_argument("--out-dir", default=LOCATIONS_DIR)
+    build_parser.add_argument("--core", default=CORE_JS_PATH, help="data.core.js to write")
+
+    show_parser = commands.add_parser("show", help="print the chunk of a country")
+    show_parser.add_argument("country")
+    show_parser.add_argument("--out-dir", default=LOCATIONS_DIR)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index = build(args.data_js, args.out_dir, args.core)
+        countries = index["countries"].values()
+        print(f"✓ Split {len(countries)} countries into {os.path.relpath(args.out_dir)}")
+        print(f"  • Chunks: {sum(e['bytes'] for e in countries):,} bytes "
+              f"({sum(e['gzip_bytes'] for e in countries):,} gzipped), "
+              f"largest {max((e['bytes'] for e in countries), default=0):,}")
+        print(f"  • Core script: {os.path.relpath(args.core)} ({os.path.getsize(args.core):,} bytes, "
+              f"data.js was {os.path.getsize(args.data_js):,})")
+        return 0
+
+    chunk = LocationStore(args.out_dir).chunk(args.country)
+    if chunk is None:
+        print(f"✗ {args.country}: no chunk (run `python -m backend.location_chunks build`)")
+        return 1
+    version, body, compressed = chunk
+    print(f"✓ {args.country} v{version}: {len(body):,} bytes, {len(compressed):,} gzipped")
+    print(json.dumps(json.loads(body), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Location Prefix Search
+Type-ahead index over the state and city names of frontend/data.js. Names are folded
+to an accent- and case-insensitive form ('Saint-Étienne' -> 'saint etienne') and kept
+in sorted arrays, so a prefix query is one binary search plus a scan of at most k keys,
+whatever the number of cities. A name matches from its start or from any later word
+('eti' finds Saint-Étienne), with whole-name matches ranked first.
+
+Every entry is indexed under the scopes a query can be limited to (all locations, one
+country, one state), so filtered queries cost the same as unfiltered ones.
+
+Run from the project root:
+    python -m backend.location_search "new d" --type city --country India
+"""
+
+import argparse
+import re
+import sys
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from backend.frontend_data import DATA_JS_PATH, load_frontend_data
+
+
+KINDS = ("city", "state")
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Separates the scope fields from the name inside a key; sorts below every name character
+SCOPE_SEPARATOR = "\x1f"
+
+_NON_WORD = re.compile(r"[\W_]+")
+# Letters NFKD leaves alone because they have no base letter plus accent form
+_TRANSLITERATION = str.maketrans({
+    "ł": "l", "ø": "o", "đ": "d", "ð": "d", "ħ": "h", "ı": "i", "ŧ": "t", "ŋ": "n",
+    "ĸ": "k", "æ": "ae", "œ": "oe", "þ": "th",
+})
+
+
+def normalize_name(text):
+    """Search form of a name or query: 'Île-de-France' -> 'ile de france', 'Łódź' -> 'lodz'"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    folded = stripped.casefold().translate(_TRANSLITERATION)
+    return " ".join(_NON_WORD.sub(" ", folded).split())
+
+
+def scope_key(kind, country="", state=""):
+    return SCOPE_SEPARATOR.join((kind, country, state, ""))
+
+
+class PrefixIndex:
+    """Sorted keys with parallel entry ids; a prefix lookup is one binary search"""
+
+    def __init__(self, pairs):
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.ids = array("I", (entry for _, entry in pairs))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def scan(self, prefix, limit):
+        """(key, id) of up to `limit` keys starting with prefix, in key order"""
+        keys = self.keys
+        found = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and len(found) < limit and keys[i].startswith(prefix):
+            found.append((keys[i], self.ids[i]))
+            i += 1
+        return found
+
+
+class LocationSearch:
+    """Top-k prefix matches over the states and cities of a locationData dict"""
+
+    def __init__(self, location_data):
+        # (kind, name, country, state) per entry; states have state=None
+        self.entries = []
+        names, words = [], []
+
+        def add(entry, scopes):
+            entry_id = len(self.entries)
+            self.entries.append(entry)
+            normalized = normalize_name(entry[1])
+            # Later words of the name: 'saint etienne' is also found under 'etienne'
+            starts = [m.end() for m in re.finditer(" ", normalized)]
+            for scope in scopes:
+                names.append((scope + normalized, entry_id))
+                words.extend((scope + normalized[start:], entry_id) for start in starts)
+
+        for country in sorted(location_data):
+            states = location_data[country]
+            for state in sorted(states):
+                add(("state", state, country, None),
+                    (scope_key("state"), scope_key("state", country)))
+                for city in sorted(set(states[state])):
+                    add(("city", city, country, state),
+                        (scope_key("city"), scope_key("city", country), scope_key("city", country, state)))
+
+        self.names = PrefixIndex(names)
+        self.words = PrefixIndex(words)
+
+    @classmethod
+    def from_data_js(cls, path=DATA_JS_PATH):
+        return cls(load_frontend_data(path).location_data)
+
+    def search(self, query, limit=DEFAULT_LIMIT, kind=None, country=None, state=None):
+        """Up to `limit` matches as dicts: whole-name matches first, then later-word
+        matches, each in alphabetical order of the matched text
+
+        Raises ValueError for a state without its country: state names are only
+        indexed within their country.
+        """
+        if state and not country:
+            raise ValueError("state requires country")
+        prefix = normalize_name(query)
+        if not prefix or limit <= 0:
+            return []
+        kinds = (kind,) if kind else KINDS
+        matches = []
+        for rank, index in enumerate((self.names, self.words)):
+            for kind_name in kinds:
+                if state and kind_name == "state":
+                    continue
+                scope = scope_key(kind_name, country or "", state or "")
+                for key, entry_id in index.scan(scope + prefix, limit):
+                    matches.append((rank, key[len(scope):], entry_id))
+            if len(matches) >= limit:
+                # Every whole-name match outranks every later-word match
+                break
+
+        results = []
+        seen = set()
+        for _, _, entry_id in sorted(matches):
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            kind_name, name, country_name, state_name = self.entries[entry_id]
+            result = {"type": kind_name, "name": name, "country": country_name}
+            if state_name is not None:
+                result["state"] = state_name
+            results.append(result)
+            if len(results) == limit:
+                break
+        return results
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Prefix search over data.js states and cities")
+    parser.add_argument("query")
+    parser.add_argument("--type", choices=KINDS, dest="kind")
+    parser.add_argument("--country")
+    parser.add_argument("--state")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--data-js", default=DATA_JS_PATH)
+    args = parser.parse_args(argv)
+    if args.state and not args.country:
+        parser.error("--state requires --country")
+
+    started = time.perf_counter()
+    index = LocationSearch.from_data_js(args.data_js)
+    print(f"✓ Indexed {len(index.entries):,} states and cities "
+          f"({len(index.names) + len(index.words):,} keys) in {time.perf_counter() - started:.2f}s")
+
+    repeats = 1000
+    started = time.perf_counter()
+    for _ in range(repeats):
+        results = index.search(args.query, args.limit, args.kind, args.country, args.state)
+    took_us = (time.perf_counter() - started) / repeats * 1e6
+    print(f"  • {len(results)} matches for {args.query!r} in {took_us:.1f} µs per query")
+    for result in results:
+        path = " → ".join(p for p in (result["country"], result.get("state"), result["name"]) if p)
+        print(f"  {result['type']:<6} {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,561 @@
+"""
+Registration Backend
+Asyncio HTTP server that serves frontend/ and accepts registrations at POST /api/register.
+States and cities are served per country from /api/locations/<country> (see
+backend.location_chunks), gzipped when the client accepts it, and searched by prefix at
+/api/search (see backend.location_search).
+Payloads are validated with the Python FormValidator, checked for an email or phone that
+is already registered (see backend.uniqueness) and appended to a JSONL file by a single
+writer task that batches concurrent registrations into one write.
+
+Run from the project root:
+    python -m backend.server --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import mimetypes
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import formatdate
+from urllib.parse import parse_qs, unquote
+
+from backend.frontend_data import PROJECT_DIR, file_hash
+from backend.location_chunks import LocationStore, ensure_built
+from backend.location_search import DEFAULT_LIMIT, KINDS, MAX_LIMIT, LocationSearch
+from backend.uniqueness import ERROR_MESSAGES, INDEX_FILE, UNIQUE_FIELDS, UniquenessIndex, record_digests, source_key
+from backend.validator import SECRET_FIELDS, FormValidator, form_data_from_record
+
+
+FRONTEND_DIR = os.path.join(PROJECT_DIR, "frontend")
+DATA_DIR = os.path.join(PROJECT_DIR, "data")
+REGISTRATIONS_FILE = "registrations.jsonl"
+INDEX_PAGE = "registration.html"
+LOCATIONS_PATH = "/api/locations"
+# Chunk requests carrying the current ?v= version can be cached without revalidation
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+# Seconds an idle keep-alive connection is held open
+KEEP_ALIVE_TIMEOUT = 15
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    301: "Moved Permanently",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    """Aborts a request with an HTTP status and JSON error message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """Parsed HTTP/1.1 request"""
+
+    def __init__(self, method, target, version, headers, body=b""):
+        self.method = method
+        self.path, _, self.query = target.partition("?")
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+class Response:
+    """HTTP response with a bytes body"""
+
+    def __init__(self, status, body=b"", content_type="application/json", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = {"Content-Type": content_type}
+        self.headers.update(headers or {})
+
+    @classmethod
+    def json(cls, status, payload):
+        return cls(status, json.dumps(payload).encode("utf-8"))
+
+    def encode(self, keep_alive, head=False):
+        headers = dict(self.headers)
+        headers["Content-Length"] = str(len(self.body))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        lines = [f"HTTP/1.1 {self.status} {REASONS.get(self.status, '')}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        head_bytes = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        return head_bytes if head else head_bytes + self.body
+
+
+class RegistrationStore:
+    """Append-only JSONL store with group commit
+
+    add() queues a record and waits until the writer task has flushed it, so thousands of
+    concurrent registrations cost a handful of write() calls instead of one each. After
+    each write, on_flush(written, end_offset) is awaited with the (byte offset, keys) of
+    the records written, for work that should follow the write in batches too.
+    """
+
+    def __init__(self, path, fsync=False, on_flush=None):
+        self.path = path
+        self.fsync = fsync
+        self.on_flush = on_flush
+        self.count = 0
+        self.offset = 0
+        self._queue = None
+        self._writer = None
+        self._file = None
+
+    async def start(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "ab")
+        self.offset = self._file.seek(0, os.SEEK_END)
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.ensure_future(self._write_loop())
+
+    async def close(self):
+        if self._writer:
+            await self._queue.put(None)
+            await self._writer
+            self._writer = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    async def add(self, record, keys=None):
+        """Persist a record; returns once it is on disk. keys are passed on to on_flush."""
+        done = asyncio.get_running_loop().create_future()
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        await self._queue.put((line.encode("utf-8"), done, keys))
+        await done
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            stopping = batch[-1] is None
+            entries = [entry for entry in batch if entry is not None]
+            if entries:
+                data = b"".join(line for line, _, _ in entries)
+                try:
+                    await loop.run_in_executor(None, self._write, data)
+                except OSError as e:
+                    for _, done, _ in entries:
+                        done.set_exception(e)
+                else:
+                    self.count += len(entries)
+                    written = []
+                    for line, done, keys in entries:
+                        written.append((self.offset, keys))
+                        self.offset += len(line)
+                        done.set_result(None)
+                    if self.on_flush:
+                        try:
+                            await self.on_flush(written, self.offset)
+                        except Exception as e:
+                            # The records are stored; whatever follows them can catch up later
+                            print(f"❌ After writing {len(written)} registrations: {e!r}")
+            if stopping:
+                return
+
+    def _write(self, data):
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+
+class StaticFiles:
+    """Serves files under a root directory, keeping their bytes in memory until they change"""
+
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+        self._cache = {}
+
+    def resolve(self, url_path):
+        relative = url_path.lstrip("/") or INDEX_PAGE
+        path = os.path.realpath(os.path.join(self.root, relative))
+        if os.path.commonpath([path, self.root]) != self.root or not os.path.isfile(path):
+            raise HttpError(404, "Not found")
+        return path
+
+    def response(self, request):
+        path = self.resolve(request.path)
+        stat = os.stat(path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        if etag_matches(request, etag):
+            return Response(304, content_type=content_type, headers=headers)
+
+        cached = self._cache.get(path)
+        if cached is None or cached[0] != etag:
+            with open(path, "rb") as f:
+                cached = self._cache[path] = (etag, f.read())
+        return Response(200, cached[1], content_type, headers)
+
+
+class RegistrationServer:
+    """HTTP server for the registration form and its API"""
+
+    def __init__(self, host="127.0.0.1", port=8000, data_dir=DATA_DIR, frontend_dir=FRONTEND_DIR,
+                 validator=None, fsync=False):
+        self.host = host
+        self.port = port
+        self.validator = validator or FormValidator()
+        self.store = RegistrationStore(os.path.join(data_dir, REGISTRATIONS_FILE), fsync=fsync,
+                                       on_flush=self.index_written)
+        self.unique_path = os.path.join(data_dir, INDEX_FILE)
+        self.unique = None
+        # Owns the uniqueness index's SQLite connection, so disk work stays off the event loop
+        self._unique_executor = None
+        # (position, keys) of written registrations whose keys failed to store
+        self._unindexed = []
+        self.static = StaticFiles(frontend_dir)
+        self.locations = LocationStore(os.path.join(frontend_dir, "locations"))
+        # Search index future, with the (mtime, size) and hash of the data.js it was built from
+        self._search_index = None
+        self._search_stat = None
+        self._search_hash = None
+        self.server = None
+        self.routes = {
+            ("POST", "/api/register"): self.register,
+            ("GET", "/api/health"): self.health,
+            ("GET", LOCATIONS_PATH): self.location_index,
+            ("GET", "/api/search"): self.search,
+        }
+
+    async def start(self):
+        await self.store.start()
+        self._unique_executor = ThreadPoolExecutor(1, thread_name_prefix="uniqueness")
+        self.unique = await self.in_unique_thread(UniquenessIndex, self.unique_path)
+        # Registrations stored since the index last saw registrations.jsonl (all of them
+        # the first time, or those written before a crash)
+        records, _ = await self.in_unique_thread(self.unique.catch_up, self.store.path)
+        if records:
+            print(f"🔑 Indexed the emails and phones of {records:,} earlier registrations")
+        self.server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port, backlog=4096, limit=MAX_HEADER_BYTES
+        )
+        # Port 0 picks a free port; report the real one
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.store.close()
+        if self.unique is not None:
+            await self.in_unique_thread(self.unique.close)
+            self.unique = None
+        if self._unique_executor:
+            self._unique_executor.shutdown()
+            self._unique_executor = None
+
+    def in_unique_thread(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self._unique_executor, func, *args)
+
+    async def index_written(self, written, end_offset):
+        """Store the keys of a batch of written registrations in one transaction"""
+        # Keys of earlier batches that failed to store go first
+        batch = self._unindexed + [(position, keys) for position, keys in written if keys]
+        try:
+            await self.in_unique_thread(self.unique.write_reserved, batch, source_key(self.store.path),
+                                        end_offset)
+        except Exception:
+            # Still reserved, and the index offset stays before them: retried with the
+            # next batch, or found in the file by catch_up() on the next start
+            self._unindexed = batch
+            raise
+        self._unindexed = []
+        for _, keys in batch:
+            self.unique.unreserve(keys)
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"🚀 Serving {self.static.root} on http://{self.host}:{self.port}/{INDEX_PAGE}")
+        print(f"📝 Registrations are appended to {self.store.path}")
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as e:
+                    writer.write(Response.json(e.status, {"error": e.message}).encode(keep_alive=False))
+                    break
+                if request is None:
+                    break
+
+                response = await self.dispatch(request)
+                writer.write(response.encode(request.keep_alive, head=request.method == "HEAD"))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request):
+        try:
+            handler = self.routes.get((request.method, request.path))
+            if handler:
+                return await handler(request)
+            if request.path.startswith(LOCATIONS_PATH + "/") and request.method in ("GET", "HEAD"):
+                return self.location_chunk(request)
+            if request.path.startswith("/api/"):
+                allowed = [method for method, path in self.routes if path == request.path]
+                if allowed:
+                    raise HttpError(405, f"Use {', '.join(allowed)}")
+                raise HttpError(404, "Not found")
+            if request.method not in ("GET", "HEAD"):
+                raise HttpError(405, "Use GET")
+            return self.static.response(request)
+        except HttpError as e:
+            return Response.json(e.status, {"error": e.message})
+        except Exception as e:
+            print(f"❌ {request.method} {request.path}: {e!r}")
+            return Response.json(500, {"error": "Internal server error"})
+
+    async def register(self, request):
+        """Validate a getFormData() payload and store it without the password fields"""
+        try:
+            payload = json.loads(request.body)
+        except (UnicodeDecodeError, ValueError):
+            raise HttpError(400, "Request body must be JSON")
+        if not isinstance(payload, dict):
+            raise HttpError(400, "Request body must be a JSON object")
+
+        form_data = form_data_from_record(payload)
+        validation = self.validator.validate_form(form_data)
+        if not validation.is_valid:
+            return Response.json(400, {"error": "Validation failed", "errors": validation.errors})
+
+        record = {name: value for name, value in form_data.items() if name not in SECRET_FIELDS}
+        record["id"] = uuid.uuid4().hex
+        record["createdAt"] = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        keys = record_digests(record)
+        taken, unsure = self.unique.screen(keys)
+        if unsure:
+            # Possibly registered: confirm on disk, then screen again for keys reserved meanwhile
+            found = await self.in_unique_thread(self.unique.lookup, unsure)
+            taken, _ = self.unique.screen({field: key for field, key in keys.items() if key not in found})
+            taken |= {field for field, key in keys.items() if key in found}
+        if taken:
+            self.unique.stats["conflicts"] += 1
+            errors = {field: ERROR_MESSAGES[field] for field in UNIQUE_FIELDS if field in taken}
+            return Response.json(409, {"error": "Already registered", "errors": errors})
+        # Reserved in memory with no await since the last screen, so a concurrent request
+        # for the same email or phone sees it; written to the index after the record
+        self.unique.reserve(keys)
+        try:
+            await self.store.add(record, keys)
+        except OSError:
+            self.unique.unreserve(keys)
+            raise
+        return Response.json(201, {"id": record["id"], "createdAt": record["createdAt"]})
+
+    async def health(self, request):
+        return Response.json(200, {"status": "ok", "registrations": self.store.count, "time": time.time()})
+
+    async def location_index(self, request):
+        """Countries with their chunk version, state and city counts and sizes"""
+        index = self.locations.index()
+        if index is None:
+            raise HttpError(404, "Location chunks not built")
+        payload = {"countries": index["countries"]}
+        etag = f'"{index["source"][:16]}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request, etag):
+            return Response(304, headers=headers)
+        return Response(200, json.dumps(payload, ensure_ascii=False).encode("utf-8"), headers=headers)
+
+    def location_chunk(self, request):
+        """{state: [cities]} of one country, precompressed and cacheable by version"""
+        country = unquote(request.path[len(LOCATIONS_PATH) + 1:])
+        chunk = self.locations.chunk(country)
+        if chunk is None:
+            raise HttpError(404, f"Unknown country: {country}")
+        version, body, compressed = chunk
+        etag = f'"{version}"'
+        requested = parse_qs(request.query).get("v", [None])[0]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE if requested == version else "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        content_type = "application/json; charset=utf-8"
+        if etag_matches(request, etag):
+            return Response(304, content_type=content_type, headers=headers)
+        if accepts_gzip(request):
+            headers["Content-Encoding"] = "gzip"
+            return Response(200, compressed, content_type, headers)
+        return Response(200, body, content_type, headers)
+
+    async def search(self, request):
+        """Top-k states and cities whose name, or a later word of it, starts with ?q=
+
+        Optional ?type=city|state, ?country= and ?state= narrow the search, ?limit= caps it.
+        """
+        params = {name: values[-1] for name, values in parse_qs(request.query).items()}
+        kind = params.get("type") or None
+        if kind is not None and kind not in KINDS:
+            raise HttpError(400, f"type must be one of: {', '.join(KINDS)}")
+        try:
+            limit = min(int(params.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            raise HttpError(400, "limit must be an integer")
+
+        if params.get("state") and not params.get("country"):
+            raise HttpError(400, "state requires country")
+
+        index = await self.search_index()
+        started = time.perf_counter()
+        results = index.search(params.get("q", ""), limit, kind, params.get("country"), params.get("state"))
+        took_ms = (time.perf_counter() - started) * 1000
+        return Response.json(200, {"results": results, "tookMs": round(took_ms, 3)})
+
+    async def search_index(self):
+        """Prefix index over the served data.js, built in a worker thread on first use and
+        rebuilt when the file's hash changes; a failed build is retried by the next request"""
+        loop = asyncio.get_running_loop()
+        data_js = os.path.join(self.static.root, "data.js")
+        stat = os.stat(data_js)
+        # Hashing reads the whole file, so only do it when mtime or size moved
+        if (stat.st_mtime_ns, stat.st_size) != self._search_stat:
+            digest = await loop.run_in_executor(None, file_hash, data_js)
+            self._search_stat = (stat.st_mtime_ns, stat.st_size)
+            if digest != self._search_hash:
+                self._search_hash = digest
+                self._search_index = None
+
+        if self._search_index is None:
+            self._search_index = loop.run_in_executor(None, LocationSearch.from_data_js, data_js)
+        future = self._search_index
+        try:
+            return await future
+        except Exception:
+            if self._search_index is future:
+                self._search_index = None
+            raise
+
+
+def etag_matches(request, etag):
+    """If-None-Match check; weak validators compare equal, as RFC 9110 requires for GET"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def accepts_gzip(request):
+    """True when Accept-Encoding lists gzip (or *) without q=0"""
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        name, _, value = params.partition("=")
+        try:
+            return name.strip().lower() != "q" or float(value) > 0
+        except ValueError:
+            return False
+    return False
+
+
+async def read_request(reader):
+    """Read one request from the stream; None when the client closed the connection"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise
+    except asyncio.LimitOverrunError:
+        raise HttpError(413, "Request headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HttpError(400, "Chunked request bodies are not supported")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method, target, version, headers, body)
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Registration form backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data-dir", default=DATA_DIR, help="where registrations.jsonl is written")
+    parser.add_argument("--fsync", action="store_true", help="fsync after every batch of registrations")
+    parser.add_argument("--frontend-dir", default=FRONTEND_DIR,
+                        help="directory to serve, with prebuilt location chunks when not frontend/")
+    args = parser.parse_args(argv)
+
+    if os.path.realpath(args.frontend_dir) == os.path.realpath(FRONTEND_DIR) and ensure_built():
+        print("🧩 Rebuilt location chunks from data.js")
+    server = RegistrationServer(args.host, args.port, data_dir=args.data_dir, frontend_dir=args.frontend_dir,
+                                fsync=args.fsync)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
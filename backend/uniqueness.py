@@ -0,0 +1,511 @@
+"""
+Duplicate Registration Detection
+Keeps normalized emails and phone numbers unique across registrations. An in-memory
+Bloom filter answers "never seen" without touching disk; only keys it reports as
+possibly present are confirmed in an exact SQLite index. Keys are stored as 16-byte
+BLAKE2b digests, so the index holds no contact details and can be rebuilt at any time
+from registration JSONL files (data/registrations.jsonl, ingest accepted.jsonl). The
+index remembers how far it has read each JSONL file, so catch_up() only reads what was
+appended since.
+
+Run from the project root:
+    python -m backend.uniqueness rebuild data/registrations.jsonl data/ingest/accepted.jsonl
+    python -m backend.uniqueness stats --probe 100000
+    python -m backend.uniqueness check --email priya.patel@gmail.com --phone "+91 9123456789"
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+
+from backend.disposable_index import normalize_domain
+from backend.frontend_data import PROJECT_DIR
+from backend.validator import JS_WHITESPACE
+
+
+INDEX_FILE = "uniqueness.sqlite"
+# The server's index, next to data/registrations.jsonl
+INDEX_PATH = os.path.join(PROJECT_DIR, "data", INDEX_FILE)
+# Fields that must be unique, in the order conflicts are reported
+UNIQUE_FIELDS = ("email", "phone")
+ERROR_MESSAGES = {
+    "email": "An account with this email already exists",
+    "phone": "An account with this phone number already exists",
+}
+# Keys the filter is sized for before it is rebuilt twice as large
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 0.001
+DIGEST_SIZE = 16
+# Digests read from SQLite per batch while filling the filter
+LOAD_BATCH = 100_000
+
+_NON_DIGITS = re.compile(r"[^0-9]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS unique_keys (
+    digest BLOB PRIMARY KEY,
+    source TEXT,
+    position INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+"""
+
+
+def normalize_email(email):
+    """Trimmed, lowercased address with an IDNA domain; '' when there is no domain"""
+    local, _, domain = email.strip(JS_WHITESPACE).rpartition("@")
+    domain = normalize_domain(domain)
+    if not local or not domain:
+        return ""
+    return f"{local.lower()}@{domain}"
+
+
+def normalize_phone(phone):
+    """'+' and the digits, as validatePhone() reads them: '+91 91234-56789' -> '+919123456789'
+
+    Validation already requires the number to start with its country code, so the
+    digits include it whether or not the '+' was typed.
+    """
+    digits = _NON_DIGITS.sub("", phone)
+    return f"+{digits}" if digits else ""
+
+
+NORMALIZERS = {"email": normalize_email, "phone": normalize_phone}
+
+
+def key_digest(field, value):
+    """Digest of a normalized field value, or None when the value normalizes to ''"""
+    normalized = NORMALIZERS[field](value or "")
+    if not normalized:
+        return None
+    return hashlib.blake2b(f"{field}:{normalized}".encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+def source_key(path):
+    """How a file is recorded as the source of claims, whatever spelling it was given in"""
+    return os.path.realpath(path)
+
+
+def record_digests(record):
+    """{field: digest} of a registration record's unique fields"""
+    digests = {}
+    for field in UNIQUE_FIELDS:
+        value = record.get(field)
+        digest = key_digest(field, value) if isinstance(value, str) else None
+        if digest:
+            digests[field] = digest
+    return digests
+
+
+class BloomFilter:
+    """Bit array with k probes per key, positions by double hashing of a key digest"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, digest):
+        size = self.size
+        h1 = int.from_bytes(digest[:8], "little") % size
+        h2 = (int.from_bytes(digest[8:16], "little") | 1) % size
+        return [position % size for position in range(h1, h1 + self.hashes * h2, h2)]
+
+    def batch_positions(self, digests):
+        """positions() of many digests as one (len(digests), hashes) array"""
+        halves = np.frombuffer(b"".join(digests), dtype="<u8").reshape(-1, 2)
+        size = np.uint64(self.size)
+        h1 = halves[:, :1] % size
+        h2 = (halves[:, 1:] | np.uint64(1)) % size
+        return (h1 + np.arange(self.hashes, dtype=np.uint64) * h2) % size
+
+    def add(self, digest):
+        bits = self.bits
+        for position in self.positions(digest):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self.positions(digest))
+
+    def add_many(self, digests):
+        """add() for a batch, without a Python loop per probe"""
+        if not digests:
+            return
+        positions = self.batch_positions(digests).ravel()
+        bits = np.frombuffer(self.bits, dtype=np.uint8)
+        np.bitwise_or.at(bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+        self.count += len(digests)
+
+    def contains_many(self, digests):
+        """`digest in self` for a batch, as a list of bools"""
+        if not digests:
+            return []
+        positions = self.batch_positions(digests)
+        bits = np.frombuffer(self.bits, dtype=np.uint8)
+        probes = (bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return probes.all(axis=1).tolist()
+
+    @property
+    def memory_bytes(self):
+        return len(self.bits)
+
+    def expected_error_rate(self):
+        """False-positive probability for the keys added so far"""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+
+class UniquenessIndex:
+    """Bloom filter in front of the exact SQLite index of registered emails and phones"""
+
+    def __init__(self, path=INDEX_PATH, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.path = path
+        self.error_rate = error_rate
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # The server uses the connection from one worker thread, not the one opening it
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+        self.stats = {"checks": 0, "filtered": 0, "lookups": 0, "false_positives": 0, "conflicts": 0}
+        # Keys reserved by reserve() and not yet written by write_reserved()
+        self.pending = set()
+        # The server reserves keys on its event loop while the filter may be rebuilt in
+        # its worker thread; the lock covers reserving and swapping in the new filter
+        self._filter_lock = threading.Lock()
+        # Keys reserved while load_filter() reads the exact index, which lacks them
+        self._reserved_during_load = None
+        self.bloom = None
+        self.load_filter(capacity)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM unique_keys").fetchone()[0]
+
+    def load_filter(self, capacity=DEFAULT_CAPACITY):
+        """Fill a new Bloom filter from the exact index and the reserved keys, sized for at
+        least twice its keys, and swap it in once it is complete"""
+        with self._filter_lock:
+            self._reserved_during_load = set(self.pending)
+        bloom = BloomFilter(max(capacity, 2 * len(self)), self.error_rate)
+        cursor = self.db.execute("SELECT digest FROM unique_keys")
+        while True:
+            rows = cursor.fetchmany(LOAD_BATCH)
+            if not rows:
+                break
+            bloom.add_many([digest for digest, in rows])
+        with self._filter_lock:
+            bloom.add_many(list(self._reserved_during_load))
+            self.bloom = bloom
+            self._reserved_during_load = None
+
+    def add_to_filter(self, digests):
+        """Add keys to the filter, doubling it once it holds more than its capacity"""
+        self.bloom.add_many(digests)
+        self.grow_filter()
+
+    def grow_filter(self):
+        if self.bloom.count > self.bloom.capacity:
+            self.load_filter(self.bloom.capacity * 2)
+
+    def exists(self, digest):
+        """Exact membership; the filter's positives are confirmed with one indexed lookup"""
+        return self.confirm(digest, digest in self.bloom)
+
+    def confirm(self, digest, in_filter):
+        """exists() once the filter has answered in_filter for digest"""
+        self.stats["checks"] += 1
+        if not in_filter:
+            self.stats["filtered"] += 1
+            return False
+        self.stats["lookups"] += 1
+        found = self.db.execute("SELECT 1 FROM unique_keys WHERE digest = ?", (digest,)).fetchone() is not None
+        if not found:
+            self.stats["false_positives"] += 1
+        return found
+
+    def conflicts(self, record):
+        """{field: error message} for the unique fields of record that are already taken"""
+        return {field: ERROR_MESSAGES[field]
+                for field, digest in record_digests(record).items() if self.exists(digest)}
+
+    def claim_many(self, batch, source=None):
+        """Register the keys of (position, {field: digest}) pairs in order unless one is
+        taken, with one insert for the batch; returns {position: conflicts} of the rejected
+        ones. Commit with commit().
+
+        source and position tag the new keys so release_after() can drop them again.
+        """
+        every = [digest for _, digests in batch for digest in digests.values()]
+        in_filter = dict(zip(every, self.bloom.contains_many(every)))
+        conflicts = {}
+        rows = []
+        # Keys claimed earlier in this batch, which the filter has not seen yet
+        claimed = set()
+        for position, digests in batch:
+            taken = {field: ERROR_MESSAGES[field] for field, digest in digests.items()
+                     if digest in claimed or self.confirm(digest, in_filter[digest])}
+            if taken:
+                self.stats["conflicts"] += 1
+                conflicts[position] = taken
+                continue
+            for digest in digests.values():
+                claimed.add(digest)
+                rows.append((digest, source, position))
+        # In key order, so the inserts walk the B-tree instead of jumping around it
+        rows.sort()
+        self.db.executemany("INSERT INTO unique_keys (digest, source, position) VALUES (?, ?, ?)", rows)
+        self.add_to_filter([digest for digest, _, _ in rows])
+        return conflicts
+
+    def screen(self, digests):
+        """First, in-memory half of a claim: (fields taken by reserved keys, digests the
+        filter cannot rule out). Only the latter need lookup()."""
+        taken = {field for field, digest in digests.items() if digest in self.pending}
+        in_filter = self.bloom.contains_many(list(digests.values()))
+        unsure = []
+        for (field, digest), maybe in zip(digests.items(), in_filter):
+            if field in taken:
+                continue
+            if maybe:
+                unsure.append(digest)
+            else:
+                self.stats["checks"] += 1
+                self.stats["filtered"] += 1
+        return taken, unsure
+
+    def lookup(self, digests):
+        """The digests, already past the filter, that are in the exact index"""
+        return {digest for digest in digests if self.confirm(digest, True)}
+
+    def reserve(self, digests):
+        """Hold keys in memory until write_reserved() stores them; conflicts with them
+        are found by screen() without touching disk
+
+        The filter grows in write_reserved(), off the caller's thread, as reading the
+        exact index to refill it would block the server's event loop.
+        """
+        with self._filter_lock:
+            self.pending.update(digests.values())
+            self.bloom.add_many(list(digests.values()))
+            if self._reserved_during_load is not None:
+                self._reserved_during_load.update(digests.values())
+
+    def unreserve(self, digests):
+        """Give up keys whose registration was not stored; the filter keeps their bits"""
+        self.pending.difference_update(digests.values())
+
+    def write_reserved(self, batch, source, offset):
+        """Store reserved (position, digests) pairs of one write to source, and record that
+        source is indexed up to offset, in one transaction. Call unreserve() afterwards.
+
+        On failure nothing is stored and the keys stay reserved, so pass them again with
+        the next batch.
+        """
+        try:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO unique_keys (digest, source, position) VALUES (?, ?, ?)",
+                sorted((digest, source, position) for position, digests in batch for digest in digests.values()),
+            )
+            self.set_offset(source, offset)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.grow_filter()
+
+    def release_after(self, source, position):
+        """Drop keys claimed for source past position (rows lost after a checkpoint)"""
+        deleted = self.db.execute(
+            "DELETE FROM unique_keys WHERE source = ? AND position > ?", (source, position)
+        ).rowcount
+        self.db.commit()
+        if deleted:
+            self.load_filter(self.bloom.capacity)
+        return deleted
+
+    def commit(self):
+        self.db.commit()
+
+    def indexed_offset(self, source):
+        """Bytes of source already read into the index"""
+        row = self.db.execute("SELECT offset FROM sources WHERE path = ?", (source,)).fetchone()
+        return row[0] if row else 0
+
+    def set_offset(self, source, offset):
+        self.db.execute(
+            "INSERT INTO sources (path, offset) VALUES (?, ?) "
+            "ON CONFLICT (path) DO UPDATE SET offset = excluded.offset",
+            (source, offset),
+        )
+
+    def catch_up(self, path):
+        """Index the registrations appended to a JSONL file since it was last read;
+        returns (records read, duplicates skipped)
+
+        A file shorter than its recorded offset was replaced, so its keys are dropped and
+        it is read again from the start. A trailing line without its newline is still
+        being written and is left for the next call.
+        """
+        source = source_key(path)
+        offset = self.indexed_offset(source)
+        if os.path.getsize(path) < offset:
+            self.release_after(source, -1)
+            offset = 0
+        records = duplicates = 0
+        added = []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                position = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                records += 1
+                digests = record_digests(parse_record(line))
+                inserted = [digest for digest in digests.values() if self.db.execute(
+                    "INSERT OR IGNORE INTO unique_keys (digest, source, position) VALUES (?, ?, ?)",
+                    (digest, source, position),
+                ).rowcount]
+                if len(inserted) < len(digests):
+                    duplicates += 1
+                added.extend(inserted)
+        self.set_offset(source, offset)
+        self.db.commit()
+        self.add_to_filter(added)
+        return records, duplicates
+
+    def rebuild(self, paths):
+        """Replace the index with the emails and phones of registration JSONL files;
+        returns (records read, duplicates skipped)"""
+        self.db.execute("DELETE FROM unique_keys")
+        self.db.execute("DELETE FROM sources")
+        self.db.commit()
+        self.load_filter()
+        records = duplicates = 0
+        for path in paths:
+            read, repeated = self.catch_up(path)
+            records += read
+            duplicates += repeated
+        return records, duplicates
+
+    def report(self):
+        """Keys, filter size and false-positive rates, expected and observed"""
+        negatives = self.stats["filtered"] + self.stats["false_positives"]
+        return {
+            "keys": len(self),
+            "bloom_capacity": self.bloom.capacity,
+            "bloom_bits": self.bloom.size,
+            "bloom_hashes": self.bloom.hashes,
+            "bloom_memory_bytes": self.bloom.memory_bytes,
+            "index_bytes": sum(os.path.getsize(path) for path in (self.path, self.path + "-wal")
+                               if os.path.exists(path)),
+            "expected_fp_rate": self.bloom.expected_error_rate(),
+            # Share of keys not in the index that still needed an exact lookup
+            "observed_fp_rate": self.stats["false_positives"] / negatives if negatives else None,
+            **self.stats,
+        }
+
+
+def parse_record(line):
+    """Registration dict of a JSONL line; {} for lines that are not JSON objects"""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return {}
+    return record if isinstance(record, dict) else {}
+
+
+def probe_error_rate(index, count):
+    """Measured false-positive rate of the filter over `count` random keys it never saw"""
+    hits = 0
+    for _ in range(count):
+        if os.urandom(DIGEST_SIZE) in index.bloom:
+            hits += 1
+    return hits / count if count else None
+
+
+def print_report(report):
+    print(f"  • Keys: {report['keys']:,} (index file {report['index_bytes'] / 1e6:,.1f} MB)")
+    print(f"  • Bloom filter: {report['bloom_bits']:,} bits, {report['bloom_hashes']} hashes, "
+          f"{report['bloom_memory_bytes'] / 1e6:,.2f} MB for {report['bloom_capacity']:,} keys")
+    print(f"  • Expected false-positive rate: {report['expected_fp_rate'] * 100:.4f}%")
+    if report["observed_fp_rate"] is not None:
+        print(f"  • Observed false-positive rate: {report['observed_fp_rate'] * 100:.4f}% "
+              f"({report['false_positives']:,} of {report['filtered'] + report['false_positives']:,} new keys)")
+    if report["checks"]:
+        print(f"  • Checks: {report['checks']:,}, answered from memory: {report['filtered']:,}, "
+              f"exact lookups: {report['lookups']:,}")
+
+
+def main(argv=None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Email and phone uniqueness index")
+    parser.add_argument("--index", default=INDEX_PATH, help="SQLite index path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = commands.add_parser("rebuild", help="rebuild the index from registration JSONL files")
+    rebuild_parser.add_argument("inputs", nargs="+")
+
+    stats_parser = commands.add_parser("stats", help="print size and false-positive rates")
+    stats_parser.add_argument("--probe", type=int, default=100_000,
+                              help="random absent keys used to measure the false-positive rate")
+
+    check_parser = commands.add_parser("check", help="look up an email and/or phone")
+    check_parser.add_argument("--email")
+    check_parser.add_argument("--phone")
+
+    args = parser.parse_args(argv)
+    index = UniquenessIndex(args.index)
+    try:
+        if args.command == "rebuild":
+            started = time.perf_counter()
+            records, duplicates = index.rebuild(args.inputs)
+            print(f"✓ Indexed {records:,} registrations in {time.perf_counter() - started:.1f}s "
+                  f"({duplicates:,} repeated an earlier email or phone)")
+            print_report(index.report())
+        elif args.command == "stats":
+            print(f"📊 {args.index}")
+            print_report(index.report())
+            measured = probe_error_rate(index, args.probe)
+            if measured is not None:
+                print(f"  • Measured false-positive rate: {measured * 100:.4f}% over {args.probe:,} random keys")
+        else:
+            record = {"email": args.email, "phone": args.phone}
+            conflicts = index.conflicts(record)
+            for field in UNIQUE_FIELDS:
+                if record[field] is None:
+                    continue
+                if field in conflicts:
+                    print(f"✗ {field} {record[field]}: already registered")
+                else:
+                    print(f"✓ {field} {record[field]}: available")
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,467 @@
+"""
+Python port of the FormValidator class in frontend/validation.js
+Same rules and error messages, usable without a browser as a test oracle and as the server-side check
+"""
+
+import re
+from collections import namedtuple
+
+from backend.disposable_index import load_disposable_index
+from backend.frontend_data import load_frontend_data
+
+
+# Characters matched by JavaScript's \s and stripped by trim(), which differ from str.isspace()
+JS_WHITESPACE = (
+    "\t\n\v\f\r \u00a0\u1680" + "".join(map(chr, range(0x2000, 0x200b)))
+    + "\u2028\u2029\u202f\u205f\u3000\ufeff"
+)
+
+NAME_PATTERN = re.compile(f"[a-zA-Z{JS_WHITESPACE}]+")
+EMAIL_PATTERN = re.compile(f"[^{JS_WHITESPACE}@]+@[^{JS_WHITESPACE}@]+\\.[^{JS_WHITESPACE}@]+")
+NON_PHONE_CHARS = re.compile(r"[^0-9+]")
+# parseInt(): leading whitespace, optional sign, then a 0x hex prefix or decimal digits
+PARSE_INT = re.compile(f"[{JS_WHITESPACE}]*([+-]?)(?:(0[xX])([0-9a-fA-F]*)|([0-9]+))")
+
+# Text fields getFormData() trims before validating
+TRIMMED_FIELDS = ("firstName", "lastName", "email", "phone", "age", "address")
+FORM_FIELDS = (
+    "firstName", "lastName", "email", "phone", "age", "gender", "address",
+    "country", "state", "city", "password", "confirmPassword", "terms",
+)
+# Fields whose checks also read other fields
+CONTEXT_FIELDS = {
+    "phone": ("country",),
+    "state": ("country",),
+    "city": ("country", "state"),
+    "confirmPassword": ("password",),
+}
+# Values the gender radio buttons submit
+GENDERS = ("male", "female", "other")
+# Raw terms values (case-insensitive) that mean the checkbox was ticked; anything else,
+# including CSV's false/0/no/'', means it was not
+ACCEPTED_TERMS = frozenset(("accepted", "true", "1", "yes", "y", "on"))
+# Validated but never written to disk
+SECRET_FIELDS = ("password", "confirmPassword")
+
+VALIDATION_RULES = {
+    "firstName": {
+        "required": True,
+        "minLength": 2,
+        "maxLength": 50,
+        "pattern": NAME_PATTERN,
+        "errorMessages": {
+            "required": "First name is required",
+            "minLength": "First name must be at least 2 characters",
+            "maxLength": "First name cannot exceed 50 characters",
+            "pattern": "First name can only contain letters and spaces",
+        },
+    },
+    "lastName": {
+        "required": True,
+        "minLength": 2,
+        "maxLength": 50,
+        "pattern": NAME_PATTERN,
+        "errorMessages": {
+            "required": "Last name is required",
+            "minLength": "Last name must be at least 2 characters",
+            "maxLength": "Last name cannot exceed 50 characters",
+            "pattern": "Last name can only contain letters and spaces",
+        },
+    },
+    "email": {
+        "required": True,
+        "pattern": EMAIL_PATTERN,
+        "errorMessages": {
+            "required": "Email address is required",
+            "pattern": "Please enter a valid email address",
+            "disposable": "Disposable email addresses are not allowed",
+        },
+    },
+    "phone": {
+        "required": True,
+        "errorMessages": {
+            "required": "Phone number is required",
+            "pattern": "Please enter a valid phone number",
+            "countryCode": "Phone number must match the selected country code",
+        },
+    },
+    "age": {
+        "required": False,
+        "min": 18,
+        "max": 100,
+        "errorMessages": {
+            "min": "You must be at least 18 years old",
+            "max": "Age cannot exceed 100 years",
+            "pattern": "Please enter a valid age",
+        },
+    },
+    "gender": {
+        "required": True,
+        "options": GENDERS,
+        "errorMessages": {
+            "required": "Please select your gender",
+            "options": "Please select a valid gender",
+        },
+    },
+    "address": {
+        "required": False,
+        "minLength": 5,
+        "maxLength": 200,
+        "errorMessages": {
+            "minLength": "Address must be at least 5 characters",
+            "maxLength": "Address cannot exceed 200 characters",
+        },
+    },
+    "country": {
+        "required": True,
+        "errorMessages": {
+            "required": "Please select a country",
+            "options": "Please select a valid country",
+        },
+    },
+    "state": {
+        "required": True,
+        "errorMessages": {
+            "required": "Please select a state",
+            "options": "Please select a valid state",
+        },
+    },
+    "city": {
+        "required": True,
+        "errorMessages": {
+            "required": "Please select a city",
+            "options": "Please select a valid city",
+        },
+    },
+    "password": {
+        "required": True,
+        "minLength": 8,
+        "errorMessages": {
+            "required": "Password is required",
+            "minLength": "Password must be at least 8 characters",
+            "strength": "Password is too weak. Use a mix of uppercase, lowercase, numbers, and special characters",
+        },
+    },
+    "confirmPassword": {
+        "required": True,
+        "errorMessages": {
+            "required": "Please confirm your password",
+            "match": "Passwords do not match",
+        },
+    },
+    "terms": {
+        "required": True,
+        "errorMessages": {"required": "You must agree to the Terms & Conditions"},
+    },
+}
+
+ValidationResult = namedtuple("ValidationResult", ["is_valid", "error"])
+FormValidation = namedtuple("FormValidation", ["is_valid", "errors"])
+
+VALID = ValidationResult(True, "")
+
+
+def js_length(value):
+    """String length in UTF-16 code units, as JavaScript's .length reports it"""
+    if value.isascii():
+        return len(value)
+    return len(value.encode("utf-16-le")) // 2
+
+
+def parse_int(value):
+    """JavaScript parseInt(value) for base 10/16 strings; None for NaN"""
+    match = PARSE_INT.match(value)
+    if not match:
+        return None
+    sign, hex_prefix, hex_digits, digits = match.groups()
+    if hex_prefix:
+        if not hex_digits:
+            return None
+        number = int(hex_digits, 16)
+    else:
+        number = int(digits)
+    return -number if sign == "-" else number
+
+
+def to_form_value(value):
+    """Coerce a raw record value to the string getFormData() would produce"""
+    if isinstance(value, str):
+        return value
+    if value is None or value is False:
+        return ""
+    if value is True:
+        return "accepted"
+    return str(value)
+
+
+def terms_value(value):
+    """'accepted' when a raw terms value means the box was ticked, as getFormData() sends it
+
+    CSV cells are always strings, so 'false' or 'no' must not pass as a non-empty value.
+    """
+    return "accepted" if to_form_value(value).strip(JS_WHITESPACE).lower() in ACCEPTED_TERMS else ""
+
+
+def form_data_from_record(record):
+    """Build the payload getFormData() would send from an arbitrary record (trimmed text fields)"""
+    form_data = {}
+    for name in FORM_FIELDS:
+        value = to_form_value(record.get(name))
+        form_data[name] = value.strip(JS_WHITESPACE) if name in TRIMMED_FIELDS else value
+    form_data["terms"] = terms_value(record.get("terms"))
+    return form_data
+
+
+def form_columns(columns, count):
+    """getFormData()-style value lists for every form field from raw {field: values} lists
+
+    Fields missing from columns are filled with '' for all count rows.
+    """
+    normalized = {}
+    for name in FORM_FIELDS:
+        values = columns.get(name)
+        if values is None:
+            normalized[name] = [""] * count
+            continue
+        if name == "terms":
+            normalized[name] = list(map(terms_value, values))
+            continue
+        values = [v if v.__class__ is str else to_form_value(v) for v in values]
+        if name in TRIMMED_FIELDS:
+            values = [v.strip(JS_WHITESPACE) for v in values]
+        normalized[name] = values
+    return normalized
+
+
+class FormValidator:
+    """Browser-free equivalent of the frontend FormValidator
+
+    It also rejects gender values and country/state/city paths the page's controls cannot
+    produce, which validation.js leaves to the radio buttons and dropdowns.
+    """
+
+    def __init__(self, frontend_data=None, disposable_index=None):
+        data = frontend_data or load_frontend_data()
+        self.phone_codes = dict(data.phone_codes)
+        self.states_by_country = {country: frozenset(states) for country, states in data.states_by_country.items()}
+        self.cities_by_state = {path: frozenset(cities) for path, cities in data.cities_by_state.items()}
+        # Suffix-aware, like the index validation.js fetches (falls back to data.js's list)
+        self.disposable_index = disposable_index or load_disposable_index()
+        self.validation_rules = VALIDATION_RULES
+
+        # Field-specific checks return an error message, or '' when valid
+        self._checks = {
+            "firstName": self._check_name,
+            "lastName": self._check_name,
+            "email": self._check_email,
+            "phone": self._check_phone,
+            "age": self._check_age,
+            "gender": self._check_gender,
+            "address": self._check_address,
+            "country": self._check_country,
+            "state": self._check_state,
+            "city": self._check_city,
+            "password": self._check_password,
+            "confirmPassword": self._check_confirm_password,
+        }
+        # Field name -> (rules, required, required message, check)
+        self._dispatch = {
+            name: (rules, rules["required"], rules["errorMessages"].get("required", ""), self._checks.get(name))
+            for name, rules in VALIDATION_RULES.items()
+        }
+
+    def field_error(self, field_name, value, form_data):
+        """Error message for one field, or '' when valid"""
+        entry = self._dispatch.get(field_name)
+        if entry is None:
+            return ""
+        rules, required, required_error, check = entry
+
+        if not value:
+            return required_error if required else ""
+        if check is None:
+            return ""
+        return check(value, rules, form_data)
+
+    def validate_field(self, field_name, value, form_data=None):
+        """Validate single field"""
+        error = self.field_error(field_name, to_form_value(value), form_data or {})
+        return ValidationResult(False, error) if error else VALID
+
+    def _check_name(self, value, rules, form_data):
+        messages = rules["errorMessages"]
+        length = js_length(value)
+        if length < rules["minLength"]:
+            return messages["minLength"]
+        if length > rules["maxLength"]:
+            return messages["maxLength"]
+        if not rules["pattern"].fullmatch(value):
+            return messages["pattern"]
+        return ""
+
+    def _check_email(self, value, rules, form_data):
+        if not rules["pattern"].fullmatch(value):
+            return rules["errorMessages"]["pattern"]
+
+        # Check for disposable email domains
+        domain = value.split("@")[1]
+        if domain and self.disposable_index.is_disposable(domain):
+            return rules["errorMessages"]["disposable"]
+        return ""
+
+    def _check_phone(self, value, rules, form_data):
+        # Remove all non-digit characters except +
+        clean_phone = NON_PHONE_CHARS.sub("", value)
+        if len(clean_phone) < 10:
+            return rules["errorMessages"]["pattern"]
+
+        # Accept the number with or without its leading '+'
+        country_code = self.phone_codes.get(form_data.get("country"))
+        if clean_phone.startswith("+"):
+            clean_phone = clean_phone[1:]
+        if country_code and not clean_phone.startswith(country_code.replace("+", "", 1)):
+            return f"{rules['errorMessages']['countryCode']} ({country_code})"
+        return ""
+
+    def _check_age(self, value, rules, form_data):
+        age = parse_int(value)
+        if age is None:
+            return rules["errorMessages"]["pattern"]
+        if age < rules["min"]:
+            return rules["errorMessages"]["min"]
+        if age > rules["max"]:
+            return rules["errorMessages"]["max"]
+        return ""
+
+    def _check_address(self, value, rules, form_data):
+        length = js_length(value)
+        if 0 < length < rules["minLength"]:
+            return rules["errorMessages"]["minLength"]
+        if length > rules["maxLength"]:
+            return rules["errorMessages"]["maxLength"]
+        return ""
+
+    def _check_gender(self, value, rules, form_data):
+        if value not in rules["options"]:
+            return rules["errorMessages"]["options"]
+        return ""
+
+    def _check_country(self, value, rules, form_data):
+        if value not in self.states_by_country:
+            return rules["errorMessages"]["options"]
+        return ""
+
+    def _check_state(self, value, rules, form_data):
+        # An unknown country is reported on the country field alone
+        states = self.states_by_country.get(form_data.get("country"))
+        if states is not None and value not in states:
+            return rules["errorMessages"]["options"]
+        return ""
+
+    def _check_city(self, value, rules, form_data):
+        # Likewise an unknown state is reported on the state field
+        cities = self.cities_by_state.get((form_data.get("country"), form_data.get("state")))
+        if cities is not None and value not in cities:
+            return rules["errorMessages"]["options"]
+        return ""
+
+    def _check_password(self, value, rules, form_data):
+        if js_length(value) < rules["minLength"]:
+            return rules["errorMessages"]["minLength"]
+        return ""
+
+    def _check_confirm_password(self, value, rules, form_data):
+        if value != form_data.get("password"):
+            return rules["errorMessages"]["match"]
+        return ""
+
+    def calculate_password_strength(self, password):
+        """'weak', 'medium' or 'strong', as calculatePasswordStrength() scores it"""
+        length = js_length(password)
+        strength = (length >= 8) + (length >= 12)
+        strength += any("a" <= c <= "z" for c in password)
+        strength += any("A" <= c <= "Z" for c in password)
+        strength += any("0" <= c <= "9" for c in password)
+        strength += any(not (c.isascii() and c.isalnum()) for c in password)
+
+        if strength <= 2:
+            return "weak"
+        if strength <= 4:
+            return "medium"
+        return "strong"
+
+    def validate_form(self, form_data):
+        """Validate entire form; form_data holds getFormData()-style string values"""
+        errors = {}
+        dispatch = self._dispatch
+        for field_name, value in form_data.items():
+            entry = dispatch.get(field_name)
+            if entry is None:
+                continue
+            rules, required, required_error, check = entry
+            if not value:
+                if required:
+                    errors[field_name] = required_error
+                continue
+            if check is not None:
+                error = check(value, rules, form_data)
+                if error:
+                    errors[field_name] = error
+        return FormValidation(not errors, errors)
+
+    def validate_record(self, record):
+        """Validate a raw record after normalizing it like getFormData()"""
+        return self.validate_form(form_data_from_record(record))
+
+    def validate_batch(self, records):
+        """Validate many raw records; returns a FormValidation per record
+
+        Same results as validate_record(), computed column by column.
+        """
+        records = list(records)
+        raw = {name: [record.get(name) for record in records] for name in FORM_FIELDS}
+        return self.validate_columns(form_columns(raw, len(records)))
+
+    def validate_columns(self, columns):
+        """Validate rows stored as form_columns() output; returns a FormValidation per row
+
+        Each distinct value is checked once per call, since names, ages and locations
+        repeat heavily across registrations.
+        """
+        errors = [None] * len(columns[FORM_FIELDS[0]])
+
+        # FORM_FIELDS order keeps each errors dict ordered like validateForm()'s
+        for field_name in FORM_FIELDS:
+            rules, required, required_error, check = self._dispatch[field_name]
+            context = CONTEXT_FIELDS.get(field_name)
+            keys = columns[field_name] if context is None else list(
+                zip(columns[field_name], *(columns[name] for name in context))
+            )
+
+            # Error per distinct invalid value (or (value, context value) pair)
+            invalid = {}
+            for key in set(keys):
+                if context is None:
+                    value, form_data = key, None
+                else:
+                    value, form_data = key[0], dict(zip(context, key[1:]))
+                if not value:
+                    error = required_error if required else ""
+                else:
+                    error = check(value, rules, form_data) if check else ""
+                if error:
+                    invalid[key] = error
+            if not invalid:
+                continue
+
+            for index, key in enumerate(keys):
+                error = invalid.get(key)
+                if error:
+                    if errors[index] is None:
+                        errors[index] = {}
+                    errors[index][field_name] = error
+
+        return list(map(
+            FormValidation._make,
+            ((True, {}) if e is None else (False, e) for e in errors),
+        ))
\ No newline at end of file
@@ -0,0 +1,74 @@
+// Generated from data.js by `python -m backend.location_chunks build`; do not edit.
+// States and cities are fetched per country by loadCountryLocations() in script.js.
+
+// ==================== Country Index ====================
+// Country -> version of its location chunk, sent as ?v= so chunks cache indefinitely
+const locationIndex = {
+    "Australia": "152e11affc7d8889",
+    "Canada": "6104c03d8972bc3e",
+    "France": "08030e1b1cd81549",
+    "Germany": "d463ce18328e8ab1",
+    "India": "90b4b9ce03fff57c",
+    "Japan": "87d78df10f155cc6",
+    "Singapore": "dbbcc267c4993f5e",
+    "United Kingdom": "8b6454258779af32",
+    "United States": "e26e12885aa514ac"
+};
+
+// ==================== Country Phone Codes ====================
+const countryPhoneCodes = {
+    "India": "+91",
+    "United States": "+1",
+    "United Kingdom": "+44",
+    "Canada": "+1",
+    "Australia": "+61",
+    "Germany": "+49",
+    "France": "+33",
+    "Japan": "+81",
+    "Singapore": "+65"
+};
+
+// ==================== Disposable Email Domains ====================
+const disposableEmailDomains = [
+    "10minutemail.com",
+    "33mail.com",
+    "anonymbox.com",
+    "disposable.com",
+    "disposableemailaddresses.com",
+    "dispostable.com",
+    "emailondeck.com",
+    "fakeinbox.com",
+    "getnada.com",
+    "guerrillamail.com",
+    "guerrillamail.info",
+    "jetable.org",
+    "mailcatch.com",
+    "maildrop.cc",
+    "mailinator.com",
+    "mailnesia.com",
+    "mintemail.com",
+    "mohmal.com",
+    "mytrashmail.com",
+    "sharklasers.com",
+    "spam4.me",
+    "spamgourmet.com",
+    "temp-mail.org",
+    "tempmail.com",
+    "tempr.email",
+    "throwaway.email",
+    "throwawaymail.com",
+    "tmpeml.info",
+    "trashmail.com",
+    "yopmail.com",
+    "临时邮.com",
+    "临时邮箱.com"
+];
+
+// Export data for use in other scripts
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = {
+        locationIndex,
+        countryPhoneCodes,
+        disposableEmailDomains
+    };
+}
@@ -3,6 +3,30 @@ const form = document.getElementById('registrationForm');
 const submitBtn = document.getElementById('submitBtn');
 const alertContainer = document.getElementById('alertContainer');
 
+// Registration endpoint served by backend/server.py
+const REGISTER_URL = '/api/register';
+
+// Per-country {state: [cities]} chunks served by backend/server.py (built by
+// backend/location_chunks.py); each country is fetched once, on first selection
+const LOCATIONS_URL = '/api/locations';
+const locationChunks = new Map();
+
+// Settles when the latest country/state change has rebuilt the dropdowns
+let locationUpdate = Promise.resolve();
+
+// States with more cities than this get a type-ahead backed by /api/search instead of
+// a dropdown holding every city
+const CITY_SEARCH_THRESHOLD = 500;
+const SEARCH_URL = '/api/search';
+const CITY_SUGGESTION_LIMIT = 10;
+const CITY_SEARCH_DEBOUNCE_MS = 150;
+const citySearch = document.getElementById('citySearch');
+const citySuggestions = document.getElementById('citySuggestions');
+
+// User Timing prefix for hot-path handlers; measures are only recorded when the page
+// opts in (automation/browser_metrics.py sets window.__registrationPerf before load)
+const PERF_MEASURE_PREFIX = 'registration:';
+
 // Form fields
 const fields = {
     firstName: document.getElementById('firstName'),
@@ -33,7 +57,7 @@ function initializeCountryDropdown() {
     const countrySelect = fields.country;
     
     // Populate countries
-    const countries = Object.keys(locationData).sort();
+    const countries = Object.keys(locationIndex).sort();
     countries.forEach(country => {
         const option = document.createElement('option');
         option.value = country;
@@ -42,70 +66,112 @@ function initializeCountryDropdown() {
     });
 }
 
+// Fetch a country's states and cities once; resolves to null when unavailable
+function loadCountryLocations(country) {
+    if (!locationChunks.has(country)) {
+        if (!(country in locationIndex)) {
+            return Promise.resolve(null);
+        }
+        // The version makes the URL change with the data, so the chunk is cached for good
+        const url = `${LOCATIONS_URL}/${encodeURIComponent(country)}?v=${locationIndex[country]}`;
+        const chunk = fetch(url)
+            .then(response => {
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                return response.json();
+            })
+            .catch(error => {
+                // Forget the failure so the next selection retries
+                console.warn(`Locations for ${country} unavailable:`, error);
+                showAlert(`Could not load the states of ${country}. Please try selecting it again.`, 'error');
+                locationChunks.delete(country);
+                return null;
+            });
+        locationChunks.set(country, chunk);
+    }
+    return locationChunks.get(country);
+}
+
 // Handle country change
-function handleCountryChange() {
+async function handleCountryChange() {
     const country = fields.country.value;
     const stateSelect = fields.state;
     const citySelect = fields.city;
 
-    // Reset state and city
+    // Reset state and city; the state dropdown stays disabled until its chunk arrives
     stateSelect.innerHTML = '<option value="">Select State</option>';
     citySelect.innerHTML = '<option value="">Select City</option>';
+    stateSelect.disabled = true;
     citySelect.disabled = true;
+    hideCitySearch();
 
-    if (country && locationData[country]) {
-        // Enable state dropdown
-        stateSelect.disabled = false;
-
-        // Populate states
-        const states = Object.keys(locationData[country]).sort();
-        states.forEach(state => {
-            const option = document.createElement('option');
-            option.value = state;
-            option.textContent = state;
-            stateSelect.appendChild(option);
-        });
-
-        // Update phone field placeholder with country code
-        if (countryPhoneCodes[country]) {
-            fields.phone.placeholder = `${countryPhoneCodes[country]} XXXXX XXXXX`;
-        }
-    } else {
-        stateSelect.disabled = true;
+    // Update phone field placeholder with country code
+    if (country && countryPhoneCodes[country]) {
+        fields.phone.placeholder = `${countryPhoneCodes[country]} XXXXX XXXXX`;
+    } else if (!country) {
         fields.phone.placeholder = '+91 98765 43210';
     }
 
     // Validate country field
     validateSingleField('country');
+
+    const locations = country ? await loadCountryLocations(country) : null;
+    // A later change owns the dropdowns now
+    if (!locations || fields.country.value !== country) {
+        return;
+    }
+
+    // Enable state dropdown
+    stateSelect.disabled = false;
+
+    // Populate states
+    const states = Object.keys(locations).sort();
+    states.forEach(state => {
+        const option = document.createElement('option');
+        option.value = state;
+        option.textContent = state;
+        stateSelect.appendChild(option);
+    });
 }
 
 // Handle state change
-function handleStateChange() {
+async function handleStateChange() {
     const country = fields.country.value;
     const state = fields.state.value;
     const citySelect = fields.city;
 
     // Reset city
     citySelect.innerHTML = '<option value="">Select City</option>';
+    citySelect.disabled = true;
+    hideCitySearch();
+
+    // Validate state field
+    validateSingleField('state');
+
+    // Already fetched by handleCountryChange(), so this resolves from memory
+    const locations = country && state ? await loadCountryLocations(country) : null;
+    if (fields.country.value !== country || fields.state.value !== state) {
+        return;
+    }
+
+    if (locations && locations[state]) {
+        if (locations[state].length > CITY_SEARCH_THRESHOLD) {
+            // Too many cities to render as options: one is picked through the type-ahead
+            citySearch.hidden = false;
+            return;
+        }
 
-    if (country && state && locationData[country] && locationData[country][state]) {
         // Enable city dropdown
         citySelect.disabled = false;
 
         // Populate cities
-        const cities = locationData[country][state].sort();
+        const cities = locations[state].sort();
         cities.forEach(city => {
             const option = document.createElement('option');
             option.value = city;
             option.textContent = city;
             citySelect.appendChild(option);
         });
-    } else {
-        citySelect.disabled = true;
     }
-
-    // Validate state field
-    validateSingleField('state');
 }
 
 // Handle city change
@@ -113,13 +179,89 @@ function handleCityChange() {
     validateSingleField('city');
 }
 
+// ==================== City Type-Ahead ====================
+function hideCitySearch() {
+    citySearch.hidden = true;
+    citySearch.value = '';
+    citySuggestions.innerHTML = '';
+}
+
+// Suggest cities of the selected state matching what has been typed
+async function updateCitySuggestions() {
+    const query = citySearch.value.trim();
+    if (!query) {
+        citySuggestions.innerHTML = '';
+        return;
+    }
+
+    const params = new URLSearchParams({
+        q: query,
+        type: 'city',
+        country: fields.country.value,
+        state: fields.state.value,
+        limit: CITY_SUGGESTION_LIMIT
+    });
+    let results;
+    try {
+        const response = await fetch(`${SEARCH_URL}?${params}`);
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        results = (await response.json()).results;
+    } catch (error) {
+        console.warn('City search unavailable:', error);
+        return;
+    }
+
+    // Typing moved on while the request was in flight
+    if (citySearch.value.trim() !== query) {
+        return;
+    }
+    citySuggestions.innerHTML = '';
+    results.forEach(result => {
+        const option = document.createElement('option');
+        option.value = result.name;
+        citySuggestions.appendChild(option);
+    });
+}
+
+// Select the typed city once it names a city of the selected state
+async function handleCitySearchChange() {
+    const country = fields.country.value;
+    const state = fields.state.value;
+    const name = citySearch.value.trim();
+
+    const locations = await loadCountryLocations(country);
+    if (fields.country.value !== country || fields.state.value !== state) {
+        return;
+    }
+    if (!locations || !locations[state] || !locations[state].includes(name)) {
+        return;
+    }
+
+    // The dropdown holds just the chosen city, so validation and submission read it as usual
+    const citySelect = fields.city;
+    citySelect.innerHTML = '<option value="">Select City</option>';
+    const option = document.createElement('option');
+    option.value = name;
+    option.textContent = name;
+    citySelect.appendChild(option);
+    citySelect.disabled = false;
+    citySelect.value = name;
+    citySelect.dispatchEvent(new Event('change', { bubbles: true }));
+}
+
 // ==================== Event Listeners ====================
 function attachEventListeners() {
     // Country, State, City dropdowns
-    fields.country.addEventListener('change', handleCountryChange);
-    fields.state.addEventListener('change', handleStateChange);
+    const measuredCountryChange = measured('handleCountryChange', handleCountryChange);
+    const measuredStateChange = measured('handleStateChange', handleStateChange);
+    fields.country.addEventListener('change', () => { locationUpdate = measuredCountryChange(); });
+    fields.state.addEventListener('change', () => { locationUpdate = measuredStateChange(); });
     fields.city.addEventListener('change', handleCityChange);
 
+    // City type-ahead for states with too many cities for a dropdown
+    citySearch.addEventListener('input', debounce(updateCitySuggestions, CITY_SEARCH_DEBOUNCE_MS));
+    citySearch.addEventListener('change', handleCitySearchChange);
+
     // Text inputs - validate on blur and input
     const textFields = ['firstName', 'lastName', 'email', 'phone', 'age', 'address'];
     textFields.forEach(fieldName => {
@@ -133,14 +275,26 @@ function attachEventListeners() {
         });
     });
 
+    // Fetch the full disposable domain list the first time the email field is used
+    fields.email.addEventListener('focus', () => {
+        formValidator.loadDisposableDomains().then(loaded => {
+            const email = fields.email;
+            if (loaded && (email.classList.contains('valid') || email.classList.contains('invalid'))) {
+                validateSingleField('email');
+                updateSubmitButton();
+            }
+        });
+    }, { once: true });
+
     // Gender radio buttons
     fields.gender.forEach(radio => {
         radio.addEventListener('change', () => validateSingleField('gender'));
     });
 
     // Password field - real-time strength meter
+    const measuredPasswordStrength = measured('updatePasswordStrength', updatePasswordStrength);
     fields.password.addEventListener('input', () => {
-        updatePasswordStrength();
+        measuredPasswordStrength();
         validateSingleField('password');
         
         // Also validate confirm password if it has a value
@@ -164,8 +318,9 @@ function attachEventListeners() {
     form.addEventListener('submit', handleFormSubmit);
 
     // Real-time form validation for submit button
-    form.addEventListener('input', updateSubmitButton);
-    form.addEventListener('change', updateSubmitButton);
+    const measuredSubmitButton = measured('updateSubmitButton', updateSubmitButton);
+    form.addEventListener('input', measuredSubmitButton);
+    form.addEventListener('change', measuredSubmitButton);
 }
 
 // ==================== Field Validation ====================
@@ -352,8 +507,28 @@ async function handleFormSubmit(e) {
     submitBtn.disabled = true;
 
     try {
-        // Simulate API call
-        await new Promise(resolve => setTimeout(resolve, 2000));
+        const response = await fetch(REGISTER_URL, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(formData)
+        });
+        const result = await response.json().catch(() => ({}));
+
+        if (response.status === 400 && result.errors) {
+            // Server-side validation disagreed with the browser
+            showAlert('Please correct the errors in the form before submitting.', 'error');
+            showFieldErrors(result.errors);
+            return;
+        }
+        if (response.status === 409 && result.errors) {
+            // Email or phone already belongs to a registration
+            showAlert('An account with these details already exists.', 'error');
+            showFieldErrors(result.errors);
+            return;
+        }
+        if (response.status !== 201) {
+            throw new Error(result.error || `Registration failed with status ${response.status}`);
+        }
 
         // Success!
         showAlert('Registration Successful! Your profile has been submitted successfully.', 'success');
@@ -364,6 +539,7 @@ async function handleFormSubmit(e) {
             clearFormValidation();
             fields.state.disabled = true;
             fields.city.disabled = true;
+            hideCitySearch();
             updateSubmitButton();
             
             // Scroll to top
@@ -377,6 +553,23 @@ async function handleFormSubmit(e) {
     }
 }
 
+// Mark fields rejected by the server with its error messages
+function showFieldErrors(errors) {
+    Object.entries(errors).forEach(([fieldName, message]) => {
+        const field = fields[fieldName];
+        if (!field) return;
+
+        // Same placement of the invalid state as validateSingleField()
+        const formGroup = field.closest ? field.closest('.form-group') : field[0].closest('.form-group');
+        const target = (fieldName === 'gender' || fieldName === 'terms') ? formGroup : field;
+        target.classList.remove('valid');
+        target.classList.add('invalid');
+
+        const errorElement = formGroup.querySelector('.error-message');
+        if (errorElement) errorElement.textContent = message;
+    });
+}
+
 // ==================== Alert Messages ====================
 function showAlert(message, type) {
     const alert = document.createElement('div');
@@ -440,6 +633,31 @@ function debounce(func, wait) {
     };
 }
 
+// Wrap a handler so each call is recorded as a performance.measure() when metrics are on
+function measured(name, func) {
+    const measureName = PERF_MEASURE_PREFIX + name;
+    return function measuredFunction(...args) {
+        if (!window.__registrationPerf) {
+            return func.apply(this, args);
+        }
+        const start = performance.now();
+        const finish = () => performance.measure(measureName, { start, end: performance.now() });
+        let result;
+        try {
+            result = func.apply(this, args);
+        } catch (error) {
+            finish();
+            throw error;
+        }
+        // Async handlers are measured until they settle, fetches included
+        if (result instanceof Promise) {
+            return result.finally(finish);
+        }
+        finish();
+        return result;
+    };
+}
+
 // ==================== Console Logs for Testing ====================
 console.log('%c🎨 Registration System Loaded! ', 'background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; font-size: 16px; padding: 10px 20px; border-radius: 5px;');
 console.log('%c📝 Form Validation: Active', 'color: #10b981; font-size: 14px;');
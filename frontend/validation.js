@@ -1,6 +1,41 @@
 // ==================== Validation Functions ====================
 // Version: 2.0 - Updated password validation (2026-01-28)
 
+// ==================== Disposable Domain Index ====================
+// Front-coded list of reversed domains built by backend/disposable_index.py
+const DISPOSABLE_DOMAINS_URL = 'disposable-domains.txt';
+
+// Lowercase ASCII form of a domain, with IDN labels in punycode
+function normalizeDomain(domain) {
+    domain = domain.trim().replace(/\.+$/, '').toLowerCase();
+    if (domain.startsWith('*.')) domain = domain.slice(2);
+    domain = domain.replace(/^[.@]+/, '');
+    if (!domain || /^[\x00-\x7f]*$/.test(domain)) return domain;
+    try {
+        return new URL(`http://${domain}`).hostname;
+    } catch (error) {
+        return '';
+    }
+}
+
+// 'x.mailinator.com' -> 'com.mailinator.x'
+function reverseLabels(domain) {
+    return domain.split('.').reverse().join('.');
+}
+
+// Each line is '<chars shared with previous key> <rest of key>'
+function decodeDisposableBlob(text) {
+    const keys = [];
+    let previous = '';
+    text.split('\n').forEach(line => {
+        if (!line || line.startsWith('#')) return;
+        const space = line.indexOf(' ');
+        previous = previous.slice(0, parseInt(line.slice(0, space), 10)) + line.slice(space + 1);
+        keys.push(previous);
+    });
+    return keys;
+}
+
 class FormValidator {
     constructor() {
         this.validationRules = {
@@ -111,6 +146,45 @@ class FormValidator {
                 }
             }
         };
+
+        // Reversed domains; starts with the inline list and grows when the full index loads
+        this.disposableIndex = new Set(
+            disposableEmailDomains.map(domain => reverseLabels(normalizeDomain(domain))).filter(Boolean)
+        );
+        this.disposableIndexPromise = null;
+    }
+
+    // Fetch the full disposable domain index once; resolves to true when it was loaded
+    loadDisposableDomains() {
+        if (!this.disposableIndexPromise) {
+            if (typeof window === 'undefined' || typeof fetch === 'undefined') {
+                this.disposableIndexPromise = Promise.resolve(false);
+            } else {
+                this.disposableIndexPromise = fetch(DISPOSABLE_DOMAINS_URL)
+                    .then(response => {
+                        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                        return response.text();
+                    })
+                    .then(text => {
+                        decodeDisposableBlob(text).forEach(key => this.disposableIndex.add(key));
+                        return true;
+                    })
+                    .catch(error => {
+                        console.warn('Disposable domain index unavailable, using inline list:', error);
+                        return false;
+                    });
+            }
+        }
+        return this.disposableIndexPromise;
+    }
+
+    // True when the domain or any of its parent domains is listed
+    isDisposableDomain(domain) {
+        const labels = normalizeDomain(domain).split('.').reverse();
+        for (let i = labels.length; i > 0; i--) {
+            if (this.disposableIndex.has(labels.slice(0, i).join('.'))) return true;
+        }
+        return false;
     }
 
     // Validate single field
@@ -186,7 +260,7 @@ class FormValidator {
 
         // Check for disposable email domains
         const domain = value.split('@')[1];
-        if (domain && disposableEmailDomains.includes(domain.toLowerCase())) {
+        if (domain && this.isDisposableDomain(domain)) {
             return { isValid: false, error: rules.errorMessages.disposable };
         }
 
@@ -205,7 +279,8 @@ class FormValidator {
         // Check country code if country is selected
         if (country && countryPhoneCodes[country]) {
             const countryCode = countryPhoneCodes[country];
-            if (!cleanPhone.startsWith(countryCode.replace('+', ''))) {
+            // Accept the number with or without its leading '+'
+            if (!cleanPhone.replace(/^\+/, '').startsWith(countryCode.replace('+', ''))) {
                 return {
                     isValid: false,
                     error: `${rules.errorMessages.countryCode} (${countryCode})`
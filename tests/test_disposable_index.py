@@ -0,0 +1,50 @@
+from backend.disposable_index import (
+    DisposableIndex, build_index, compact_keys, decode_blob, encode_blob, normalize_domain,
+)
+
+
+DOMAINS = ["mailinator.com", "inbox.mailinator.com", "sub.temp-mail.org", "Müll.de", "*.Throwaway.Email."]
+
+
+def test_parent_domains_block_their_subdomains():
+    index = DisposableIndex.from_domains(DOMAINS)
+
+    assert index.match("mailinator.com") == "mailinator.com"
+    assert index.match("a.b.mailinator.com") == "mailinator.com"
+    assert index.match("x.sub.temp-mail.org") == "sub.temp-mail.org"
+    # Neither a listed domain's parent nor a name that only shares a prefix with it
+    for domain in ("temp-mail.org", "notmailinator.com", "mailinator-mirror.com", "mailinator.com.evil.org", ""):
+        assert index.match(domain) is None
+
+
+def test_case_and_idn_forms_are_folded():
+    index = DisposableIndex.from_domains(DOMAINS)
+
+    assert normalize_domain("*.Mailinator.COM.") == "mailinator.com"
+    assert normalize_domain("@müll.de") == "xn--mll-hoa.de"
+    assert index.is_disposable("MAILINATOR.COM")
+    assert index.is_disposable("x.MÜLL.de")
+    assert index.is_disposable("xn--mll-hoa.de")
+    assert index.is_disposable("throwaway.email")
+
+
+def test_keys_are_compacted_under_their_listed_parents():
+    assert compact_keys(DOMAINS) == ["com.mailinator", "de.xn--mll-hoa", "email.throwaway", "org.temp-mail.sub"]
+
+
+def test_blob_and_index_file_round_trip(tmp_path):
+    keys = compact_keys(DOMAINS + ["mailinator.net", "mailnesia.com"])
+    blob = encode_blob(keys)
+
+    assert decode_blob(blob) == keys
+    # Front-coded: each line stores only what differs from the previous key
+    assert blob.splitlines()[1:3] == ["0 com.mailinator", "8 nesia"]
+
+    path = tmp_path / "disposable.idx"
+    path.write_bytes(build_index(keys))
+    index = DisposableIndex.open(str(path))
+    try:
+        assert list(index.keys()) == keys
+        assert index.match("x.mailnesia.com") == "mailnesia.com"
+    finally:
+        index.close()
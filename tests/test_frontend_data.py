@@ -0,0 +1,67 @@
+import pytest
+
+from backend import frontend_data
+from backend.frontend_data import extract_literal, load_frontend_data, parse_data_js
+
+
+SOURCE = """
+// Comments may mention const locationData = {} without confusing the parser
+const locationData = {
+    "India": {
+        // Trailing commas and comments, as hand-edited data.js has them
+        "Maharashtra": ["Pune", "Mumbai",],
+        'Goa': ['Panaji', 'Vasco \\'da\\' Gama'],
+    },
+    "Canada": { "Ontario": ["Toronto // not a comment", "Ottawa"] },
+};
+
+const countryPhoneCodes = { "India": "+91", "Canada": "+1", "United States": "+1" };
+const disposableEmailDomains = ["Mailinator.com", "a\\"b.com"];
+const unrelated = [1, 2, 3];
+"""
+
+
+def test_parse_data_js_reads_the_three_constants():
+    values = parse_data_js(SOURCE)
+
+    assert values["locationData"] == {
+        "India": {"Maharashtra": ["Pune", "Mumbai"], "Goa": ["Panaji", "Vasco 'da' Gama"]},
+        "Canada": {"Ontario": ["Toronto // not a comment", "Ottawa"]},
+    }
+    assert values["countryPhoneCodes"]["Canada"] == "+1"
+    assert values["disposableEmailDomains"] == ["Mailinator.com", 'a"b.com']
+    assert "unrelated" not in values
+
+
+def test_parse_errors():
+    with pytest.raises(ValueError, match="missing: countryPhoneCodes, disposableEmailDomains"):
+        parse_data_js("const locationData = {};")
+    with pytest.raises(ValueError, match="Unterminated"):
+        extract_literal('{"India": [', 0)
+
+
+def test_load_builds_indexes_and_reuses_the_disk_cache(tmp_path, monkeypatch):
+    path = tmp_path / "data.js"
+    path.write_text(SOURCE, encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    data = load_frontend_data(str(path), str(cache_dir))
+
+    assert data.countries == ("Canada", "India")
+    assert data.states("India") == ("Goa", "Maharashtra")
+    assert data.cities("India", "Maharashtra") == ("Mumbai", "Pune")
+    assert data.paths_for_city("Ottawa") == (("Canada", "Ontario"),)
+    assert data.countries_by_phone_code["+1"] == ("Canada", "United States")
+    assert data.is_disposable("MAILINATOR.COM")
+    assert list(data.paths())[0] == ("Canada", "Ontario", "Ottawa")
+
+    # A fresh process finds the pickle instead of parsing again
+    monkeypatch.setattr(frontend_data, "_memo", {})
+    monkeypatch.setattr(frontend_data, "parse_data_js", None)
+    cached = load_frontend_data(str(path), str(cache_dir))
+    assert (cached.source_hash, cached.location_data) == (data.source_hash, data.location_data)
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # Editing data.js changes its hash, so it is parsed again
+    monkeypatch.undo()
+    path.write_text(SOURCE.replace('"Ottawa"', '"Kingston"'), encoding="utf-8")
+    assert load_frontend_data(str(path), str(cache_dir)).paths_for_city("Kingston") == (("Canada", "Ontario"),)
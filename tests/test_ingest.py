@@ -0,0 +1,50 @@
+import csv
+import json
+
+from backend.ingest import ACCEPTED_FILE, REJECTED_FILE, ingest, parse_chunk
+from tests.test_uniqueness import read_jsonl, registration
+
+
+def test_jsonl_records_split_only_on_newlines():
+    address = "Flat 4\u2028Tower B\x85Wing\x0cC"
+    chunk = (json.dumps({"address": address}, ensure_ascii=False) + "\r\n" + json.dumps({"city": "Pune"}) + "\n")
+    rows, columns, failures = parse_chunk("jsonl", None, chunk.encode("utf-8"))
+
+    assert rows == [{"address": address}, {"city": "Pune"}]
+    assert failures == {}
+
+
+def test_line_separator_in_a_value_keeps_row_numbers(tmp_path):
+    records = [registration(1, address="456 Park Avenue\u2028Block C"), registration(2, age="7")]
+    path = tmp_path / "partners.jsonl"
+    path.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding="utf-8")
+    stats = ingest(str(path), str(tmp_path / "out"), workers=1)
+
+    assert (stats["rows"], stats["accepted"], stats["rejected"]) == (2, 1, 1)
+    assert read_jsonl(tmp_path / "out" / ACCEPTED_FILE)[0]["address"] == "456 Park Avenue\u2028Block C"
+    assert [r["row"] for r in read_jsonl(tmp_path / "out" / REJECTED_FILE)] == [2]
+
+
+def test_csv_rows_the_form_cannot_send_are_rejected(tmp_path):
+    fields = list(registration(0))
+    rows = [
+        registration(1, terms="yes"),
+        registration(2, terms="false"),
+        registration(3, terms="no"),
+        registration(4, terms="0"),
+        registration(5, terms=""),
+        registration(6, gender="alien"),
+        registration(7, country="Narnia"),
+    ]
+    path = tmp_path / "partners.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    stats = ingest(str(path), str(tmp_path / "out"), workers=1)
+
+    assert (stats["rows"], stats["accepted"], stats["rejected"]) == (7, 1, 6)
+    assert read_jsonl(tmp_path / "out" / ACCEPTED_FILE)[0]["terms"] == "accepted"
+    errors = [r["errors"] for r in read_jsonl(tmp_path / "out" / REJECTED_FILE)]
+    assert errors[:4] == [{"terms": "You must agree to the Terms & Conditions"}] * 4
+    assert errors[4:] == [{"gender": "Please select a valid gender"}, {"country": "Please select a valid country"}]
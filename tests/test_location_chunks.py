@@ -0,0 +1,12 @@
+from backend.location_chunks import write_chunks
+
+
+def test_build_removes_only_its_own_stale_chunks(tmp_path):
+    for name in ("france.0123456789abcdef.json", "france.0123456789abcdef.json.gz", "script.js", "notes.json"):
+        (tmp_path / name).write_text("{}", encoding="utf-8")
+    index = write_chunks({"France": {"Bretagne": ["Rennes"]}}, {}, [], "hash", str(tmp_path), core_path=None)
+
+    chunk = index["countries"]["France"]["file"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        ["index.json", chunk, chunk + ".gz", "script.js", "notes.json"]
+    )
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.location_search import LocationSearch, normalize_name
+from backend.server import RegistrationServer
+
+
+LOCATIONS = {
+    "France": {
+        "Auvergne": ["Saint-Flour", "Clermont-Ferrand"],
+        "Île-de-France": ["Saint-Denis", "Paris"],
+    },
+    "Poland": {"Łódź Voivodeship": ["Łódź", "Białystok"]},
+}
+
+
+def names(results):
+    return [result["name"] for result in results]
+
+
+def test_letters_without_a_decomposition_are_folded():
+    assert normalize_name("Łódź") == "lodz"
+    assert normalize_name("Ørsted Đà Nẵng Æbeltoft Þórshöfn") == "orsted da nang aebeltoft thorshofn"
+    assert names(LocationSearch(LOCATIONS).search("lodz", kind="city")) == ["Łódź"]
+
+
+def test_state_filter_requires_its_country():
+    index = LocationSearch(LOCATIONS)
+
+    assert names(index.search("saint", kind="city", country="France", state="Auvergne")) == ["Saint-Flour"]
+    with pytest.raises(ValueError):
+        index.search("saint", state="Auvergne")
+
+
+def write_data_js(path, location_data):
+    path.write_text(
+        f"const locationData = {json.dumps(location_data)};\n"
+        "const countryPhoneCodes = {};\nconst disposableEmailDomains = [];\n",
+        encoding="utf-8",
+    )
+
+
+def test_server_index_recovers_from_a_failed_build_and_follows_data_js(tmp_path):
+    data_js = tmp_path / "data.js"
+    data_js.write_text("const locationData = {", encoding="utf-8")
+    server = RegistrationServer(data_dir=str(tmp_path), frontend_dir=str(tmp_path))
+
+    async def search(query):
+        index = await server.search_index()
+        return names(index.search(query, kind="city"))
+
+    async def session():
+        with pytest.raises(ValueError):
+            await server.search_index()
+        write_data_js(data_js, LOCATIONS)
+        first = await search("saint")
+        write_data_js(data_js, {"France": {"Bretagne": ["Saint-Malo"]}})
+        return first, await search("saint")
+
+    assert asyncio.run(session()) == (["Saint-Denis", "Saint-Flour"], ["Saint-Malo"])
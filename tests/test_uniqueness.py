@@ -0,0 +1,203 @@
+import asyncio
+import json
+import os
+import sqlite3
+
+import pytest
+
+from backend import ingest as ingest_module
+from backend.ingest import ACCEPTED_FILE, REJECTED_FILE, ingest
+from backend.server import RegistrationServer, Request
+from backend.uniqueness import INDEX_FILE, UniquenessIndex, record_digests, source_key
+
+
+REGISTRATION = {
+    "firstName": "Priya",
+    "lastName": "Patel",
+    "email": "priya.patel@gmail.com",
+    "phone": "+91 9123456789",
+    "age": "24",
+    "gender": "female",
+    "address": "456 Park Avenue, Block C",
+    "country": "India",
+    "state": "Maharashtra",
+    "city": "Pune",
+    "password": "StrongPass@2024",
+    "confirmPassword": "StrongPass@2024",
+    "terms": "accepted",
+}
+
+
+def registration(n, **changes):
+    return {**REGISTRATION, "email": f"user{n}@gmail.com", "phone": f"+91 9{n:09d}", **changes}
+
+
+def write_jsonl(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return str(path)
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+async def post(server, payload):
+    request = Request("POST", "/api/register", "HTTP/1.1", {}, json.dumps(payload).encode())
+    response = await server.register(request)
+    return response.status, json.loads(response.body)
+
+
+def run_server(data_dir, *payloads):
+    """Statuses of posting payloads (lists are posted concurrently) to a fresh server"""
+
+    async def session():
+        server = RegistrationServer(port=0, data_dir=str(data_dir))
+        await server.start()
+        try:
+            statuses = []
+            for payload in payloads:
+                if isinstance(payload, list):
+                    results = await asyncio.gather(*(post(server, p) for p in payload))
+                    statuses.append(sorted(status for status, _ in results))
+                else:
+                    statuses.append((await post(server, payload))[0])
+            return statuses
+        finally:
+            await server.close()
+
+    return asyncio.run(session())
+
+
+def test_server_rejects_normalized_duplicates(tmp_path):
+    same_person = dict(REGISTRATION, email=" PRIYA.PATEL@Gmail.com ", phone="+91 91234-56789")
+    statuses = run_server(tmp_path, REGISTRATION, same_person, [registration(1), registration(1)])
+    assert statuses == [201, 409, [201, 409]]
+
+
+def test_server_indexes_existing_registrations_after_a_shared_ingest(tmp_path):
+    run_server(tmp_path, REGISTRATION)
+    os.remove(tmp_path / INDEX_FILE)
+    # Ingest fills the server's index first, so it is no longer empty
+    partners = write_jsonl(tmp_path / "partners.jsonl", [registration(1)])
+    ingest(partners, str(tmp_path / "ingest"), workers=1, unique_index=str(tmp_path / INDEX_FILE))
+
+    assert run_server(tmp_path, REGISTRATION, registration(1), registration(2)) == [409, 409, 201]
+
+
+def test_server_catches_up_on_registrations_written_before_a_restart(tmp_path):
+    run_server(tmp_path, REGISTRATION)
+    # Stored, but the server stopped before indexing it
+    with open(tmp_path / "registrations.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(registration(3)) + "\n")
+
+    assert run_server(tmp_path, registration(3), REGISTRATION, registration(4)) == [409, 409, 201]
+    index = UniquenessIndex(str(tmp_path / INDEX_FILE))
+    try:
+        assert index.indexed_offset(source_key(tmp_path / "registrations.jsonl")) == os.path.getsize(
+            tmp_path / "registrations.jsonl")
+    finally:
+        index.close()
+
+
+def test_ingest_keeps_its_index_in_the_output_directory(tmp_path):
+    partners = write_jsonl(tmp_path / "partners.jsonl", [registration(1), registration(2, email="user1@gmail.com")])
+    stats = ingest(partners, str(tmp_path / "out"), workers=1)
+
+    assert (stats["accepted"], stats["duplicates"]) == (1, 1)
+    assert os.path.exists(tmp_path / "out" / INDEX_FILE)
+    assert read_jsonl(tmp_path / "out" / REJECTED_FILE)[0]["row"] == 2
+
+
+def test_ingest_rerun_under_another_spelling_of_the_path(tmp_path, monkeypatch):
+    partners = write_jsonl(tmp_path / "partners.jsonl", [registration(n) for n in range(5)])
+    out_dir = str(tmp_path / "out")
+    ingest(partners, out_dir, workers=1)
+    monkeypatch.chdir(tmp_path)
+    stats = ingest(os.path.join(".", "partners.jsonl"), out_dir, workers=1)
+
+    assert (stats["accepted"], stats["duplicates"]) == (5, 0)
+
+
+def test_ingest_resume_releases_keys_claimed_past_the_checkpoint(tmp_path, monkeypatch):
+    records = [registration(n) for n in range(300)]
+    records[250] = registration(250, email="user10@gmail.com")
+    partners = write_jsonl(tmp_path / "partners.jsonl", records)
+    out_dir = str(tmp_path / "out")
+    write_result = ingest_module.write_result
+    calls = []
+
+    def crash_in_third_chunk(result, end_offset, stats, outputs, checkpoint, fsync, unique=None, source=None):
+        calls.append(end_offset)
+        if len(calls) == 3:
+            # Keys claimed and committed, then the process dies before the checkpoint
+            ingest_module.claim_keys(unique, result[1], result[3], stats["rows"], source)
+            unique.commit()
+            raise KeyboardInterrupt
+        write_result(result, end_offset, stats, outputs, checkpoint, fsync, unique, source)
+
+    monkeypatch.setattr(ingest_module, "write_result", crash_in_third_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        ingest(partners, out_dir, workers=1, chunk_bytes=16 * 1024)
+    monkeypatch.setattr(ingest_module, "write_result", write_result)
+    stats = ingest(partners, out_dir, workers=1, chunk_bytes=16 * 1024, resume=True)
+
+    assert (stats["rows"], stats["accepted"], stats["duplicates"]) == (300, 299, 1)
+    accepted = read_jsonl(os.path.join(out_dir, ACCEPTED_FILE))
+    assert [r["email"] for r in accepted] == [r["email"] for i, r in enumerate(records) if i != 250]
+    assert [r["row"] for r in read_jsonl(os.path.join(out_dir, REJECTED_FILE))] == [251]
+
+
+def test_server_keeps_keys_reserved_until_a_failed_index_write_succeeds(tmp_path):
+    registrations = tmp_path / "registrations.jsonl"
+
+    async def session():
+        server = RegistrationServer(port=0, data_dir=str(tmp_path))
+        await server.start()
+        write_reserved = server.unique.write_reserved
+        failing = [True]
+
+        def flaky_write(batch, source, offset):
+            if failing[0]:
+                raise sqlite3.OperationalError("disk I/O error")
+            write_reserved(batch, source, offset)
+
+        server.unique.write_reserved = flaky_write
+        try:
+            # The writer handles one batch at a time, so the first batch's failed index
+            # write is over once the second registration is stored
+            statuses = [(await post(server, payload))[0] for payload in (REGISTRATION, registration(2), REGISTRATION)]
+            offset_after_failure = server.unique.indexed_offset(source_key(registrations))
+            failing[0] = False
+            statuses.append((await post(server, registration(1)))[0])
+            return statuses, offset_after_failure
+        finally:
+            await server.close()
+
+    statuses, offset_after_failure = asyncio.run(session())
+    assert statuses == [201, 201, 409, 201]
+    assert offset_after_failure == 0
+    index = UniquenessIndex(str(tmp_path / INDEX_FILE))
+    try:
+        # The retried batches stored the earlier registrations' keys too
+        assert len(index) == 6
+        assert index.indexed_offset(source_key(registrations)) == os.path.getsize(registrations)
+    finally:
+        index.close()
+    assert run_server(tmp_path, REGISTRATION) == [409]
+
+
+def test_reserved_keys_grow_the_filter_and_survive_a_reload(tmp_path):
+    index = UniquenessIndex(str(tmp_path / INDEX_FILE), capacity=8)
+    try:
+        batch = [(n, record_digests(registration(n))) for n in range(10)]
+        for _, keys in batch:
+            index.reserve(keys)
+        index.write_reserved(batch[:5], "registrations", 5)
+        assert index.bloom.capacity >= 16
+        # Reserved but not yet stored, so only the filter and pending set know them
+        assert all(all(index.bloom.contains_many(list(keys.values()))) for _, keys in batch[5:])
+    finally:
+        index.close()
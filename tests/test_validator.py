@@ -0,0 +1,145 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from backend.disposable_index import DisposableIndex
+from backend.frontend_data import PROJECT_DIR, load_frontend_data
+from backend.validator import FORM_FIELDS, FormValidator, form_columns, form_data_from_record
+from tests.test_uniqueness import REGISTRATION, run_server
+
+
+@pytest.fixture(scope="module")
+def validator():
+    return FormValidator()
+
+
+def errors(validator, **changes):
+    return validator.validate_record({**REGISTRATION, **changes}).errors
+
+
+def test_gender_must_be_one_of_the_radio_values(validator):
+    assert errors(validator) == {}
+    for gender in ("male", "female", "other"):
+        assert errors(validator, gender=gender) == {}
+    assert errors(validator, gender="alien") == {"gender": "Please select a valid gender"}
+
+
+def test_location_must_be_a_path_in_data_js(validator):
+    assert errors(validator, country="Narnia") == {"country": "Please select a valid country"}
+    assert errors(validator, state="Bavaria") == {"state": "Please select a valid state"}
+    assert errors(validator, city="Paris") == {"city": "Please select a valid city"}
+    # A city from another state of the same country
+    assert errors(validator, city="Mysore") == {"city": "Please select a valid city"}
+
+
+def test_columns_apply_the_same_option_checks(validator):
+    records = [
+        REGISTRATION,
+        {**REGISTRATION, "gender": "alien"},
+        {**REGISTRATION, "country": "Narnia"},
+        {**REGISTRATION, "city": "Mysore"},
+    ]
+    raw = {name: [record.get(name) for record in records] for name in FORM_FIELDS}
+    columns = validator.validate_columns(form_columns(raw, len(records)))
+    assert columns == [validator.validate_form(form_data_from_record(r)) for r in records]
+    assert [result.is_valid for result in columns] == [True, False, False, False]
+
+
+def test_server_rejects_values_the_form_cannot_send(tmp_path):
+    statuses = run_server(tmp_path, {**REGISTRATION, "gender": "alien"}, {**REGISTRATION, "country": "Narnia"})
+    assert statuses == [400, 400]
+
+
+# Runs validation.js against the same getFormData() payloads, for the parity test below
+NODE_VALIDATOR = """
+const fs = require('fs');
+const vm = require('vm');
+const context = vm.createContext({ console });
+const source = [process.argv[1], process.argv[2]].map(path => fs.readFileSync(path, 'utf8')).join('\\n');
+vm.runInContext(source + '\\nglobalThis.FormValidator = FormValidator;', context);
+const validator = new context.FormValidator();
+const forms = JSON.parse(fs.readFileSync(0, 'utf8'));
+process.stdout.write(JSON.stringify(forms.map(form => validator.validateForm(form).errors)));
+"""
+
+FRONTEND_DIR = os.path.join(PROJECT_DIR, "frontend")
+EMOJI = "\U0001f600"
+
+# (field, value, expected error) per rule, each applied to an otherwise valid registration
+FIELD_CASES = [
+    ("firstName", "Al", ""),
+    ("firstName", "Mary Ann", ""),
+    ("firstName", "A", "First name must be at least 2 characters"),
+    ("firstName", "A" * 51, "First name cannot exceed 50 characters"),
+    ("firstName", "Jo3", "First name can only contain letters and spaces"),
+    ("firstName", "José", "First name can only contain letters and spaces"),
+    # Emoji are two UTF-16 code units: 26 of them exceed 50, 25 only fail the pattern
+    ("lastName", EMOJI * 26, "Last name cannot exceed 50 characters"),
+    ("lastName", EMOJI * 25, "Last name can only contain letters and spaces"),
+    ("email", "a@b", "Please enter a valid email address"),
+    ("email", "a@@b.com", "Please enter a valid email address"),
+    ("email", "me@mailinator.com", "Disposable email addresses are not allowed"),
+    ("email", "me@inbox.mailinator.com", "Disposable email addresses are not allowed"),
+    ("email", "ME@MAILINATOR.COM", "Disposable email addresses are not allowed"),
+    ("email", "me@notmailinator.com", ""),
+    ("phone", "+91 91234-56789", ""),
+    ("phone", "91 9123456789", ""),
+    ("phone", "8123456789", "Phone number must match the selected country code (+91)"),
+    ("phone", "+91 12345", "Please enter a valid phone number"),
+    ("age", "", ""),
+    ("age", "25 years", ""),
+    ("age", "0x1A", ""),
+    ("age", "abc", "Please enter a valid age"),
+    ("age", "0x", "Please enter a valid age"),
+    ("age", "17.9", "You must be at least 18 years old"),
+    ("age", "1e3", "You must be at least 18 years old"),
+    ("age", "-20", "You must be at least 18 years old"),
+    ("age", "101", "Age cannot exceed 100 years"),
+    ("address", EMOJI * 2, "Address must be at least 5 characters"),
+    ("address", EMOJI * 2 + "a", ""),
+    ("address", "a" * 201, "Address cannot exceed 200 characters"),
+    ("password", "Ab@12", "Password must be at least 8 characters"),
+    ("password", EMOJI * 4, ""),
+    ("confirmPassword", "Other@2024", "Passwords do not match"),
+]
+
+
+def case_record(field, value):
+    record = {**REGISTRATION, field: value}
+    if field == "password":
+        record["confirmPassword"] = value
+    return record
+
+
+@pytest.mark.parametrize("field, value, expected", FIELD_CASES)
+def test_field_rules(validator, field, value, expected):
+    result = validator.validate_record(case_record(field, value))
+    assert result.errors == ({field: expected} if expected else {})
+
+
+def test_columns_match_validate_form(validator):
+    records = [case_record(field, value) for field, value, _ in FIELD_CASES]
+    records += [{}, {"terms": True}, {**REGISTRATION, "terms": False}, {**REGISTRATION, "country": "Narnia"}]
+    raw = {name: [record.get(name) for record in records] for name in FORM_FIELDS}
+
+    expected = [validator.validate_form(form_data_from_record(record)) for record in records]
+    assert validator.validate_columns(form_columns(raw, len(records))) == expected
+    assert validator.validate_batch(records) == expected
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run validation.js")
+def test_errors_match_validation_js():
+    data = load_frontend_data()
+    # validation.js checks the inline list until the full index loads
+    validator = FormValidator(data, DisposableIndex.from_domains(data.disposable_domains))
+    forms = [form_data_from_record(case_record(field, value)) for field, value, _ in FIELD_CASES]
+    forms.append(form_data_from_record({}))
+    scripts = [os.path.join(FRONTEND_DIR, name) for name in ("data.js", "validation.js")]
+    output = subprocess.run(
+        ["node", "-e", NODE_VALIDATOR, *scripts], input=json.dumps(forms), capture_output=True, text=True, check=True,
+    ).stdout
+
+    assert json.loads(output) == [validator.validate_form(form).errors for form in forms]